@@ -4,9 +4,12 @@ from PySide6.QtWidgets import QPushButton, QTabWidget, QListWidget, QLabel, QCom
 from PySide6.QtCore import Qt, QThread, Signal
 from datetime import datetime
 from datetime import datetime
+import pandas as pd
 
 from my_ludwig.ludwig_data import input_feature_types, output_feature_types, separators, missing_data_options, metrics, goals
 from texts import text_manager
+from utils.column_pruner import describe_pruning
+from utils.leakage_scan import describe_leakage
 
 class AutoconfigWorker(QThread):
     """Worker thread for autoconfig."""
@@ -310,7 +313,7 @@ class ControllerClinicalTrial:
         # Only setup if data is loaded
         if (hasattr(self.model_clinical, 'model') and 
             self.model_clinical.model and 
-            self.model_clinical.model.df is not None):
+            self.model_clinical.model.dataset is not None):
             
             # Setup criteria scroll area
             self._update_tab_criteria()
@@ -447,7 +450,7 @@ class ControllerClinicalTrial:
         """Initialize the clinical trial page."""
         self._update_tab_variable()
         # Update ScrollAreas when dataset is loaded
-        if hasattr(self.model_clinical, 'model') and self.model_clinical.model and self.model_clinical.model.df is not None:
+        if hasattr(self.model_clinical, 'model') and self.model_clinical.model and self.model_clinical.model.dataset is not None:
             self._update_tab_criteria()
             self._update_tab_investigational()
             self._update_tab_control()
@@ -559,6 +562,8 @@ class ControllerClinicalTrial:
                 f"Dataset: {self.model_clinical.model.dataset_dir}\n"
                 f"Samples: {self.model_clinical.model.ludwig.samples}\n"
                 f"Input features: {self.model_clinical.model.ludwig.input_features}\n"
+                f"Pruned columns: {describe_pruning(self.model_clinical.model.ludwig.pruning_stats)}\n"
+                f"Leaking or redundant features: {describe_leakage(self.model_clinical.model.ludwig.leakage_stats)}\n"
                 f"Target: {self.model_clinical.model.ludwig.target}\n"
                 f"Separator: {self.model_clinical.model.ludwig.separator}\n"
                 f"Missing data: {self.model_clinical.model.ludwig.missing_data}\n"
@@ -574,7 +579,7 @@ class ControllerClinicalTrial:
         Updates the criteria tab with instance selection and removal functionality.
         Implements [IS2] Select subpopulations and [IS3] Remove specific instances HGML tasks.
         """
-        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.df is None:
+        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.dataset is None:
             return
 
         # Check if autoconfig completed successfully
@@ -629,7 +634,7 @@ class ControllerClinicalTrial:
     def _add_criteria_rule(self, rule_type):
         """Adds a new criteria rule row to the UI."""
         # Get all available columns from the dataset
-        columns = list(self.model_clinical.model.df.columns)
+        columns = list(self.model_clinical.model.dataset.columns)
         
         # Create rule widget
         rule_widget = QWidget()
@@ -698,7 +703,7 @@ class ControllerClinicalTrial:
         if reply == QMessageBox.Yes:
             # Clear criteria manager
             self.model_clinical.model.criteria_manager.rules.clear()
-            self.model_clinical.model.filtered_df = None
+            self.model_clinical.model.clear_criteria_filter()
             
             # Refresh the UI
             self._update_tab_criteria()
@@ -707,7 +712,7 @@ class ControllerClinicalTrial:
         """Displays existing rules from the criteria manager."""
         for rule in self.model_clinical.model.criteria_manager.rules:
             # Get all columns
-            columns = list(self.model_clinical.model.df.columns)
+            columns = list(self.model_clinical.model.dataset.columns)
             
             # Create rule widget
             rule_widget = QWidget()
@@ -765,8 +770,8 @@ class ControllerClinicalTrial:
         summary_widget = QWidget()
         summary_layout = QHBoxLayout(summary_widget)
         
-        original_size = len(self.model_clinical.model.df)
-        filtered_size = len(self.model_clinical.model.filtered_df) if self.model_clinical.model.filtered_df is not None else original_size
+        original_size = self.model_clinical.model.dataset.num_rows
+        filtered_size = self.model_clinical.model.filtered_size() if self.model_clinical.model.filtered_size() is not None else original_size
         removed_count = original_size - filtered_size
         removed_percent = (removed_count / original_size * 100) if original_size > 0 else 0
         
@@ -782,10 +787,10 @@ class ControllerClinicalTrial:
 
     def _update_tab_investigational(self):
         """Setup the investigational drug tab with dynamic feature selection widgets."""
-        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.df is None:
+        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.dataset is None:
             return
 
-        columns = self.model_clinical.model.df.columns.tolist()
+        columns = self.model_clinical.model.dataset.columns
         scroll_widget = self.scrollArea_clinical_investigational.widget()
         layout = scroll_widget.layout()
 
@@ -818,10 +823,10 @@ class ControllerClinicalTrial:
 
     def _update_tab_control(self):
         """Setup the control drug tab with dynamic feature selection widgets."""
-        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.df is None:
+        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.dataset is None:
             return
 
-        columns = self.model_clinical.model.df.columns.tolist()
+        columns = self.model_clinical.model.dataset.columns
         scroll_widget = self.scrollArea_clinical_control.widget()
         layout = scroll_widget.layout()
 
@@ -854,10 +859,10 @@ class ControllerClinicalTrial:
 
     def _update_tab_disease(self):
         """Setup the disease tab with dynamic feature selection widgets."""
-        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.df is None:
+        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.dataset is None:
             return
 
-        columns = self.model_clinical.model.df.columns.tolist()
+        columns = self.model_clinical.model.dataset.columns
         scroll_widget = self.scrollArea_clinical_disease.widget()
         layout = scroll_widget.layout()
 
@@ -890,7 +895,7 @@ class ControllerClinicalTrial:
 
     def _update_tab_settings(self):
         """Updates the settings tab with predefined configuration options depending on primary variable type."""
-        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.df is None:
+        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.dataset is None:
             return
         
         if not self.layout_clinical_settings:
@@ -997,7 +1002,7 @@ class ControllerClinicalTrial:
         Implements [IS2] Select subpopulations and [IS3] Remove specific instances HGML tasks.
         Returns True if criteria are valid and applied successfully, False otherwise.
         """
-        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.df is None:
+        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.dataset is None:
             return True  # No validation needed if no model
         
         # Clear existing rules
@@ -1039,9 +1044,9 @@ class ControllerClinicalTrial:
             # Try to convert value to appropriate type
             try:
                 # Check if the column is numeric
-                if variable in self.model_clinical.model.df.columns:
-                    col_dtype = self.model_clinical.model.df[variable].dtype
-                    if col_dtype in ['int64', 'float64']:
+                if variable in self.model_clinical.model.dataset.columns:
+                    col_dtype = self.model_clinical.model.dataset.dtypes[variable]
+                    if pd.api.types.is_integer_dtype(col_dtype) or pd.api.types.is_float_dtype(col_dtype):
                         value = float(value_text)
                     else:
                         value = value_text
@@ -1106,16 +1111,16 @@ class ControllerClinicalTrial:
                 return False
         else:
             # No rules defined - use full dataset
-            self.model_clinical.model.filtered_df = None
+            self.model_clinical.model.clear_criteria_filter()
         
         return True
 
     def _read_updated_investigational(self):
         """Read the updated investigational drug configuration from the UI."""
-        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.df is None:
+        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.dataset is None:
             return
 
-        columns = self.model_clinical.model.df.columns.tolist()
+        columns = self.model_clinical.model.dataset.columns
         scroll_widget = self.scrollArea_clinical_investigational.widget()
         
         drug_info = []
@@ -1131,10 +1136,10 @@ class ControllerClinicalTrial:
 
     def _read_updated_control(self):
         """Read the updated control configuration from the UI."""
-        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.df is None:
+        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.dataset is None:
             return
 
-        columns = self.model_clinical.model.df.columns.tolist()
+        columns = self.model_clinical.model.dataset.columns
         scroll_widget = self.scrollArea_clinical_control.widget()
         
         control_info = []
@@ -1150,10 +1155,10 @@ class ControllerClinicalTrial:
 
     def _read_updated_disease(self):
         """Read the updated disease configuration from the UI."""
-        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.df is None:
+        if not hasattr(self.model_clinical, 'model') or not self.model_clinical.model or self.model_clinical.model.dataset is None:
             return
 
-        columns = self.model_clinical.model.df.columns.tolist()
+        columns = self.model_clinical.model.dataset.columns
         scroll_widget = self.scrollArea_clinical_disease.widget()
         
         disease_info = []
@@ -3,9 +3,12 @@
 from PySide6.QtWidgets import QPushButton, QTabWidget, QListWidget, QLabel, QComboBox, QWidget, QHBoxLayout, QVBoxLayout, QScrollArea, QTextEdit, QLineEdit, QSizePolicy, QMessageBox, QProgressDialog, QFrame
 from PySide6.QtCore import Qt, QThread, Signal
 from datetime import datetime
+import pandas as pd
 
 from my_ludwig.ludwig_data import input_feature_types, output_feature_types, separators, missing_data_options, metrics, goals
 from texts import text_manager
+from utils.column_pruner import describe_pruning
+from utils.leakage_scan import describe_leakage
 
 class AutoconfigWorker(QThread):
     """Worker thread for autoconfig."""
@@ -434,7 +437,7 @@ class ControllerObservationalStudy:
     def _add_criteria_rule(self, rule_type):
         """Adds a new criteria rule row to the UI."""
         # Get all available columns from the dataset
-        columns = list(self.model_observational.model.df.columns)
+        columns = list(self.model_observational.model.dataset.columns)
         
         # Create rule widget
         rule_widget = QWidget()
@@ -503,7 +506,7 @@ class ControllerObservationalStudy:
         if reply == QMessageBox.Yes:
             # Clear criteria manager
             self.model_observational.model.criteria_manager.rules.clear()
-            self.model_observational.model.filtered_df = None
+            self.model_observational.model.clear_criteria_filter()
             
             # Refresh the UI
             self._update_tab_criteria()
@@ -512,7 +515,7 @@ class ControllerObservationalStudy:
         """Displays existing rules from the criteria manager."""
         for rule in self.model_observational.model.criteria_manager.rules:
             # Get all columns
-            columns = list(self.model_observational.model.df.columns)
+            columns = list(self.model_observational.model.dataset.columns)
             
             # Create rule widget
             rule_widget = QWidget()
@@ -570,8 +573,8 @@ class ControllerObservationalStudy:
         summary_widget = QWidget()
         summary_layout = QHBoxLayout(summary_widget)
         
-        original_size = len(self.model_observational.model.df)
-        filtered_size = len(self.model_observational.model.filtered_df) if self.model_observational.model.filtered_df is not None else original_size
+        original_size = self.model_observational.model.dataset.num_rows
+        filtered_size = self.model_observational.model.filtered_size() if self.model_observational.model.filtered_size() is not None else original_size
         removed_count = original_size - filtered_size
         removed_percent = (removed_count / original_size * 100) if original_size > 0 else 0
         
@@ -630,9 +633,9 @@ class ControllerObservationalStudy:
             # Try to convert value to appropriate type
             try:
                 # Check if the column is numeric
-                if variable in self.model_observational.model.df.columns:
-                    col_dtype = self.model_observational.model.df[variable].dtype
-                    if col_dtype in ['int64', 'float64']:
+                if variable in self.model_observational.model.dataset.columns:
+                    col_dtype = self.model_observational.model.dataset.dtypes[variable]
+                    if pd.api.types.is_integer_dtype(col_dtype) or pd.api.types.is_float_dtype(col_dtype):
                         value = float(value_text)
                     else:
                         value = value_text
@@ -697,7 +700,7 @@ class ControllerObservationalStudy:
                 return False
         else:
             # No rules defined - use full dataset
-            self.model_observational.model.filtered_df = None
+            self.model_observational.model.clear_criteria_filter()
         
         return True
 
@@ -799,6 +802,8 @@ class ControllerObservationalStudy:
                 f"Dataset: {self.model_observational.model.dataset_dir}\n"
                 f"Samples: {self.model_observational.model.ludwig.samples}\n"
                 f"Input features: {self.model_observational.model.ludwig.input_features}\n"
+                f"Pruned columns: {describe_pruning(self.model_observational.model.ludwig.pruning_stats)}\n"
+                f"Leaking or redundant features: {describe_leakage(self.model_observational.model.ludwig.leakage_stats)}\n"
                 f"Target: {self.model_observational.model.ludwig.target}\n"
                 f"Separator: {self.model_observational.model.ludwig.separator}\n"
                 f"Missing data: {self.model_observational.model.ludwig.missing_data}\n"
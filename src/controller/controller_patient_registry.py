@@ -3,9 +3,12 @@
 from PySide6.QtWidgets import QPushButton, QTabWidget, QListWidget, QLabel, QComboBox, QWidget, QHBoxLayout, QVBoxLayout, QScrollArea, QTextEdit, QLineEdit, QSizePolicy, QMessageBox, QProgressDialog, QFrame
 from PySide6.QtCore import Qt, QThread, Signal
 from datetime import datetime
+import pandas as pd
 
 from my_ludwig.ludwig_data import input_feature_types, output_feature_types, separators, missing_data_options, metrics, goals
 from texts import text_manager
+from utils.column_pruner import describe_pruning
+from utils.leakage_scan import describe_leakage
 
 class AutoconfigWorker(QThread):
     """Worker thread for autoconfig."""
@@ -468,7 +471,7 @@ class ControllerPatientRegistry:
     
     def _add_criteria_rule(self, rule_type='inclusion'):
         """Add a new criteria rule row to the interface."""
-        if self.model_registry.model.df is None:
+        if self.model_registry.model.dataset is None:
             QMessageBox.warning(
                 self.controller.window,
                 "No Dataset",
@@ -488,7 +491,7 @@ class ControllerPatientRegistry:
         
         # Variable selection
         combo_variable = QComboBox()
-        combo_variable.addItems([''] + list(self.model_registry.model.df.columns))
+        combo_variable.addItems([''] + list(self.model_registry.model.dataset.columns))
         combo_variable.setMinimumWidth(150)
         rule_layout.addWidget(combo_variable)
         
@@ -579,19 +582,19 @@ class ControllerPatientRegistry:
         summary_label = QLabel()
         summary_label.setWordWrap(True)
         
-        if self.model_registry.model.df is not None:
+        if self.model_registry.model.dataset is not None:
             rules_count = sum(1 for i in range(self.layout_registry_criteria.count())
                              if self.layout_registry_criteria.itemAt(i).widget() and
                              self.layout_registry_criteria.itemAt(i).widget().property('rule_type'))
             
             text = f"<b>Current Status:</b><br>"
-            text += f"Original dataset: {len(self.model_registry.model.df):,} rows<br>"
+            text += f"Original dataset: {self.model_registry.model.dataset.num_rows:,} rows<br>"
             text += f"Rules defined: {rules_count}<br>"
             
-            if self.model_registry.model.filtered_df is not None:
-                filtered_count = len(self.model_registry.model.filtered_df)
-                removed = len(self.model_registry.model.df) - filtered_count
-                percentage = (removed / len(self.model_registry.model.df) * 100) if len(self.model_registry.model.df) > 0 else 0
+            if self.model_registry.model.filtered_size() is not None:
+                filtered_count = self.model_registry.model.filtered_size()
+                removed = self.model_registry.model.dataset.num_rows - filtered_count
+                percentage = (removed / self.model_registry.model.dataset.num_rows * 100) if self.model_registry.model.dataset.num_rows > 0 else 0
                 text += f"<span style='color: blue;'>Filtered dataset: {filtered_count:,} rows</span><br>"
                 text += f"<span style='color: red;'>Removed: {removed:,} rows ({percentage:.1f}%)</span>"
             else:
@@ -707,9 +710,9 @@ class ControllerPatientRegistry:
                         continue
                 else:
                     # Check if the column is numeric
-                    if variable in self.model_registry.model.df.columns:
-                        col_dtype = self.model_registry.model.df[variable].dtype
-                        if col_dtype in ['int64', 'float64']:
+                    if variable in self.model_registry.model.dataset.columns:
+                        col_dtype = self.model_registry.model.dataset.dtypes[variable]
+                        if pd.api.types.is_integer_dtype(col_dtype) or pd.api.types.is_float_dtype(col_dtype):
                             value = float(value_text)
                         else:
                             value = value_text
@@ -773,7 +776,7 @@ class ControllerPatientRegistry:
                 return False
         else:
             # No filtering rules defined - use full dataset
-            self.model_registry.model.filtered_df = None
+            self.model_registry.model.clear_criteria_filter()
         
         return True
 
@@ -875,6 +878,8 @@ class ControllerPatientRegistry:
                 f"Dataset: {self.model_registry.model.dataset_dir}\n"
                 f"Samples: {self.model_registry.model.ludwig.samples}\n"
                 f"Input features: {self.model_registry.model.ludwig.input_features}\n"
+                f"Pruned columns: {describe_pruning(self.model_registry.model.ludwig.pruning_stats)}\n"
+                f"Leaking or redundant features: {describe_leakage(self.model_registry.model.ludwig.leakage_stats)}\n"
                 f"Target: {self.model_registry.model.ludwig.target}\n"
                 f"Separator: {self.model_registry.model.ludwig.separator}\n"
                 f"Missing data: {self.model_registry.model.ludwig.missing_data}\n"
@@ -1,11 +1,69 @@
 # controller/controller_start.py
 
-from PySide6.QtWidgets import QPushButton, QComboBox, QTabWidget, QInputDialog, QListWidget, QTextEdit, QFileDialog, QMessageBox, QLabel
+from PySide6.QtWidgets import QPushButton, QComboBox, QTabWidget, QInputDialog, QListWidget, QTextEdit, QFileDialog, QMessageBox, QLabel, QProgressDialog
 from PySide6.QtGui import QPixmap
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThread, Signal
 import pandas as pd
 import os
 
+from my_ludwig.ludwig_data import file_formats
+from utils.dataset_reader import LoadCancelled
+from utils.dataset_profile import NUMERIC, CATEGORICAL
+
+class DatasetLoadWorker(QThread):
+    """Worker thread for reading a dataset."""
+    finished = Signal()
+    error = Signal(str)
+    cancelled = Signal()
+    progress = Signal(int)
+    progress_update = Signal(str)
+
+    def __init__(self, model_start, dataset_name):
+        super().__init__()
+        self.model_start = model_start
+        self.dataset_name = dataset_name
+        self._is_cancelled = False
+
+    def cancel(self):
+        """Cancel the operation. Reading stops at the next chunk, profiling at the next column."""
+        self._is_cancelled = True
+
+    def _check_cancelled(self):
+        """Stops reading or profiling if cancelled (the previous dataset is then kept)."""
+        if self._is_cancelled:
+            raise LoadCancelled()
+
+    def _on_progress(self, bytes_read, total_bytes):
+        """Reports reading progress and stops the reader if cancelled."""
+        self._check_cancelled()
+
+        if total_bytes > 0:
+            self.progress.emit(int(bytes_read * 100 / total_bytes))
+        self.progress_update.emit(f"Reading dataset... {bytes_read / 1024**2:.1f} of {total_bytes / 1024**2:.1f} MB")
+
+    def run(self):
+        """Read the dataset in background."""
+        try:
+            if self._is_cancelled:
+                self.cancelled.emit()
+                return
+
+            # The status tab summarises the whole dataset: its profile is read from the project cache,
+            # or computed here (reading the data) the first time the dataset is opened
+            self.model_start.set_dataset(self.dataset_name, progress=self._on_progress, load=True,
+                                         checkpoint=self._check_cancelled)
+
+            # Once set_dataset returns the model has switched to the new dataset,
+            # so a cancel arriving now is too late and the load is reported as finished
+            self.finished.emit()
+        except LoadCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            if self._is_cancelled:
+                self.cancelled.emit()
+            else:
+                self.error.emit(str(e))
+
 class ControllerStart:
     def __init__(self, ui, model_start, controller):
         """
@@ -170,9 +228,7 @@ li.checked::marker {{ content: "\\2612"; }}
             if current_data.text() == "[New dataset]":
                 self._load_dataset()
             else:
-                self._set_dataset() # Selects the dataset
-                self._update_tab_status() # Updates the status tab
-                self._next_tab() # Switches to the next tab
+                self._set_dataset() # Reads the dataset in background, then updates the status tab
                 return
 
         # Tab 4: Status (now the last tab)
@@ -269,157 +325,187 @@ li.checked::marker {{ content: "\\2612"; }}
                 self.listWidget_start_data.addItem(dataset)
 
     def _load_dataset(self):
-        # Open file dialog to select the CSV file
-        origin_path, _ = QFileDialog.getOpenFileName(self.controller.window, "Open CSV File", "", "CSV Files (*.csv)")
-        if origin_path:
+        # Open file dialog to select the dataset file (Qt filters use spaces between patterns)
+        name_filters = ";;".join(f"{name} ({patterns.replace(';', ' ')})" for name, patterns in file_formats)
+        # Selecting several files uploads them as the shards of one dataset
+        origin_paths, _ = QFileDialog.getOpenFileNames(self.controller.window, "Open Dataset Files", "", name_filters)
+        if origin_paths:
             try:
-                self.model_start.load_dataset(origin_path)
+                if len(origin_paths) == 1:
+                    self.model_start.load_dataset(origin_paths[0])
+                else:
+                    name, ok = QInputDialog.getText(self.ui, "Sharded dataset",
+                                                    f"{len(origin_paths)} files selected.\nEnter the dataset name:")
+                    if not ok or not name.strip():
+                        return
+                    self.model_start.load_shards(origin_paths, name.strip())
                 self._update_tab_data()
             except Exception as e:
                 QMessageBox.critical(
                     self.controller.window,
                     "Error Loading Dataset",
-                    f"Failed to load the selected CSV file.\n\nError: {str(e)}\n\nPlease ensure the file is a valid CSV format."
+                    f"Failed to load the selected file.\n\nError: {str(e)}\n\nPlease ensure the file is in one of the supported formats."
                 )
         else:
             QMessageBox.information(
                 self.controller.window,
                 "No File Selected",
-                "Please select a CSV file to upload or choose an existing dataset from the list."
+                "Please select a dataset file to upload or choose an existing dataset from the list."
             )
 
     def _set_dataset(self):
         """
-        Reads the selected dataset from the list widget.
+        Reads the selected dataset from the list widget in a background worker.
+        The status tab is shown once the dataset is ready.
         """
         current_item = self.listWidget_start_data.currentItem()
         if current_item is None:
             return False
         
         selected_dataset = current_item.text()
-        self.model_start.set_dataset(selected_dataset)
+
+        # Create progress dialog (busy until the reader reports progress)
+        self.load_progress = QProgressDialog(f"Loading '{selected_dataset}', please wait...", "Cancel", 0, 0, self.controller.window)
+        self.load_progress.setWindowTitle("Loading Dataset")
+        self.load_progress.setWindowModality(Qt.WindowModal)
+        self.load_progress.setMinimumDuration(0)
+
+        # Create worker
+        self.load_worker = DatasetLoadWorker(self.model_start, selected_dataset)
+        self.load_worker.finished.connect(self._on_load_finished)
+        self.load_worker.error.connect(self._on_load_error)
+        self.load_worker.cancelled.connect(self._on_load_cancelled)
+        self.load_worker.progress.connect(self._on_load_progress)
+        self.load_worker.progress_update.connect(self.load_progress.setLabelText)
+        self.load_progress.canceled.connect(self.load_worker.cancel)
+
+        # Start worker and show dialog
+        self.load_worker.start()
+        self.load_progress.exec()
         return True
 
+    # Signal handlers for dataset loading
+    def _on_load_progress(self, percent):
+        """Switch the progress dialog to a determinate bar once the reader reports progress."""
+        if self.load_progress.maximum() == 0:
+            self.load_progress.setRange(0, 100)
+        self.load_progress.setValue(percent)
+
+    def _on_load_finished(self):
+        """Handle a dataset that was read successfully."""
+        self.load_worker.wait()
+        self.load_progress.close()
+        self._update_tab_status() # Updates the status tab
+        self._next_tab() # Switches to the next tab
+
+    def _on_load_error(self, error_msg):
+        """Handle an error while reading the dataset."""
+        self.load_worker.wait()
+        self.load_progress.close()
+        QMessageBox.critical(
+            self.controller.window,
+            "Error Loading Dataset",
+            f"Failed to read the selected dataset.\n\nError: {error_msg}"
+        )
+
+    def _on_load_cancelled(self):
+        """Handle cancellation of the dataset loading."""
+        self.load_worker.wait()
+        self.load_progress.close()
+        QMessageBox.information(self.controller.window, "Cancelled",
+                              "Dataset loading was cancelled.")
+
     def _update_tab_status(self):
         self.textEdit_start_status_text.clear()
 
-        # Generate automatic dataset characteristics
-        if hasattr(self.model_start.model, 'df') and self.model_start.model.df is not None:
-            df = self.model_start.model.df
+        # Generate automatic dataset characteristics (read from the dataset profile, computed once per dataset)
+        if self.model_start.model.dataset is not None:
+            profile = self.model_start.model.dataset.profile()
             
             # Generate comprehensive dataset statistics in plain language
             status_info = []
             status_info.append("=== DATASET SUMMARY ===\n")
             
             # Basic information
-            status_info.append(f"[*] Size: {df.shape[0]:,} patients/records with {df.shape[1]} characteristics")
-            status_info.append(f"[*] File size: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+            status_info.append(f"[*] Size: {profile.rows:,} patients/records with {len(profile.columns)} characteristics")
+            status_info.append(f"[*] File size: {profile.memory_bytes / 1024**2:.2f} MB")
+            compaction_stats = self.model_start.model.ludwig.compaction_stats
+            if compaction_stats and compaction_stats['memory_saved'] > 0:
+                status_info.append(f"[*] Memory saved by compacting data types: {compaction_stats['memory_saved'] / 1024**2:.2f} MB "
+                                   f"({compaction_stats['saved_percentage']:.1f}% of {compaction_stats['memory_before'] / 1024**2:.2f} MB)")
             if self.model_start.model.dataset_name:
                 status_info.append(f"[*] Name: {self.model_start.model.dataset_name}")
+            if profile.approximate:
+                distinct_error = max(column.distinct_error for column in profile.columns)
+                status_info.append(f"[*] Very large dataset: numbers of distinct values are estimated (±{distinct_error * 100:.1f}%), "
+                                   f"as are medians and the frequencies of variables with many values")
             
             # Data types analysis - simplified for non-experts
             status_info.append("\n--- TYPES OF INFORMATION ---")
-            numeric_count = len(df.select_dtypes(include=['int64', 'float64']).columns)
-            categorical_count = len(df.select_dtypes(include=['object', 'category']).columns)
+            numeric_cols = profile.columns_of_kind(NUMERIC)
+            categorical_cols = profile.columns_of_kind(CATEGORICAL)
             
-            if numeric_count > 0:
-                status_info.append(f"  > {numeric_count} numerical variables (measurements, counts, values)")
-            if categorical_count > 0:
-                status_info.append(f"  > {categorical_count} categorical variables (categories, labels, groups)")
+            if len(numeric_cols) > 0:
+                status_info.append(f"  > {len(numeric_cols)} numerical variables (measurements, counts, values)")
+            if len(categorical_cols) > 0:
+                status_info.append(f"  > {len(categorical_cols)} categorical variables (categories, labels, groups)")
             
             # Missing data analysis
-            missing_data = df.isnull().sum()
-            total_missing = missing_data.sum()
-            total_cells = df.shape[0] * df.shape[1]
-            missing_percentage = (total_missing / total_cells) * 100
+            total_missing = profile.missing_total
+            missing_percentage = profile.missing_percentage
             
             status_info.append("\n--- DATA COMPLETENESS ---")
             if total_missing > 0:
                 status_info.append(f"  [!] {total_missing:,} missing values found ({missing_percentage:.1f}% of all data)")
-                missing_cols = missing_data[missing_data > 0]
+                missing_cols = [column for column in profile.columns if column.null_count > 0]
                 status_info.append(f"  > {len(missing_cols)} variables have incomplete information")
                 
                 # Show columns with most missing data
-                top_missing = missing_cols.nlargest(3)
+                top_missing = sorted(missing_cols, key=lambda column: column.null_count, reverse=True)[:3]
                 if len(top_missing) > 0:
                     status_info.append("\n  Most affected variables:")
-                    for col, missing_count in top_missing.items():
-                        percentage = (missing_count / len(df)) * 100
-                        status_info.append(f"    - {col}: {percentage:.1f}% missing")
+                    for column in top_missing:
+                        percentage = (column.null_count / profile.rows) * 100
+                        status_info.append(f"    - {column.name}: {percentage:.1f}% missing")
             else:
                 status_info.append("  [OK] Complete dataset - no missing values")
             
             # Numeric columns statistics - simplified
-            numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
             if len(numeric_cols) > 0:
                 status_info.append(f"\n--- NUMERICAL VARIABLES ({len(numeric_cols)} total) ---")
                 status_info.append("  Examples of measured values:")
-                for col in numeric_cols[:3]:  # Show first 3
-                    min_val = df[col].min()
-                    max_val = df[col].max()
-                    mean_val = df[col].mean()
-                    status_info.append(f"    > {col}")
-                    status_info.append(f"      Range: {min_val:.2f} to {max_val:.2f} (average: {mean_val:.2f})")
+                for column in numeric_cols[:3]:  # Show first 3
+                    status_info.append(f"    > {column.name}")
+                    median = f", median: {column.quartiles[1]:.2f}" if column.quartiles else ""
+                    status_info.append(f"      Range: {column.minimum:.2f} to {column.maximum:.2f} (average: {column.mean:.2f}{median})")
                 if len(numeric_cols) > 3:
                     status_info.append(f"    ... and {len(numeric_cols) - 3} more")
             
             # Categorical columns analysis - simplified
-            categorical_cols = df.select_dtypes(include=['object', 'category']).columns
             if len(categorical_cols) > 0:
                 status_info.append(f"\n--- CATEGORICAL VARIABLES ({len(categorical_cols)} total) ---")
                 status_info.append("  Examples of categories:")
-                for col in categorical_cols[:3]:  # Show first 3
-                    unique_count = df[col].nunique()
-                    status_info.append(f"    > {col}: {unique_count} different categories")
+                for column in categorical_cols[:3]:  # Show first 3
+                    approximately = "~" if column.distinct_error > 0 else ""
+                    status_info.append(f"    > {column.name}: {approximately}{column.distinct_count} different categories")
                     # Show most common category
-                    if len(df[col].value_counts()) > 0:
-                        top_category = df[col].value_counts().index[0]
-                        top_count = df[col].value_counts().iloc[0]
-                        top_percent = (top_count / len(df)) * 100
-                        status_info.append(f"      Most common: '{top_category}' ({top_percent:.1f}%)")
+                    if column.top_values:
+                        top_category, top_count = column.top_values[0]
+                        share = column.value_share(top_count, profile.rows)
+                        if share is None:
+                            # Estimated count too uncertain to give a percentage
+                            status_info.append(f"      Most common: '{top_category}'")
+                        elif share[1] - share[0] < 0.05:
+                            status_info.append(f"      Most common: '{top_category}' ({share[0]:.1f}%)")
+                        else:
+                            status_info.append(f"      Most common: '{top_category}' ({share[0]:.1f}-{share[1]:.1f}%)")
                 if len(categorical_cols) > 3:
                     status_info.append(f"    ... and {len(categorical_cols) - 3} more")
             
             # Potential target variables
             status_info.append("\n--- SUITABLE OUTCOME VARIABLES ---")
             status_info.append("  (Variables that could be predicted)")
-            potential_categorical = []
-            potential_numerical = []
-            potential_boolean = []
-            
-            total_rows = len(df)
-            
-            for col in df.columns:
-                # Categorical variables for classification
-                if pd.api.types.is_categorical_dtype(df[col]) or df[col].dtype == object:
-                    counts = df[col].value_counts(dropna=True)
-                    if len(counts) <= 10 and (counts >= 5).all():  # max_categories=10, min_samples=5
-                        potential_categorical.append((col, len(counts)))
-                
-                # Numerical variables
-                elif df[col].dtype in ['int64', 'float64']:
-                    unique_count = df[col].nunique(dropna=True)
-                    
-                    # Check if variable has real decimal values (not just .0)
-                    has_decimals = False
-                    if df[col].dtype == 'float64':
-                        has_decimals = (df[col].dropna() % 1 != 0).any()
-                    
-                    # Continuous variable: has real decimals OR >50% values are unique
-                    if has_decimals or unique_count > total_rows * 0.5:
-                        potential_numerical.append(col)
-                    # Discrete numerical (treated as categorical): check min 2 samples per value
-                    else:
-                        counts = df[col].value_counts(dropna=True)
-                        min_count = counts.min()
-                        if min_count >= 2 and unique_count <= 10:
-                            potential_categorical.append((col, unique_count))
-                
-                # Boolean variables for binary classification
-                elif df[col].dtype == 'bool':
-                    counts = df[col].value_counts(dropna=True)
-                    if len(counts) == 2 and (counts >= 2).all():  # Both True and False with at least 2 samples
-                        potential_boolean.append(col)
+            potential_categorical, potential_numerical, potential_boolean = profile.outcome_candidates()
             
             if potential_categorical:
                 status_info.append("  Classification (categorical outcomes):")
@@ -438,9 +524,8 @@ li.checked::marker {{ content: "\\2612"; }}
             if potential_numerical:
                 status_info.append("  Regression (continuous numerical outcomes):")
                 for col in potential_numerical[:3]:
-                    min_val = df[col].min()
-                    max_val = df[col].max()
-                    status_info.append(f"    > {col} (range: {min_val:.2f} to {max_val:.2f})")
+                    column = profile.column(col)
+                    status_info.append(f"    > {col} (range: {column.minimum:.2f} to {column.maximum:.2f})")
                 if len(potential_numerical) > 3:
                     status_info.append(f"    ... and {len(potential_numerical) - 3} more")
             
@@ -454,25 +539,22 @@ li.checked::marker {{ content: "\\2612"; }}
             
             # Data quality assessment
             status_info.append("\n--- OVERALL DATA QUALITY ---")
-            quality_score = 0
+            quality_score = profile.quality_score()
             
             # Check missing data
             if total_missing == 0:
                 status_info.append("  [OK] Excellent: Complete dataset with no missing values")
-                quality_score += 1
             elif missing_percentage < 5:
                 status_info.append("  [OK] Good: Very few missing values (< 5%)")
-                quality_score += 1
             elif missing_percentage < 15:
                 status_info.append("  [!] Fair: Some missing data (5-15%) - may need attention")
             else:
                 status_info.append("  [X] Poor: Significant missing data (> 15%) - preprocessing recommended")
             
             # Check sample size
-            if len(df) >= 1000:
+            if profile.rows >= 1000:
                 status_info.append("  [OK] Good: Large sample size - reliable results expected")
-                quality_score += 1
-            elif len(df) >= 100:
+            elif profile.rows >= 100:
                 status_info.append("  [!] Fair: Moderate sample size - results may vary")
             else:
                 status_info.append("  [X] Small: Limited data - results may be unreliable")
@@ -480,7 +562,6 @@ li.checked::marker {{ content: "\\2612"; }}
             # Check variable balance
             if len(numeric_cols) > 0 and len(categorical_cols) > 0:
                 status_info.append("  [OK] Good: Balanced mix of numerical and categorical data")
-                quality_score += 1
             
             # Overall recommendation
             status_info.append("\n--- RECOMMENDATION ---")
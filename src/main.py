@@ -4,10 +4,10 @@ import sys
 # Forzar el uso de X11 en lugar de Wayland para evitar errores de display
 os.environ['QT_QPA_PLATFORM'] = 'xcb'
 
-from PySide6.QtWidgets import QApplication
-from PySide6.QtGui import QIcon
 from utils.ui_to_py_converter import convert_ui_to_py
-from controller.controller import Controller
+
+# The GUI (Qt, the controllers and Ludwig) is imported in start(): worker processes started with 'spawn'
+# re-import this module as __mp_main__, and must only load the utils they run
 
 def converter():
     base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -21,6 +21,10 @@ def converter():
     convert_ui_to_py(ui_folder, output_folder)
 
 def start():
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QIcon
+    from controller.controller import Controller
+
     app = QApplication(sys.argv)
     
     # Set application-wide icon (affects taskbar and window decorations)
@@ -1,7 +1,6 @@
 # model/model.py
 
 import os
-import pandas as pd
 
 from model.model_start import ModelStart
 from model.model_patient_registry import ModelPatientRegistry
@@ -10,6 +9,12 @@ from model.model_clinical_trial import ModelClinicalTrial
 
 from my_ludwig.ludwig import Ludwig
 from utils.criteria_manager import CriteriaManager
+from utils.column_pruner import prune_columns, describe_pruning
+from utils.leakage_scan import scan_features, describe_leakage
+from utils.dataset_cache import CACHE_DIR_NAME
+from utils.cohort import Cohort
+from utils.dataset_handle import DatasetHandle
+from utils.dataset_profile import class_counts
 
 class Model:
     def __init__(self):
@@ -18,14 +23,16 @@ class Model:
         self.project_name = None
         self.dataset_dir = None
         self.dataset_name = None
-        self.df = None
+        self.dataset = None  # Lazy handle of the current dataset (DatasetHandle)
         self.status = None
         self.option = None
+        self.compact_dtypes = True  # Compact dtypes (downcast, category) after reading a dataset
+        self.normalize_labels = True  # Clean text labels (b'...' wrappers, whitespace, case) after reading a dataset
 
         self.primary_variable = None
         self.criteria = None
         self.criteria_manager = CriteriaManager()
-        self.filtered_df = None  # Store filtered dataset after applying criteria
+        self.cohort = None  # Rows kept by the criteria, as a bitset over the dataset (None if no criteria applied)
 
         self.model_start = ModelStart(self)
         self.model_registry = ModelPatientRegistry(self)
@@ -34,8 +41,52 @@ class Model:
 
         self.ludwig = Ludwig()
     
+    @property
+    def df(self):
+        """ The current dataset as a DataFrame. It is read the first time it is needed. """
+        if self.dataset is None:
+            return None
+        return self.dataset.load()
+
     def update(self):
-        self.df = self.ludwig.read_file(self.dataset_dir)
+        """
+        Opens the current dataset lazily: its schema and row count are available right away,
+        the data itself is read the first time a stage needs it.
+        """
+        cache_dir = os.path.join(self.project_dir, CACHE_DIR_NAME) if self.project_dir else None
+        dataset_dir = self.dataset_dir
+        compact = self.compact_dtypes
+        normalize = self.normalize_labels
+
+        self.dataset = DatasetHandle(
+            dataset_dir,
+            reader=lambda progress=None: self.ludwig.read_file(dataset_dir, cache_dir=cache_dir, progress=progress,
+                                                               compact=compact, normalize=normalize),
+            columnar_path=self.ludwig.columnar_file(dataset_dir, cache_dir, compact=compact, normalize=normalize),
+            preview=lambda nrows: self.ludwig.preview_file(dataset_dir, nrows),
+            estimate_rows=lambda: self.ludwig.estimate_rows(dataset_dir),
+            column_reader=lambda columns: self.ludwig.read_columns(dataset_dir, columns, cache_dir, compact, normalize),
+            profile_loader=lambda: self.ludwig.load_profile(dataset_dir, cache_dir, compact, normalize),
+            profile_saver=lambda profile: self.ludwig.store_profile(dataset_dir, profile, cache_dir, compact, normalize),
+            fingerprinter=lambda: self.ludwig.dataset_fingerprint(dataset_dir, cache_dir, compact, normalize)
+        )
+
+    def required_columns(self, stage):
+        """
+        Returns the columns a pipeline stage needs, in dataset order, or None if it needs all of them.
+
+        :param stage: 'criteria' (variables used by the rules) or 'training' (input features and target).
+        """
+        if stage == 'criteria':
+            needed = {rule.variable for rule in self.criteria_manager.rules}
+        elif stage == 'training':
+            if not self.ludwig.input_features or self.primary_variable is None:
+                return None
+            needed = set(self.ludwig.input_features) | {self.primary_variable}
+        else:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+
+        return [col for col in self.dataset.columns if col in needed]
 
     def autoconfig(self):
         """
@@ -44,13 +95,35 @@ class Model:
         """
         # Use filtered dataset if criteria were applied, otherwise use original
         working_dataset = self.get_working_dataset()
+
+        # Empty, constant and duplicated columns are left out of the generated input features
+        protected = [self.primary_variable] + (self.required_columns('criteria') or [])
+        working_dataset, self.ludwig.pruning_stats = prune_columns(working_dataset, protected)
+        if self.ludwig.pruning_stats['removed_count']:
+            print(f"✅ Pruned columns before autoconfig: {describe_pruning(self.ludwig.pruning_stats)}")
+
+        # Features that leak the target or repeat another feature would only waste hyperopt trials;
+        # numeric columns with many values (per the profile) are binned instead of coded
+        distinct_counts = {column.name: column.distinct_count for column in self.dataset.profile().columns}
+        working_dataset, self.ludwig.leakage_stats = scan_features(working_dataset, self.primary_variable,
+                                                                   codes=self.cohort_codes,
+                                                                   distinct_counts=distinct_counts)
+        if self.ludwig.leakage_stats['removed_count']:
+            print(f"Warning: Features left out before autoconfig: {describe_leakage(self.ludwig.leakage_stats)}")
+        if working_dataset.shape[1] < 2:
+            raise ValueError(
+                f"No input features are left to predict '{self.primary_variable}' "
+                f"(removed: {describe_leakage(self.ludwig.leakage_stats)}). "
+                f"Please choose a different target variable or add variables to the dataset."
+            )
         
         # Temporarily update Ludwig's dataframe to the working dataset
         original_df = self.ludwig.df
         self.ludwig.df = working_dataset
         
         try:
-            self.ludwig.autoconfig(self.primary_variable)
+            # The class balance of the cohort is counted on the target's codes, not on the copied rows
+            self.ludwig.autoconfig(self.primary_variable, target_counts=self.cohort_counts(self.primary_variable))
         finally:
             # Restore original dataframe
             self.ludwig.df = original_df
@@ -65,8 +138,9 @@ class Model:
         Train the model using the filtered dataset (if criteria applied).
         Implements [IS2] Select subpopulations and [IS3] Remove specific instances.
         """
-        # Use filtered dataset if criteria were applied, otherwise use original
-        working_dataset = self.get_working_dataset()
+        # Use filtered dataset if criteria were applied, otherwise use original.
+        # Only the configured input features and the target are handed to Ludwig.
+        working_dataset = self.get_working_dataset(self.required_columns('training'))
         
         # Temporarily update Ludwig's dataframe to the working dataset
         original_df = self.ludwig.df
@@ -86,41 +160,9 @@ class Model:
     def acceptable_stratify_variables(self, min_samples=5, max_categories=10):
         """ Returns a list of variables that are categorical or numeric (suitable for classification or regression). 
         Ensures all variables meet Ludwig's requirements for cross-validation (min 2 samples per class/value).
+        The statistics come from the dataset profile, so the data is not scanned again.
         """
-        acceptable_variables = []
-        total_rows = len(self.df)
-        
-        for col in self.df.columns:
-            # Include categorical variables (for classification)
-            if pd.api.types.is_categorical_dtype(self.df[col]) or self.df[col].dtype == object:
-                counts = self.df[col].value_counts(dropna=True)
-                if len(counts) <= max_categories and (counts >= min_samples).all():
-                    acceptable_variables.append(col)
-            # Include numeric variables (for regression or discrete classification)
-            elif self.df[col].dtype in ['int64', 'float64']:
-                unique_count = self.df[col].nunique(dropna=True)
-                
-                # Check if variable has real decimal values (not just .0)
-                has_decimals = False
-                if self.df[col].dtype == 'float64':
-                    # Check if any value has non-zero decimal part
-                    has_decimals = (self.df[col].dropna() % 1 != 0).any()
-                
-                # Treat as continuous if: has real decimals OR >50% values are unique
-                if has_decimals or unique_count > total_rows * 0.5:
-                    acceptable_variables.append(col)
-                # Otherwise, it's discrete/categorical - check for min 2 samples per value
-                else:
-                    counts = self.df[col].value_counts(dropna=True)
-                    min_count = counts.min()
-                    if min_count >= 2:
-                        acceptable_variables.append(col)
-            # Include boolean variables (for binary classification)
-            elif self.df[col].dtype == 'bool':
-                counts = self.df[col].value_counts(dropna=True)
-                if (counts >= 2).all():  # Both True and False must have at least 2 samples
-                    acceptable_variables.append(col)
-        return acceptable_variables
+        return self.dataset.profile().acceptable_stratify_variables(min_samples, max_categories)
     
     def apply_criteria(self):
         """
@@ -130,22 +172,70 @@ class Model:
         Returns:
             dict: Statistics about the filtering operation
         """
-        if self.df is None:
+        if self.dataset is None:
             raise ValueError("No dataset loaded. Cannot apply criteria.")
         
-        # Apply criteria and get filtered dataset
-        self.filtered_df, statistics = self.criteria_manager.apply_criteria(self.df)
+        # Only the variables used by the rules are read to evaluate them;
+        # rules already evaluated on this dataset reuse their cached masks,
+        # range rules on large datasets are answered from sorted column indexes
+        # and text rules from the cached codes of their columns
+        criteria_df = self.dataset.read_columns(self.required_columns('criteria'))
+        mask, statistics = self.criteria_manager.evaluate(criteria_df, self.dataset.fingerprint(),
+                                                          self.dataset.sorted_index, self.dataset.codes)
+        # The rows are not copied: they are gathered when a stage needs them (see get_working_dataset)
+        self.cohort = Cohort.from_mask(mask)
         
         return statistics
+
+    def _cohort_mask(self):
+        """ Rows of get_working_dataset, which uses the whole dataset (None) when the criteria keep no rows. """
+        if self.cohort is not None and self.cohort.size > 0:
+            return self.cohort.mask()
+        return None
+
+    def cohort_codes(self, variable):
+        """ Cached codes of a variable (see DatasetHandle.codes) for the rows of the working dataset. """
+        codes, labels = self.dataset.codes(variable)
+        mask = self._cohort_mask()
+        return (codes[mask] if mask is not None else codes), labels
+
+    def cohort_counts(self, variable):
+        """
+        Rows of each value of a variable among the rows kept by the criteria (all rows if no criteria applied),
+        most frequent first. Counted on the variable's cached codes with the criteria mask, without copying rows.
+        """
+        codes, labels = self.dataset.codes(variable)
+        return class_counts(codes, labels, self._cohort_mask())
+
+    @property
+    def filtered_df(self):
+        """ Rows of the dataset kept by the criteria (gathered on access), or None if no criteria applied. """
+        if self.cohort is None:
+            return None
+        return self.cohort.take(self.df)
+
+    def filtered_size(self):
+        """ Number of rows kept by the criteria (a popcount, no rows are read), or None if no criteria applied. """
+        if self.cohort is None:
+            return None
+        return self.cohort.size
+
+    def clear_criteria_filter(self):
+        """ Forgets the rows selected by the criteria, so the whole dataset is used. """
+        self.cohort = None
     
-    def get_working_dataset(self):
+    def get_working_dataset(self, columns=None):
         """
         Get the dataset to use for training (filtered if criteria applied, original otherwise).
         
+        Args:
+            columns: Columns to keep (None for all of them)
+        
         Returns:
             pd.DataFrame: The dataset to use
         """
-        if self.filtered_df is not None and len(self.filtered_df) > 0:
-            return self.filtered_df
-        return self.df
+        df = self.dataset.read_columns(columns)
+        if self.cohort is not None and self.cohort.size > 0:
+            return self.cohort.take(df)
+        return df
     
\ No newline at end of file
@@ -1,19 +1,21 @@
 # model/model_start.py
 
-import os, shutil
+import os
 
 from my_ludwig.ludwig import Ludwig
+from utils.dataset_store import DatasetStore, STORE_DIR_NAME
+from utils.redcap_loader import is_data_dictionary
 
 class ModelStart:
     def __init__(self, model):
         self.model = model
         
     def project_list(self):
-        """ Returns a list of projects if the directory exists. """
+        """ Returns a list of projects if the directory exists (hidden folders such as the dataset store are skipped). """
         base_projects_dir = self.model.base_projects_dir
 
         if base_projects_dir is not None and os.path.isdir(base_projects_dir):
-            return os.listdir(base_projects_dir)
+            return [item for item in os.listdir(base_projects_dir) if not item.startswith(".")]
 
     def new_project(self, project_name):
         """ Creates a new project with the given name. """
@@ -39,7 +41,7 @@ class ModelStart:
         self.model.project_name = project_name
 
     def dataset_list(self):
-        """ Returns a list of datasets (files only, no directories) if the directory exists. """
+        """ Returns a list of datasets (files and folders of shards, no hidden entries) if the directory exists. """
         project_dir = self.model.project_dir
 
         if project_dir is not None and os.path.isdir(project_dir):
@@ -48,24 +50,54 @@ class ModelStart:
             if "status.txt" in list_dir:
                 list_dir.remove("status.txt")
             
-            # Filter to show only files, not directories
-            list_dir = [item for item in list_dir if os.path.isfile(os.path.join(project_dir, item))]
+            # Hidden entries (like the dataset cache) and REDCap data dictionaries are not datasets;
+            # folders hold sharded datasets
+            list_dir = [item for item in list_dir if not item.startswith(".") and not is_data_dictionary(item)]
             
             return list_dir
     
+    def _dataset_store(self):
+        """ Returns the dataset store shared by all projects. """
+        return DatasetStore(os.path.join(self.model.base_projects_dir, STORE_DIR_NAME))
+
     def load_dataset(self, origin_path):
-        """ Copy the new dataset to the project directory """
+        """ Add the new dataset to the project directory (a link to its copy in the shared dataset store) """
         project_dir = self.model.project_dir
         dataset_dir = os.path.join(project_dir, os.path.basename(origin_path))
 
-        if not dataset_dir in os.listdir(project_dir):
-            shutil.copy(origin_path, dataset_dir)
-        
-    def set_dataset(self, dataset_name):
-        """ Sets the dataset directory to the given dataset name. """
+        if self._dataset_store().link(origin_path, dataset_dir):
+            print(f"✅ Dataset '{os.path.basename(origin_path)}' added to the project.")
+        else:
+            print(f"Dataset '{os.path.basename(origin_path)}' is already in the project.")
+
+    def load_shards(self, origin_paths, dataset_name):
+        """ Add the shard files of a dataset to a folder of the project directory (linked from the dataset store) """
+        project_dir = self.model.project_dir
+        dataset_dir = os.path.join(project_dir, dataset_name)
+        os.makedirs(dataset_dir, exist_ok=True)
+
+        store = self._dataset_store()
+        for origin_path in origin_paths:
+            store.link(origin_path, os.path.join(dataset_dir, os.path.basename(origin_path)))
+
+    def set_dataset(self, dataset_name, progress=None, load=True, checkpoint=None):
+        """ Sets the dataset directory to the given dataset name.
+        If load is True the dataset is profiled right away (its data is only read if it has no stored profile),
+        otherwise it is read only when first needed.
+        checkpoint is an optional callable called between profiling steps, which may raise to cancel.
+        The previous dataset is kept if reading or profiling fails or is cancelled.
+        """
+        previous = (self.model.dataset_dir, self.model.dataset_name, self.model.dataset)
+
         self.model.dataset_dir = os.path.join(self.model.project_dir, dataset_name)
         self.model.dataset_name = dataset_name
-        self.model.update()
+        try:
+            self.model.update()
+            if load:
+                self.model.dataset.profile(progress, checkpoint)
+        except Exception:
+            self.model.dataset_dir, self.model.dataset_name, self.model.dataset = previous
+            raise
 
     def read_status_from_file(self):
         """ Reads the status file. """
@@ -1,3 +1,4 @@
+import os
 import tkinter as tk
 from tkinter import messagebox
 import pandas as pd
@@ -9,6 +10,13 @@ from sklearn.model_selection import train_test_split
 from ludwig.visualize import compare_performance
 from ludwig.visualize import confusion_matrix
 
+from utils.dataset_cache import DatasetCache
+from utils.dataset_reader import read_dataset_file, estimate_csv_rows, split_compression, open_binary, is_sharded, resolve_shards, sniff_csv_file
+from utils.csv_sniffer import SEPARATOR_CHARACTERS
+from utils.dataset_compactor import COMPACTION_VERSION, compact_dataframe
+from utils.label_normalizer import normalize_labels
+from utils.redcap_loader import find_data_dictionary, read_redcap_export
+
 class Ludwig:
     def __init__(self):
         self.df = None
@@ -16,6 +24,10 @@ class Ludwig:
         self.input_features = None
         self.samples = None
         self.separator = None
+        self.compaction_stats = None
+        self.normalization_stats = None
+        self.pruning_stats = None
+        self.leakage_stats = None
         self.missing_data = None
         self.runtime = None
         self.metric = None
@@ -26,37 +38,194 @@ class Ludwig:
         self.training_time = None
         self.num_trials = None
 
-    def read_file(self, dataset_path):
+    def read_file(self, dataset_path, cache_dir=None, progress=None, compact=False, normalize=False):
         """
         Read the dataframe of a file.
+        If cache_dir is given, a Parquet copy of the parsed file is stored there and reused on later reads.
+        progress is an optional callback receiving (bytes_read, total_bytes) for text formats
+        and SAS/SPSS/Stata files (whose bytes read are estimated from the rows read).
+        If normalize is True, text labels are cleaned (b'...' wrappers, whitespace, case) and stored as categories.
+        If compact is True, dtypes are compacted after parsing and the saving is kept in compaction_stats.
         """
-        if dataset_path.endswith((".csv", ".fwf", ".tsv")):
-            self.df = pd.read_csv(dataset_path, encoding="utf-8")
-        elif dataset_path.endswith((".xlsx", ".xls")):
-            self.df =pd.read_excel(dataset_path)
-        elif dataset_path.endswith((".feather")):
-            self.df = pd.read_feather(dataset_path)
-        elif dataset_path.endswith((".h5", ".hdf5")):
-            self.df = pd.read_hdf(dataset_path)
-        elif dataset_path.endswith((".html", ".htm")):
-            self.df = pd.read_html(dataset_path)[0]
-        elif dataset_path.endswith((".json", ".jsonl")):
-            self.df = pd.read_json(dataset_path)
-        elif dataset_path.endswith((".parquet")):
-            self.df = pd.read_parquet(dataset_path)
-        elif dataset_path.endswith((".pkl", ".pickle")):
-            self.df = pd.read_pickle(dataset_path)
-        elif dataset_path.endswith((".sas7bdat", ".xpt")):
-            self.df = pd.read_sas(dataset_path)
-        elif dataset_path.endswith((".sav")):
-            self.df = pd.read_spss(dataset_path)
-        elif dataset_path.endswith((".dta")):
-            self.df = pd.read_stata(dataset_path)
-        else:
+        cache = self._dataset_cache(dataset_path, cache_dir)
+        variant = self._cache_variant(cache, dataset_path, compact, normalize) if cache is not None else None
+        self.compaction_stats = None
+        self.normalization_stats = None
+
+        if cache is not None:
+            df = cache.load(dataset_path, variant)
+            if df is not None:
+                self.df = df
+                metadata = cache.load_metadata(dataset_path, variant)
+                self.compaction_stats = metadata.get("compaction")
+                self.normalization_stats = metadata.get("normalization")
+                return self.df
+
+        df = self._parse_file(dataset_path, progress, cache_dir)
+        if df is None:
             return
-        
+
+        if normalize:
+            df, self.normalization_stats = normalize_labels(df)
+            if self.normalization_stats['changed_columns']:
+                print(f"✅ Normalised labels of {len(self.normalization_stats['changed_columns'])} columns: "
+                      f"{', '.join(self.normalization_stats['changed_columns'])}")
+
+        if compact:
+            df, self.compaction_stats = compact_dataframe(df)
+            print(f"✅ Compacted dtypes: {self.compaction_stats['memory_saved'] / 1024**2:.2f} MB saved "
+                  f"({self.compaction_stats['saved_percentage']:.1f}%)")
+
+        self.df = df
+        if cache is not None:
+            metadata = {"compaction": self.compaction_stats, "normalization": self.normalization_stats}
+            cache.store(dataset_path, self.df, variant, {key: value for key, value in metadata.items() if value})
+
         return self.df
 
+    def _dataset_cache(self, dataset_path, cache_dir):
+        """ Returns the cache for a dataset file, or None if it should not be cached. """
+        # Columnar sources are already fast to read, so they are not cached
+        if not cache_dir or dataset_path.endswith((".parquet", ".feather")):
+            return None
+        return DatasetCache(cache_dir)
+
+    def _cache_variant(self, cache, dataset_path, compact, normalize=False):
+        """ Name of the cached copy for the given ingest options. """
+        parts = []
+        # A new REDCap data dictionary changes the types of the same export
+        dictionary_path = find_data_dictionary(dataset_path) if dataset_path.endswith(".csv") else None
+        if dictionary_path is not None:
+            parts.append(f"redcap-{cache.fingerprint(dictionary_path)[:12]}")
+        # A separator chosen in the settings replaces the detected one
+        if self._delimiter() is not None:
+            parts.append(f"sep-{self.separator}")
+        if normalize:
+            parts.append("labels")
+        if compact:
+            parts.append(f"compact{COMPACTION_VERSION}")
+        return ".".join(parts) or None
+
+    def dataset_fingerprint(self, dataset_path, cache_dir=None, compact=False, normalize=False):
+        """
+        Returns a key identifying the contents of a dataset as read with the given ingest options,
+        or None if the dataset is not in a project (nowhere to keep the fingerprint index).
+        """
+        if not cache_dir:
+            return None
+        cache = DatasetCache(cache_dir)
+        variant = self._cache_variant(cache, dataset_path, compact, normalize)
+        return ".".join(part for part in (cache.fingerprint(dataset_path), variant) if part)
+
+    def _delimiter(self):
+        """ Delimiter for the separator chosen in the settings, or None to detect it. """
+        return SEPARATOR_CHARACTERS.get(self.separator) if self.separator else None
+
+    def columnar_file(self, dataset_path, cache_dir=None, compact=False, normalize=False):
+        """
+        Returns a Parquet file holding the dataset (the file itself or its cached copy), or None.
+        Its metadata gives the schema and row count without reading the data.
+        """
+        if dataset_path.endswith(".parquet"):
+            return dataset_path
+
+        cache = self._dataset_cache(dataset_path, cache_dir)
+        if cache is None or not cache.enabled:
+            return None
+
+        path = cache.cache_path(cache.fingerprint(dataset_path), self._cache_variant(cache, dataset_path, compact, normalize))
+        return path if os.path.exists(path) else None
+
+    def read_columns(self, dataset_path, columns, cache_dir=None, compact=False, normalize=False):
+        """
+        Reads only the given columns from the columnar form of a dataset (Parquet/Feather file or cached copy).
+        Returns None if the dataset has no columnar form yet.
+        """
+        if dataset_path.endswith(".feather"):
+            df = pd.read_feather(dataset_path, columns=columns)
+        else:
+            path = self.columnar_file(dataset_path, cache_dir, compact, normalize)
+            if path is None:
+                return None
+            df = pd.read_parquet(path, columns=columns)
+            if path != dataset_path:
+                # Cached copies are already normalised and compacted
+                return df
+
+        if normalize:
+            df, _ = normalize_labels(df)
+        if compact:
+            df, _ = compact_dataframe(df)
+        return df
+
+    def load_profile(self, dataset_path, cache_dir=None, compact=False, normalize=False):
+        """
+        Returns the stored profile of a dataset, or None if it has not been profiled with these ingest options.
+        The ingest statistics stored with the cached copy are restored too.
+        """
+        cache = self._dataset_cache(dataset_path, cache_dir)
+        if cache is None:
+            return None
+
+        variant = self._cache_variant(cache, dataset_path, compact, normalize)
+        profile = cache.load_profile(dataset_path, variant)
+        if profile is not None:
+            metadata = cache.load_metadata(dataset_path, variant)
+            self.compaction_stats = metadata.get("compaction")
+            self.normalization_stats = metadata.get("normalization")
+        return profile
+
+    def store_profile(self, dataset_path, profile, cache_dir=None, compact=False, normalize=False):
+        """ Stores the profile of a dataset next to its cached copy. """
+        cache = self._dataset_cache(dataset_path, cache_dir)
+        if cache is not None:
+            cache.store_profile(dataset_path, profile, self._cache_variant(cache, dataset_path, compact, normalize))
+
+    def preview_file(self, dataset_path, nrows):
+        """
+        Reads the first rows of a text dataset without parsing the rest of the file.
+        Returns None for formats that cannot be previewed cheaply.
+        """
+        if is_sharded(dataset_path):
+            # All shards share the schema of the first one
+            return self.preview_file(resolve_shards(dataset_path)[0], nrows)
+
+        dictionary_path = find_data_dictionary(dataset_path) if dataset_path.endswith(".csv") else None
+        if dictionary_path is not None:
+            df = read_redcap_export(dataset_path, dictionary_path, nrows)
+            if df is not None:
+                return df
+
+        base_path, _ = split_compression(dataset_path)
+        if base_path.endswith((".csv", ".tsv")):
+            dialect = sniff_csv_file(dataset_path, self._delimiter())
+            with open_binary(dataset_path) as (stream, _):
+                return pd.read_csv(stream, nrows=nrows, **dialect.read_csv_kwargs())
+        if base_path.endswith(".jsonl"):
+            return pd.read_json(dataset_path, lines=True, nrows=nrows)
+        return None
+
+    def estimate_rows(self, dataset_path):
+        """
+        Estimates the number of rows of a text dataset from its first bytes.
+        Returns None for other formats.
+        """
+        if is_sharded(dataset_path):
+            estimates = [self.estimate_rows(shard) for shard in resolve_shards(dataset_path)]
+            return None if None in estimates else sum(estimates)
+
+        if dataset_path.endswith((".csv", ".tsv")):
+            return estimate_csv_rows(dataset_path)
+        return None
+
+    def _parse_file(self, dataset_path, progress=None, spool_dir=None):
+        """
+        Parse a file into a dataframe according to its extension.
+        SAS/SPSS/Stata files are converted through a temporary Parquet file in spool_dir.
+        CSV/TSV files use the separator chosen in the settings, or the one detected from their first bytes.
+        """
+        return read_dataset_file(dataset_path, progress, spool_dir, self._delimiter())
+
     def auto_train(self, primary_variable):
         """ Automatically trains a model. """
 
@@ -93,33 +262,39 @@ class Ludwig:
         for metric_name, value in eval_stats.items():
             print(f"{metric_name}: {value}")
 
-    def autoconfig(self, target):
+    def autoconfig(self, target, target_counts=None):
         """
         Automatically generates a configuration file.
+        target_counts are the rows of each value of the target in self.df, if already known
+        (e.g. counted on the cohort mask); otherwise they are counted here.
         """
         self.target = target
 
         # Determine if target is continuous or discrete
         is_continuous = False
+
+        # Every check below is derived from the counts of each value
+        counts = target_counts if target_counts is not None else self.df[target].value_counts(dropna=True)
+        # Categories that no longer appear after filtering are reported with a zero count
+        counts = counts[counts > 0]
+        min_count = counts.min()
         
         # Validate that target variable has enough samples per class/value
         # Check if variable is numeric
         if pd.api.types.is_numeric_dtype(self.df[target]):
-            unique_count = self.df[target].nunique(dropna=True)
-            total_count = len(self.df[target].dropna())
+            unique_count = len(counts)
+            total_count = counts.sum()
             
             # Check if variable has real decimal values (not just .0)
             has_decimals = False
-            if self.df[target].dtype == 'float64':
-                has_decimals = (self.df[target].dropna() % 1 != 0).any()
+            if pd.api.types.is_float_dtype(self.df[target]):
+                has_decimals = (counts.index.to_numpy(dtype=float) % 1 != 0).any()
             
             # Treat as continuous if: has real decimals OR >50% values are unique
             if has_decimals or unique_count > total_count * 0.5:
                 is_continuous = True
             else:
                 # It's discrete/categorical - check for values with only 1 sample
-                counts = self.df[target].value_counts(dropna=True)
-                min_count = counts.min()
                 values_with_one = (counts == 1).sum()
                 
                 if min_count < 2:
@@ -130,11 +305,6 @@ class Ludwig:
                     )
         else:
             # For categorical/object types
-            unique_count = self.df[target].nunique(dropna=True)
-            
-            counts = self.df[target].value_counts(dropna=True)
-            min_count = counts.min()
-            
             if min_count < 2:
                 raise ValueError(
                     f"The target variable '{target}' has at least one category with only {min_count} sample(s). "
@@ -13,6 +13,7 @@ file_formats=[
                 ("SPSS files", "*.sav"),
                 ("Stata files", "*.dta"),
                 ("TSV files", "*.tsv"),
+                ("Compressed CSV/TSV/JSON files", "*.gz;*.bz2;*.zst;*.xz"),
                 ("All files", "*.*")
             ]
 
@@ -23,7 +24,7 @@ input_feature_types = ["binary", "number", "category", "bag", "set", "sequence",
 output_feature_types = ["binary", "number", "category", "bag", "set", "sequence", "text", "vector"]
 
 # Punctuation marks to separate columns in datasets
-separators = ["comma", "semicolon", "backslash"]
+separators = ["comma", "semicolon", "tab", "backslash"]
 
 # Options to treat missing data
 missing_data_options = ["fill_with_const", "fill_with_mode", "fill_with_mean", "fill_with_false", "bfill", "ffill", "drop_row"]
@@ -0,0 +1,65 @@
+"""
+Cohort: the rows of a dataset selected by the criteria, held as a packed bitset over the
+unchanged base dataset (one bit per row) instead of a copy of the selected rows.
+Sizes come from a popcount of the bitset; rows are only gathered into a new frame
+when a stage needs one (e.g. the hand-off to Ludwig).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Number of set bits of every byte value
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+class Cohort:
+    """Rows of a base dataset, as a packed bitset."""
+
+    def __init__(self, bits: np.ndarray, rows: int):
+        """
+        Args:
+            bits: Packed bitset (np.packbits order), one bit per row of the base dataset
+            rows: Number of rows of the base dataset
+        """
+        self.bits = bits
+        self.rows = rows
+        self._size = None
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> 'Cohort':
+        """Cohort of the rows where a boolean mask is True."""
+        return cls(np.packbits(mask), len(mask))
+
+    @property
+    def size(self) -> int:
+        """Number of rows in the cohort."""
+        if self._size is None:
+            self._size = int(POPCOUNT[self.bits].sum(dtype=np.int64))
+        return self._size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def mask(self) -> np.ndarray:
+        """Boolean mask over the rows of the base dataset."""
+        return np.unpackbits(self.bits, count=self.rows).view(bool)
+
+    def positions(self) -> np.ndarray:
+        """Positions of the rows of the cohort in the base dataset, in order."""
+        return np.flatnonzero(self.mask())
+
+    def take(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Gather the rows of the cohort into a new frame.
+
+        Args:
+            df: Base dataset (or some of its columns), with all of its rows
+
+        Returns:
+            DataFrame with the rows of the cohort
+        """
+        if len(df) != self.rows:
+            raise ValueError(f"The cohort was selected from {self.rows:,} rows, the dataset has {len(df):,}")
+        if self.size == self.rows:
+            return df
+        return df.take(self.positions())
@@ -0,0 +1,97 @@
+"""
+Pruning of columns that cannot help a model: all-missing, constant and exact duplicates.
+Wide clinical exports (e.g. REDCap 'Complete?' status fields repeated per instrument)
+carry many of them, and each one would otherwise be preprocessed in every training trial.
+"""
+
+import hashlib
+import pandas as pd
+from typing import Any, Dict, Iterable, Tuple
+
+
+def _column_digest(column: pd.Series) -> str:
+    """Digest of the values of a column (row order included, index ignored)."""
+    hashes = pd.util.hash_pandas_object(column, index=False).to_numpy()
+    return hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+
+
+def _same_values(a: pd.Series, b: pd.Series) -> bool:
+    """Confirm that two columns with the same digest hold the same values."""
+    if isinstance(a.dtype, pd.CategoricalDtype) or isinstance(b.dtype, pd.CategoricalDtype):
+        a, b = a.astype(object), b.astype(object)
+    return a.reset_index(drop=True).equals(b.reset_index(drop=True))
+
+
+def prune_columns(df: pd.DataFrame, protected: Iterable[str] = ()) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Drop empty, constant and duplicated columns in a single scan.
+    A column with one value and some missing values is kept, as the missingness may be informative.
+
+    Args:
+        df: DataFrame to prune
+        protected: Columns that are never dropped (e.g. the target and criteria variables)
+
+    Returns:
+        Tuple of (pruned_df, statistics_dict)
+    """
+    protected = set(protected)
+    empty_columns = []
+    constant_columns = []
+    duplicate_columns = {}
+    seen = {}  # digest -> position of the first column with those values
+    removed = set()
+
+    # Protected columns are scanned first so that their duplicates are the ones dropped
+    order = sorted(range(df.shape[1]), key=lambda position: df.columns[position] not in protected)
+    for position in order:
+        name = df.columns[position]
+        column = df.iloc[:, position]
+        is_protected = name in protected
+
+        non_null = column.count()
+        if non_null == 0:
+            if not is_protected:
+                empty_columns.append(name)
+                removed.add(position)
+            continue
+        if non_null == len(column) and column.nunique(dropna=True) == 1:
+            if not is_protected:
+                constant_columns.append(name)
+                removed.add(position)
+            continue
+
+        digest = _column_digest(column)
+        original = seen.get(digest)
+        if original is not None and not is_protected and _same_values(column, df.iloc[:, original]):
+            duplicate_columns[name] = df.columns[original]
+            removed.add(position)
+            continue
+        seen.setdefault(digest, position)
+
+    pruned = df.iloc[:, [position for position in range(df.shape[1]) if position not in removed]]
+
+    statistics = {
+        'original_columns': df.shape[1],
+        'remaining_columns': pruned.shape[1],
+        'removed_count': len(removed),
+        'empty_columns': empty_columns,
+        'constant_columns': constant_columns,
+        'duplicate_columns': duplicate_columns
+    }
+
+    return pruned, statistics
+
+
+def describe_pruning(statistics: Dict[str, Any]) -> str:
+    """Human-readable summary of the columns removed by prune_columns."""
+    if not statistics or statistics['removed_count'] == 0:
+        return "none"
+    parts = []
+    if statistics['empty_columns']:
+        parts.append(f"empty: {', '.join(map(str, statistics['empty_columns']))}")
+    if statistics['constant_columns']:
+        parts.append(f"constant: {', '.join(map(str, statistics['constant_columns']))}")
+    if statistics['duplicate_columns']:
+        duplicates = [f"{duplicate} (= {original})" for duplicate, original in statistics['duplicate_columns'].items()]
+        parts.append(f"duplicate: {', '.join(duplicates)}")
+    return f"{statistics['removed_count']} of {statistics['original_columns']} ({'; '.join(parts)})"
@@ -0,0 +1,186 @@
+"""
+Streaming sketches used to profile very large datasets in bounded memory:
+HyperLogLog for distinct counts, Misra-Gries for the most frequent values and
+a merging t-digest for quantiles. Every sketch is fed column chunks as numpy arrays
+and is exact while the column is small enough to fit in it.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from typing import Any, List, Tuple
+
+# HyperLogLog registers: 2**14 registers (16 KiB) give a relative standard error of 1.04 / sqrt(2**14) ~ 0.8%
+HLL_PRECISION = 14
+
+# Values counted by the frequent-value sketch; counts are exact while a column has at most this many distinct values
+FREQUENT_CAPACITY = 1024
+
+# t-digest compression: at most ~TDIGEST_COMPRESSION centroids, quantile error well below 1% in the tails
+TDIGEST_COMPRESSION = 200
+
+
+def hash_values(values: np.ndarray) -> np.ndarray:
+    """64-bit hashes of the distinct (non-missing) values of a column chunk."""
+    return pd.util.hash_array(values, categorize=False)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Number of significant bits of uint64 values (0 for 0), exact for the full 64-bit range."""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp returns the exponent e with value = m * 2**e and 0.5 <= m < 1, i.e. the bit length
+    high_bits = np.frexp(high)[1]
+    low_bits = np.frexp(low)[1]
+    return np.where(high_bits > 0, high_bits + 32, low_bits)
+
+
+class HyperLogLog:
+    """Distinct count estimate with a relative standard error of 1.04 / sqrt(2**precision)."""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add_hashes(self, hashes: np.ndarray):
+        """Add 64-bit hashes of column values (adding a value twice has no effect)."""
+        if len(hashes) == 0:
+            return
+        shift = np.uint64(64 - self.precision)
+        index = (hashes >> shift).astype(np.intp)
+        remainder = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1-bit in the remaining bits (64 - precision + 1 if they are all 0)
+        rank = (64 - self.precision + 1 - _bit_length(remainder)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog'):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            return m * math.log(m / zeros)
+        return float(raw)
+
+
+class FrequentValues:
+    """
+    Misra-Gries summary of the most frequent values, mergeable across chunks.
+    Counts are lower bounds that undercount by at most `error`; they are exact (error 0)
+    as long as the column never had more than `capacity` distinct values.
+    """
+
+    def __init__(self, capacity: int = FREQUENT_CAPACITY):
+        self.capacity = capacity
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.labels = np.empty(0, dtype=object)
+        self.error = 0
+
+    @property
+    def exact(self) -> bool:
+        return self.error == 0
+
+    def add_counts(self, values: np.ndarray, hashes: np.ndarray, counts: np.ndarray):
+        """
+        Add the distinct values of a column chunk.
+
+        Args:
+            values: Distinct non-missing values of the chunk
+            hashes: Hashes of the values (see hash_values)
+            counts: Number of rows of each value
+        """
+        if len(hashes) == 0:
+            return
+        # The chunk is summarised on its own first (Misra-Gries summaries are mergeable), so the merge stays small
+        hashes, counts, positions, error = self._reduce(hashes, counts, np.arange(len(hashes)))
+        self.error += error
+        labels = np.asarray(values[positions], dtype=object)
+
+        merged, first, inverse = np.unique(np.concatenate([self.keys, hashes]), return_index=True, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts]),
+                                  minlength=len(merged)).astype(np.int64)
+        self.labels = np.concatenate([self.labels, labels])[first]
+        self.keys = merged
+        self.keys, self.counts, self.labels, error = self._reduce(self.keys, self.counts, self.labels)
+        self.error += error
+
+    def _reduce(self, keys: np.ndarray, counts: np.ndarray, payload: np.ndarray):
+        """
+        Keep at most `capacity` values, lowering every count by the (capacity + 1)-th largest one.
+
+        Returns:
+            Tuple of (keys, counts, payload, count subtracted) for the values kept
+        """
+        if len(keys) <= self.capacity:
+            return keys, counts, payload, 0
+        position = len(counts) - self.capacity - 1
+        cut = int(np.partition(counts, position)[position])
+        kept = counts > cut
+        return keys[kept], counts[kept] - cut, payload[kept], cut
+
+    def items(self) -> List[Tuple[Any, int]]:
+        """Tracked values and their counts, most frequent first."""
+        order = np.argsort(-self.counts, kind="stable")
+        return [(self.labels[i], int(self.counts[i])) for i in order]
+
+
+class TDigest:
+    """Merging t-digest: quantile estimates from a bounded number of weighted centroids."""
+
+    def __init__(self, compression: int = TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def add_values(self, values: np.ndarray):
+        """Add the non-missing values of a numeric column chunk."""
+        values = np.sort(np.asarray(values, dtype=np.float64))
+        if len(values) == 0:
+            return
+        self.minimum = min(self.minimum, float(values[0]))
+        self.maximum = max(self.maximum, float(values[-1]))
+        # The existing centroids are inserted into the sorted chunk, which avoids sorting the union again
+        positions = np.searchsorted(values, self.means)
+        means = np.insert(values, positions, self.means)
+        weights = np.insert(np.ones(len(values)), positions, self.weights)
+        self._compress(means, weights)
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """Merge sorted weighted points into centroids."""
+        total = weights.sum()
+        # Scale function k1: centroids near the tails hold fewer points, so extreme quantiles stay accurate
+        cumulative = np.cumsum(weights) - weights / 2
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * cumulative / total - 1, -1, 1))
+        bucket = np.floor(k - k[0]).astype(np.intp)
+        # Buckets are non-decreasing along the sorted points, so their ranks follow from where they change
+        bucket = np.cumsum(np.r_[0, np.diff(bucket) != 0])
+        merged_weights = np.bincount(bucket, weights=weights)
+        self.means = np.bincount(bucket, weights=means * weights) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q: float) -> float:
+        """Estimated value at quantile q (0 to 1), NaN if no values were added."""
+        if len(self.means) == 0:
+            return float("nan")
+        if len(self.means) == 1:
+            return float(self.means[0])
+        position = q * self.count
+        centres = np.cumsum(self.weights) - self.weights / 2
+        xs = np.concatenate([[0.0], centres, [self.count]])
+        ys = np.concatenate([[self.minimum], self.means, [self.maximum]])
+        return float(np.interp(position, xs, ys))
@@ -3,8 +3,43 @@ Criteria Manager for handling inclusion/exclusion criteria in clinical datasets.
 Implements [IS2] Select subpopulations and [IS3] Remove specific instances.
 """
 
+import math
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Callable, Hashable, Iterator, Optional, Tuple
+
+from utils.cohort import Cohort
+from utils.dataset_compactor import parse_boolean_label
+from utils.dataset_profile import column_codes
+from utils.sorted_index import SortedIndex, range_arguments
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# Arrays numexpr can take in one expression; larger rule sets are evaluated in groups
+NUMEXPR_MAX_OPERANDS = 24
+
+# numexpr is used with at least this many threads; on fewer cores numpy's SIMD comparisons are faster
+NUMEXPR_MIN_THREADS = 4
+
+# Memory kept for the masks of evaluated rules, packed one bit per row (the least recently used are dropped first)
+MASK_CACHE_BYTES = 256 * 1024 ** 2
+
+# Comparisons compiled into vectorized expressions, with their numpy equivalents
+COMPARISONS = {
+    '==': np.equal,
+    '!=': np.not_equal,
+    '>': np.greater,
+    '<': np.less,
+    '>=': np.greater_equal,
+    '<=': np.less_equal,
+}
+
+IndexProvider = Callable[[str], Optional[SortedIndex]]
+CodesProvider = Callable[[str], Tuple[np.ndarray, pd.Index]]
 
 
 class CriteriaRule:
@@ -50,23 +85,31 @@ class CriteriaRule:
         
         column = df[self.variable]
         
+        # REDCap yes/no and checkbox fields are read as booleans, and are still filtered by their labels
+        if pd.api.types.is_bool_dtype(column) and parse_boolean_label(self.value) is not None:
+            value = parse_boolean_label(self.value)
+            if self.operator in ('equals', 'contains'):
+                return column == value
+            if self.operator in ('not equals', 'not contains'):
+                return column != value
+        
         # Handle different operators
         if self.operator == 'equals':
             mask = column == self.value
         elif self.operator == 'not equals':
             mask = column != self.value
         elif self.operator == 'greater than':
-            mask = column > float(self.value)
+            mask = column > self._bound(column, self.value)
         elif self.operator == 'less than':
-            mask = column < float(self.value)
+            mask = column < self._bound(column, self.value)
         elif self.operator == 'greater or equal':
-            mask = column >= float(self.value)
+            mask = column >= self._bound(column, self.value)
         elif self.operator == 'less or equal':
-            mask = column <= float(self.value)
+            mask = column <= self._bound(column, self.value)
         elif self.operator == 'between':
             # Value should be a tuple (min, max)
             if isinstance(self.value, (tuple, list)) and len(self.value) == 2:
-                min_val, max_val = float(self.value[0]), float(self.value[1])
+                min_val, max_val = self._bound(column, self.value[0]), self._bound(column, self.value[1])
                 mask = (column >= min_val) & (column <= max_val)
             else:
                 raise ValueError(f"'between' operator requires a tuple/list of two values, got: {self.value}")
@@ -78,7 +121,66 @@ class CriteriaRule:
             raise ValueError(f"Unknown operator: {self.operator}")
         
         return mask
+
+    @staticmethod
+    def _bound(column: pd.Series, value: Any) -> Any:
+        """Value of a range comparison: a timestamp for date columns (date windows), a number otherwise."""
+        if pd.api.types.is_datetime64_any_dtype(column):
+            return pd.Timestamp(value)
+        return float(value)
+
+    def compile(self, df: pd.DataFrame) -> Optional[List[Tuple[str, Any]]]:
+        """
+        Express the rule as comparisons of its column with constants, all of which must hold,
+        so that it can be evaluated with the other rules in one vectorized expression.
+        
+        Args:
+            df: DataFrame the rule will be evaluated on
+            
+        Returns:
+            List of (comparison, constant), or None if the rule has to be evaluated with apply
+            (text matching, non-numeric or nullable columns, values that are not numbers)
+        """
+        if self.variable not in df.columns:
+            return None
+        column = df[self.variable]
+        if not isinstance(column, pd.Series) or not isinstance(column.dtype, np.dtype):
+            return None
+
+        if column.dtype == bool:
+            value = parse_boolean_label(self.value)
+            if value is None:
+                return None
+            if self.operator in ('equals', 'contains'):
+                return [('==', value)]
+            if self.operator in ('not equals', 'not contains'):
+                return [('!=', value)]
+            return None
+
+        if not (pd.api.types.is_integer_dtype(column) or pd.api.types.is_float_dtype(column)):
+            return None
+        try:
+            if self.operator in ('equals', 'not equals'):
+                # apply compares with the value as given, so only numbers are compiled
+                if isinstance(self.value, bool) or not isinstance(self.value, (int, float)):
+                    return None
+                terms = [(self.OPERATORS[self.operator], float(self.value))]
+            elif self.operator in ('greater than', 'less than', 'greater or equal', 'less or equal'):
+                terms = [(self.OPERATORS[self.operator], float(self.value))]
+            elif self.operator == 'between' and isinstance(self.value, (tuple, list)) and len(self.value) == 2:
+                terms = [('>=', float(self.value[0])), ('<=', float(self.value[1]))]
+            else:
+                return None
+        except (TypeError, ValueError):
+            return None
+        if not all(math.isfinite(value) for _, value in terms):
+            return None
+        return terms
     
+    def cache_key(self) -> Tuple[str, str, Hashable]:
+        """Identity of the rows the rule selects: (variable, operator, normalised value)."""
+        return self.variable, self.operator, _normalize_value(self.value)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert rule to dictionary for serialization."""
         return {
@@ -104,6 +206,242 @@ class CriteriaRule:
         return f"{rule_symbol} {self.variable} {self.operator} {self.value}"
 
 
+def _normalize_value(value: Any) -> Hashable:
+    """Rule value as a hashable key: numbers as floats (30 and 30.0 select the same rows), text stripped."""
+    if isinstance(value, (tuple, list)):
+        return tuple(_normalize_value(item) for item in value)
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    return str(value).strip()
+
+
+class MaskCache:
+    """
+    Masks of evaluated rules, with least-recently-used eviction under a memory budget.
+    Masks are kept packed as bitsets (see cohort.Cohort), so the budget holds eight times more rules.
+    """
+
+    def __init__(self, max_bytes: int = MASK_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.masks: "OrderedDict[Hashable, Cohort]" = OrderedDict()
+        self.size_bytes = 0
+
+    def get(self, key: Hashable, rows: int) -> Optional[np.ndarray]:
+        """Cached mask of a rule (unpacked), or None if it is not cached for a dataset of this many rows."""
+        rows_matched = self.masks.get(key)
+        if rows_matched is None or rows_matched.rows != rows:
+            return None
+        self.masks.move_to_end(key)
+        return rows_matched.mask()
+
+    def put(self, key: Hashable, mask: np.ndarray):
+        rows_matched = Cohort.from_mask(mask)
+        if rows_matched.bits.nbytes > self.max_bytes:
+            return
+        if key in self.masks:
+            self.size_bytes -= self.masks.pop(key).bits.nbytes
+        self.masks[key] = rows_matched
+        self.size_bytes += rows_matched.bits.nbytes
+        while self.size_bytes > self.max_bytes:
+            _, evicted = self.masks.popitem(last=False)
+            self.size_bytes -= evicted.bits.nbytes
+
+    def clear(self):
+        self.masks.clear()
+        self.size_bytes = 0
+
+
+def _numexpr_array(values: np.ndarray) -> np.ndarray:
+    """Column values in a type numexpr supports (compacted small integers are widened)."""
+    if values.dtype == bool or values.dtype in (np.int32, np.int64, np.float32, np.float64):
+        return values
+    if pd.api.types.is_float_dtype(values.dtype):
+        return values.astype(np.float32)
+    return values.astype(np.int64 if values.dtype == np.uint32 or values.dtype.itemsize >= 4 else np.int32)
+
+
+def _rule_expression(terms: List[Tuple[str, Any]], name: str) -> str:
+    return " & ".join(f"({name} {comparison} {value!r})" for comparison, value in terms)
+
+
+def _compare(values: np.ndarray, terms: List[Tuple[str, Any]], out: np.ndarray, buffer: np.ndarray):
+    """Write the rows where all the comparisons of a compiled rule hold into out, using buffer for the others."""
+    comparison, value = terms[0]
+    COMPARISONS[comparison](values, value, out=out)
+    for comparison, value in terms[1:]:
+        COMPARISONS[comparison](values, value, out=buffer)
+        out &= buffer
+
+
+def _use_numexpr() -> bool:
+    # numexpr is only faster than numpy's SIMD comparisons with several threads
+    return numexpr is not None and numexpr.nthreads >= NUMEXPR_MIN_THREADS
+
+
+def _evaluate_compiled(df: pd.DataFrame, compiled: List[Tuple[CriteriaRule, List[Tuple[str, Any]]]],
+                       inclusion: bool, mask: np.ndarray):
+    """
+    Fold compiled rules into a mask in place: OR of the inclusion rules, or AND NOT of the exclusion rules.
+    With numexpr (on multi-core machines) each group of rules is one single-pass multithreaded expression;
+    otherwise every comparison is written into one reused buffer, so no temporary mask is allocated per rule.
+    """
+    if _use_numexpr():
+        for start in range(0, len(compiled), NUMEXPR_MAX_OPERANDS):
+            group = compiled[start:start + NUMEXPR_MAX_OPERANDS]
+            names = {}
+            for rule, _ in group:
+                names.setdefault(rule.variable, f"c{len(names)}")
+            parts = [f"({_rule_expression(terms, names[rule.variable])})" for rule, terms in group]
+            if inclusion:
+                expression = "mask | " + " | ".join(parts)
+            else:
+                expression = "mask & ~(" + " | ".join(parts) + ")"
+            arrays = {name: _numexpr_array(df[variable].to_numpy()) for variable, name in names.items()}
+            arrays['mask'] = mask
+            numexpr.evaluate(expression, local_dict=arrays, out=mask)
+        return
+
+    rule_mask = np.empty(len(mask), dtype=bool)
+    term_mask = np.empty(len(mask), dtype=bool)
+    for rule, terms in compiled:
+        _compare(df[rule.variable].to_numpy(), terms, rule_mask, term_mask)
+        _fold(mask, rule_mask, inclusion)
+
+
+def _compiled_masks(df: pd.DataFrame, compiled: List[Tuple[CriteriaRule, List[Tuple[str, Any]]]]) -> Iterator[np.ndarray]:
+    """
+    Mask of each compiled rule in turn, for rules whose masks are cached separately.
+    Each mask is written in place, by one multithreaded numexpr expression (on multi-core machines)
+    or by numpy comparisons with one reused buffer; columns are converted once for all their rules.
+    """
+    if _use_numexpr():
+        arrays = {}
+        for rule, terms in compiled:
+            if rule.variable not in arrays:
+                arrays[rule.variable] = _numexpr_array(df[rule.variable].to_numpy())
+            mask = np.empty(len(df), dtype=bool)
+            numexpr.evaluate(_rule_expression(terms, "c"), local_dict={'c': arrays[rule.variable]}, out=mask)
+            yield mask
+        return
+
+    term_mask = np.empty(len(df), dtype=bool)
+    for rule, terms in compiled:
+        mask = np.empty(len(df), dtype=bool)
+        _compare(df[rule.variable].to_numpy(), terms, mask, term_mask)
+        yield mask
+
+
+def _indexed_mask(df: pd.DataFrame, rule: CriteriaRule, indexes: Optional[IndexProvider]) -> Optional[np.ndarray]:
+    """
+    Rows matched by a range rule (greater than, between, numeric equals...), answered from the sorted index
+    of its column with two binary searches; None if the rule is not a range or its column has no index.
+    """
+    if indexes is None or rule.variable not in df.columns:
+        return None
+    arguments = range_arguments(rule.operator, rule.value)
+    if arguments is None:
+        return None
+    index = indexes(rule.variable)
+    if index is None or index.rows != len(df):
+        return None
+    return index.mask(*arguments)
+
+
+def _dictionary_mask(df: pd.DataFrame, rule: CriteriaRule, codes: Optional[CodesProvider]) -> Optional[np.ndarray]:
+    """
+    Rows matched by an equals or contains rule on a text or categorical column (contains on any column),
+    evaluated once per distinct value of the column and mapped to the rows through its integer codes.
+    Missing values match neither a value nor a text, so they pass 'not equals' and 'not contains' only.
+    None if the rule is better evaluated otherwise (comparisons of numbers, booleans or dates).
+    """
+    if rule.variable not in df.columns:
+        return None
+    column = df[rule.variable]
+    if not isinstance(column, pd.Series) or pd.api.types.is_bool_dtype(column):
+        return None
+    if rule.operator in ('equals', 'not equals'):
+        if not isinstance(column.dtype, pd.CategoricalDtype) and (pd.api.types.is_numeric_dtype(column)
+                                                                  or pd.api.types.is_datetime64_any_dtype(column)):
+            return None
+    elif rule.operator not in ('contains', 'not contains'):
+        return None
+
+    row_codes, labels = codes(rule.variable) if codes is not None else column_codes(column)
+    if len(row_codes) != len(df):
+        row_codes, labels = column_codes(column)
+    # The rule is applied to the distinct values; the last entry is looked up by the missing code -1
+    matched = rule.apply(pd.DataFrame({rule.variable: labels})).to_numpy(dtype=bool)
+    lookup = np.append(matched, rule.operator in ('not equals', 'not contains'))
+    return lookup[row_codes]
+
+
+def _fold(mask: np.ndarray, rule_mask: np.ndarray, inclusion: bool):
+    """Fold a rule's mask in place: OR for inclusion rules, AND NOT for exclusion rules."""
+    if inclusion:
+        mask |= rule_mask
+    else:
+        # For exclusion, we keep rows that DON'T match the rule
+        mask &= ~rule_mask
+
+
+def _evaluate_rules(df: pd.DataFrame, inclusion_rules: List[CriteriaRule], exclusion_rules: List[CriteriaRule],
+                    cache: Optional[MaskCache] = None, dataset_key: Optional[str] = None,
+                    indexes: Optional[IndexProvider] = None, codes: Optional[CodesProvider] = None) -> np.ndarray:
+    """
+    Rows kept by the rules: any inclusion rule passes and no exclusion rule matches.
+    Range rules on columns with a sorted index are answered from the index instead of a scan,
+    and equals/contains rules on text columns are evaluated on the distinct values of the column.
+    The other rules that compile to comparisons are evaluated together and the rest one by one with apply.
+    With a cache (and a key for the dataset), each rule's mask is kept, so only new or edited rules are
+    evaluated (still in one batch) and the rest is a bitwise fold over cached masks.
+    A rule that cannot be applied is skipped with a warning.
+    """
+    final_mask = np.ones(len(df), dtype=bool)
+    cached = cache is not None and dataset_key is not None
+
+    for rules, inclusion in ((inclusion_rules, True), (exclusion_rules, False)):
+        if not rules:
+            continue
+        mask = np.zeros(len(df), dtype=bool) if inclusion else final_mask
+        compiled = []
+        keys = []
+        for rule in rules:
+            try:
+                key = (dataset_key,) + rule.cache_key() if cached else None
+                rule_mask = cache.get(key, len(df)) if cached else None
+                if rule_mask is None:
+                    rule_mask = _indexed_mask(df, rule, indexes)
+                    if rule_mask is None:
+                        rule_mask = _dictionary_mask(df, rule, codes)
+                    if rule_mask is None:
+                        terms = rule.compile(df)
+                        if terms is not None:
+                            compiled.append((rule, terms))
+                            keys.append(key)
+                            continue
+                        # Missing values of nullable columns (Int64, boolean, string) do not match
+                        rule_mask = rule.apply(df).to_numpy(dtype=bool, na_value=False)
+                    if cached:
+                        cache.put(key, rule_mask)
+                _fold(mask, rule_mask, inclusion)
+            except Exception as e:
+                print(f"Warning: Could not apply {'inclusion' if inclusion else 'exclusion'} rule {rule}: {e}")
+
+        if cached and compiled:
+            # Each compiled rule gets its own mask, so that it can be cached
+            for key, rule_mask in zip(keys, _compiled_masks(df, compiled)):
+                cache.put(key, rule_mask)
+                _fold(mask, rule_mask, inclusion)
+        else:
+            _evaluate_compiled(df, compiled, inclusion, mask)
+        if inclusion:
+            final_mask &= mask
+
+    return final_mask
+
+
 class CriteriaManager:
     """Manages all inclusion and exclusion criteria for a dataset."""
     
@@ -111,6 +449,8 @@ class CriteriaManager:
         self.rules: List[CriteriaRule] = []
         self.original_size = 0
         self.filtered_size = 0
+        # Kept when rules are cleared, so re-adding unchanged rules does not evaluate them again
+        self.mask_cache = MaskCache()
     
     def add_rule(self, variable: str, operator: str, value: Any, rule_type: str = 'inclusion'):
         """Add a new criteria rule."""
@@ -139,11 +479,32 @@ class CriteriaManager:
         Returns:
             Tuple of (filtered_df, statistics_dict)
         """
+        mask, statistics = self.evaluate(df)
+        return df[mask].copy(), statistics
+
+    def evaluate(self, df: pd.DataFrame, dataset_key: Optional[str] = None,
+                 indexes: Optional[IndexProvider] = None,
+                 codes: Optional[CodesProvider] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Evaluate all criteria rules on a dataframe without copying the selected rows.
+        
+        Args:
+            df: Original dataframe
+            dataset_key: Fingerprint of the dataset contents; when given, the mask of each rule is cached
+                under it and reused the next time the same rule is evaluated on the same data
+            indexes: Optional callable returning the sorted index of a column over the rows of df
+                (or None if it has none), used to answer range rules without scanning the column
+            codes: Optional callable returning the codes of a column for the rows of df (see dataset_profile.column_codes),
+                e.g. cached per dataset; codes are computed from df otherwise
+            
+        Returns:
+            Tuple of (boolean mask of the rows kept, statistics_dict)
+        """
         self.original_size = len(df)
         
         if not self.rules:
             self.filtered_size = self.original_size
-            return df.copy(), {
+            return np.ones(len(df), dtype=bool), {
                 'original_size': self.original_size,
                 'filtered_size': self.filtered_size,
                 'removed_count': 0,
@@ -155,29 +516,11 @@ class CriteriaManager:
         inclusion_rules = [r for r in self.rules if r.rule_type == 'inclusion']
         exclusion_rules = [r for r in self.rules if r.rule_type == 'exclusion']
         
-        # Start with all rows
-        final_mask = pd.Series([True] * len(df), index=df.index)
-        
-        # Apply inclusion rules (OR logic)
-        if inclusion_rules:
-            inclusion_mask = pd.Series([False] * len(df), index=df.index)
-            for rule in inclusion_rules:
-                try:
-                    inclusion_mask |= rule.apply(df)
-                except Exception as e:
-                    print(f"Warning: Could not apply inclusion rule {rule}: {e}")
-            final_mask &= inclusion_mask
-        
-        # Apply exclusion rules (AND logic - must pass all exclusions)
-        for rule in exclusion_rules:
-            try:
-                # For exclusion, we keep rows that DON'T match the rule
-                final_mask &= ~rule.apply(df)
-            except Exception as e:
-                print(f"Warning: Could not apply exclusion rule {rule}: {e}")
+        # Inclusion rules (OR logic) and exclusion rules (AND logic - must pass all exclusions)
+        final_mask = _evaluate_rules(df, inclusion_rules, exclusion_rules, self.mask_cache, dataset_key,
+                                     indexes, codes)
         
-        filtered_df = df[final_mask].copy()
-        self.filtered_size = len(filtered_df)
+        self.filtered_size = int(final_mask.sum())
         
         removed_count = self.original_size - self.filtered_size
         removal_percentage = (removed_count / self.original_size * 100) if self.original_size > 0 else 0
@@ -192,7 +535,7 @@ class CriteriaManager:
             'exclusion_rules': len(exclusion_rules)
         }
         
-        return filtered_df, statistics
+        return final_mask, statistics
     
     def get_summary(self) -> str:
         """Get a human-readable summary of criteria."""
@@ -0,0 +1,234 @@
+"""
+Detection of the dialect of delimited text files from their first bytes:
+encoding (including byte order marks), delimiter, decimal separator and header row.
+The detected options are passed to the CSV reader so every file is parsed in a single pass.
+"""
+
+import io
+import re
+import csv
+import codecs
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bytes read from the start of a file to detect its dialect
+SNIFF_BYTES = 64 * 1024
+
+# Maximum number of records inspected
+SNIFF_RECORDS = 200
+
+# Separator names offered in the settings (ludwig_data.separators) and the character they stand for
+SEPARATOR_CHARACTERS = {
+    "comma": ",",
+    "semicolon": ";",
+    "tab": "\t",
+    "backslash": "\\",
+}
+
+# Delimiters tried when none is given, in order of preference on ties
+CANDIDATE_DELIMITERS = [",", ";", "\t", "|", "\\"]
+
+# Byte order marks and the encoding that strips them
+BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+COMMA_DECIMAL = re.compile(r"^[-+]?\d+,\d+$")
+DOT_DECIMAL = re.compile(r"^[-+]?\d*\.\d+$")
+NUMBER = re.compile(r"^[-+]?(\d+([.,]\d*)?|[.,]\d+)([eE][-+]?\d+)?$")
+
+
+class CsvDialect:
+    """Options needed to parse a delimited text file."""
+
+    def __init__(self, delimiter: str = ",", encoding: str = "utf-8", decimal: str = ".",
+                 header_row: Optional[int] = 0, skip_rows: int = 0, field_count: Optional[int] = None):
+        """
+        Args:
+            delimiter: Character separating the fields
+            encoding: Text encoding of the file
+            decimal: Decimal separator of numbers
+            header_row: Record holding the column names, counted after skip_rows (None if there is no header)
+            skip_rows: Lines before the table (titles or notes written by some exporters)
+            field_count: Number of fields per record, used to name the columns of files without a header
+        """
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.decimal = decimal
+        self.header_row = header_row
+        self.skip_rows = skip_rows
+        self.field_count = field_count
+
+    def read_csv_kwargs(self) -> Dict[str, Any]:
+        """Arguments for pd.read_csv."""
+        kwargs = {
+            "sep": self.delimiter,
+            "encoding": self.encoding,
+            "decimal": self.decimal,
+            "header": self.header_row,
+        }
+        if self.skip_rows:
+            kwargs["skiprows"] = self.skip_rows
+        if self.header_row is None and self.field_count:
+            kwargs["names"] = [f"column_{i + 1}" for i in range(self.field_count)]
+        return kwargs
+
+    def describe(self) -> str:
+        """Human-readable description of the dialect."""
+        names = {value: name for name, value in SEPARATOR_CHARACTERS.items()}
+        text = f"{names.get(self.delimiter, repr(self.delimiter))}-separated, {self.encoding}, decimal '{self.decimal}'"
+        if self.header_row is None:
+            text += ", no header"
+        if self.skip_rows:
+            text += f", {self.skip_rows} leading lines skipped"
+        return text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'delimiter': self.delimiter,
+            'encoding': self.encoding,
+            'decimal': self.decimal,
+            'header_row': self.header_row,
+            'skip_rows': self.skip_rows,
+            'field_count': self.field_count
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CsvDialect':
+        return cls(**data)
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Detect the text encoding of the first bytes of a file.
+
+    Returns:
+        'utf-8-sig'/'utf-16' when there is a byte order mark, 'utf-8' if the bytes decode as UTF-8,
+        otherwise 'cp1252' (Excel's default on Western European systems) or 'latin-1'
+    """
+    for bom, encoding in BYTE_ORDER_MARKS:
+        if sample.startswith(bom):
+            return encoding
+
+    for encoding in ("utf-8", "cp1252"):
+        # Incremental decoding tolerates a character cut at the end of the sample
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def _parse_records(text: str, delimiter: str, complete: bool = False) -> List[List[str]]:
+    """Split sampled text into records, dropping the last one when the sample was cut (it may be partial)."""
+    lines = text.splitlines(keepends=True)
+    if len(lines) > 1 and not complete:
+        lines = lines[:-1]
+    reader = csv.reader(io.StringIO("".join(lines[:SNIFF_RECORDS])), delimiter=delimiter)
+    return [record for record in reader if record]
+
+
+def _table_fields(records: List[List[str]]) -> Tuple[int, int]:
+    """
+    Most common field count of the records and its frequency.
+    Ties go to the larger field count: in short files, title lines (one field) may be as many as the data rows.
+    """
+    counts = Counter(len(record) for record in records)
+    fields, frequency = max(counts.items(), key=lambda item: (item[1], item[0]))
+    return fields, frequency
+
+
+def _delimiter_score(records: List[List[str]]) -> tuple:
+    """Share of records with the most common field count, and that field count."""
+    if not records:
+        return (0.0, 0)
+    fields, frequency = _table_fields(records)
+    if fields < 2:
+        return (0.0, 0)
+    return (frequency / len(records), fields)
+
+
+def _detect_delimiter(text: str, complete: bool) -> str:
+    best, best_score = CANDIDATE_DELIMITERS[0], (0.0, 0)
+    for delimiter in CANDIDATE_DELIMITERS:
+        if delimiter not in text:
+            continue
+        score = _delimiter_score(_parse_records(text, delimiter, complete))
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+
+def _detect_decimal(records: List[List[str]]) -> str:
+    """Use ',' as the decimal separator only when decimals are written with commas and never with dots."""
+    values = [value.strip() for record in records for value in record]
+    comma = sum(1 for value in values if COMMA_DECIMAL.match(value))
+    dot = sum(1 for value in values if DOT_DECIMAL.match(value))
+    return "," if comma > 0 and dot == 0 else "."
+
+
+def _is_number(value: str) -> bool:
+    return bool(NUMBER.match(value.strip()))
+
+
+def _has_header(first: List[str], rows: List[List[str]]) -> bool:
+    """A first record is data, not names, if it is numeric in every mostly-numeric column."""
+    numeric_columns = []
+    for position in range(len(first)):
+        values = [row[position] for row in rows if position < len(row) and row[position].strip()]
+        if values and sum(_is_number(value) for value in values) >= 0.8 * len(values):
+            numeric_columns.append(position)
+    if not numeric_columns:
+        return True
+    return not all(_is_number(first[position]) for position in numeric_columns)
+
+
+def sniff_csv(sample: bytes, delimiter: Optional[str] = None, complete: Optional[bool] = None) -> CsvDialect:
+    """
+    Detect the dialect of a delimited text file from its first bytes.
+
+    Args:
+        sample: First bytes of the (decompressed) file
+        delimiter: Delimiter to use instead of detecting it
+        complete: Whether the sample is the whole file (None: if it is shorter than SNIFF_BYTES)
+
+    Returns:
+        The detected dialect
+    """
+    if complete is None:
+        complete = len(sample) < SNIFF_BYTES
+    encoding = detect_encoding(sample)
+    text = codecs.getincrementaldecoder(encoding)(errors="replace").decode(sample, final=complete)
+
+    if delimiter is None:
+        delimiter = _detect_delimiter(text, complete)
+    records = _parse_records(text, delimiter, complete)
+    if not records:
+        return CsvDialect(delimiter=delimiter, encoding=encoding)
+
+    # Leading lines with a different number of fields than the table are titles or notes
+    fields, _ = _table_fields(records)
+    first = next(i for i, record in enumerate(records) if len(record) == fields)
+    skip_rows = 0
+    if first > 0:
+        # Count physical lines, as pd.read_csv does for skiprows
+        for i, line in enumerate(text.splitlines()):
+            if len(next(csv.reader([line], delimiter=delimiter), [])) == fields:
+                skip_rows = i
+                break
+
+    table = records[first:]
+    header_row = 0 if _has_header(table[0], table[1:]) else None
+    data = table[1:] if header_row == 0 else table
+
+    return CsvDialect(
+        delimiter=delimiter,
+        encoding=encoding,
+        decimal=_detect_decimal(data),
+        header_row=header_row,
+        skip_rows=skip_rows,
+        field_count=fields
+    )
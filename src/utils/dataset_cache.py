@@ -0,0 +1,272 @@
+"""
+Columnar dataset cache for ingested files.
+Stores a Parquet copy of every parsed dataset inside the project so that
+reopening a project does not re-parse CSV/Excel/SAS/SPSS files.
+"""
+
+import os
+import json
+import hashlib
+import pandas as pd
+from typing import Optional, Dict, Any
+
+from utils.dataset_reader import SHARDS_EXTENSION, resolve_shards
+
+try:
+    import pyarrow  # noqa: F401 - required by pandas for Parquet I/O
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+CACHE_DIR_NAME = ".cache"
+INDEX_FILE_NAME = "index.json"
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    Compute a content fingerprint of a file.
+
+    Args:
+        path: Path of the file to hash
+
+    Returns:
+        Hex digest identifying the file contents
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """Parquet cache of parsed datasets, keyed by content fingerprint and mtime."""
+
+    def __init__(self, cache_dir: str):
+        """
+        Args:
+            cache_dir: Directory where cached copies and the index are stored
+        """
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, INDEX_FILE_NAME)
+        self._index: Optional[Dict[str, Any]] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache can be used (Parquet support is installed)."""
+        return PARQUET_AVAILABLE
+
+    def _read_index(self) -> Dict[str, Any]:
+        if self._index is None:
+            self._index = {}
+            if os.path.exists(self.index_path):
+                try:
+                    with open(self.index_path, "r", encoding="utf-8") as f:
+                        self._index = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Warning: Could not read dataset cache index: {e}")
+        return self._index
+
+    def _write_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._read_index(), f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def fingerprint(self, source_path: str) -> str:
+        """
+        Return the content fingerprint of a source file (or of all the shards of a sharded dataset).
+        A file is only re-hashed when its size or mtime changed since the last call.
+
+        Args:
+            source_path: Path of the original dataset file
+
+        Returns:
+            Hex digest identifying the file contents
+        """
+        if os.path.isdir(source_path) or source_path.endswith(SHARDS_EXTENSION):
+            # A sharded dataset changes when any shard is added, removed or modified
+            digest = hashlib.blake2b(digest_size=16)
+            for shard in resolve_shards(source_path):
+                digest.update(os.path.basename(shard).encode("utf-8"))
+                digest.update(self.fingerprint(shard).encode("ascii"))
+            return digest.hexdigest()
+
+        stat = os.stat(source_path)
+        key = os.path.abspath(source_path)
+        entry = self._read_index().get(key)
+
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["fingerprint"]
+
+        fingerprint = file_fingerprint(source_path)
+        self.remember(source_path, fingerprint)
+        return fingerprint
+
+    def remember(self, source_path: str, fingerprint: str):
+        """
+        Record the fingerprint of a file whose contents are known (e.g. a copy of a fingerprinted file),
+        so that it is not hashed while its size and mtime are unchanged.
+        """
+        stat = os.stat(source_path)
+        self._read_index()[os.path.abspath(source_path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "fingerprint": fingerprint
+        }
+        try:
+            self._write_index()
+        except OSError as e:
+            print(f"Warning: Could not write dataset cache index: {e}")
+
+    def forget_missing(self):
+        """Drop the index entries of files that no longer exist."""
+        index = self._read_index()
+        missing = [key for key in index if not os.path.exists(key)]
+        if not missing:
+            return
+        for key in missing:
+            del index[key]
+        try:
+            self._write_index()
+        except OSError as e:
+            print(f"Warning: Could not write dataset cache index: {e}")
+
+    def cache_path(self, fingerprint: str, variant: Optional[str] = None) -> str:
+        """Path of the cached Parquet copy for a fingerprint and ingest variant."""
+        stem = f"{fingerprint}.{variant}" if variant else fingerprint
+        return os.path.join(self.cache_dir, f"{stem}.parquet")
+
+    def metadata_path(self, fingerprint: str, variant: Optional[str] = None) -> str:
+        """Path of the JSON metadata stored next to a cached copy."""
+        return self.cache_path(fingerprint, variant)[:-len(".parquet")] + ".json"
+
+    def profile_path(self, fingerprint: str, variant: Optional[str] = None) -> str:
+        """Path of the dataset profile (column statistics) stored next to a cached copy."""
+        return self.cache_path(fingerprint, variant)[:-len(".parquet")] + ".profile.json"
+
+    def load(self, source_path: str, variant: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Load the cached copy of a source file.
+
+        Args:
+            source_path: Path of the original dataset file
+            variant: Name of the ingest options the copy was stored with
+
+        Returns:
+            Cached DataFrame, or None if there is no valid cached copy
+        """
+        if not self.enabled:
+            return None
+
+        path = self.cache_path(self.fingerprint(source_path), variant)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable cached dataset {path}: {e}")
+            return None
+
+    def load_metadata(self, source_path: str, variant: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load the metadata stored with the cached copy of a source file.
+
+        Returns:
+            Metadata dictionary (empty if there is none)
+        """
+        path = self.metadata_path(self.fingerprint(source_path), variant)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read cached dataset metadata {path}: {e}")
+            return {}
+
+    def store(self, source_path: str, df: pd.DataFrame, variant: Optional[str] = None,
+              metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Write a Parquet copy of a parsed dataset.
+
+        Args:
+            source_path: Path of the original dataset file
+            df: Parsed DataFrame
+            variant: Name of the ingest options the dataset was read with
+            metadata: Optional JSON-serialisable information stored next to the copy
+
+        Returns:
+            True if the copy was written, False otherwise
+        """
+        if not self.enabled or df is None:
+            return False
+
+        fingerprint = self.fingerprint(source_path)
+        path = self.cache_path(fingerprint, variant)
+        tmp_path = path + ".tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            df.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+            if metadata:
+                with open(self.metadata_path(fingerprint, variant), "w", encoding="utf-8") as f:
+                    json.dump(metadata, f, indent=2)
+            return True
+        except Exception as e:
+            # Mixed-type object columns cannot always be represented in Parquet
+            print(f"Warning: Could not cache dataset {os.path.basename(source_path)}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def load_profile(self, source_path: str, variant: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load the stored profile of a source file.
+
+        Args:
+            source_path: Path of the original dataset file
+            variant: Name of the ingest options the profiled data was read with
+
+        Returns:
+            Profile dictionary, or None if the dataset has not been profiled
+        """
+        path = self.profile_path(self.fingerprint(source_path), variant)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable dataset profile {path}: {e}")
+            return None
+
+    def store_profile(self, source_path: str, profile: Dict[str, Any], variant: Optional[str] = None) -> bool:
+        """
+        Write the profile of a dataset next to its cached copy.
+
+        Args:
+            source_path: Path of the original dataset file
+            profile: JSON-serialisable profile
+            variant: Name of the ingest options the profiled data was read with
+
+        Returns:
+            True if the profile was written, False otherwise
+        """
+        path = self.profile_path(self.fingerprint(source_path), variant)
+        tmp_path = path + ".tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(profile, f, indent=2)
+            os.replace(tmp_path, path)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not store dataset profile of {os.path.basename(source_path)}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
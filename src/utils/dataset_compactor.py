@@ -0,0 +1,100 @@
+"""
+Memory-compacting dtype pass applied to datasets after they are read.
+Downcasts numeric columns and stores low-cardinality text as 'category'.
+Yes/no style labels stay categories too: two labels take one byte per row, like a bool,
+and the variables keep their categorical semantics (stratification thresholds, text criteria).
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+
+# Version of the compaction; cached copies compacted by another version are read again
+COMPACTION_VERSION = 2
+
+# Text columns with at most this share of distinct values are stored as 'category'
+CATEGORY_MAX_RATIO = 0.5
+
+# Labels (lower-cased, stripped) recognised as boolean values
+BOOLEAN_LABELS = {
+    'yes': True, 'no': False,
+    'y': True, 'n': False,
+    'si': True, 'sí': True,
+    'true': True, 'false': False,
+    'checked': True, 'unchecked': False,
+}
+
+
+def parse_boolean_label(value: Any) -> Optional[bool]:
+    """
+    Convert a yes/no style label to a boolean.
+
+    Returns:
+        True or False, or None if the value is not a known boolean label
+    """
+    if isinstance(value, bool):
+        return value
+    return BOOLEAN_LABELS.get(str(value).strip().lower())
+
+
+def _downcast_float(column: pd.Series) -> pd.Series:
+    """Downcast a float column to float32 only if every value survives the round trip."""
+    if column.dtype != 'float64':
+        return column
+
+    values = column.to_numpy()
+    downcast = values.astype('float32')
+    exact = (downcast.astype('float64') == values) | (np.isnan(values) & np.isnan(downcast))
+    if not exact.all():
+        return column
+    return pd.Series(downcast, index=column.index, name=column.name)
+
+
+def compact_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Reduce the memory used by a dataframe without changing its values.
+
+    Args:
+        df: DataFrame to compact
+
+    Returns:
+        Tuple of (compacted_df, statistics_dict)
+    """
+    memory_before = int(df.memory_usage(deep=True).sum())
+    result = df.copy(deep=False)
+    downcast_count = 0
+    category_count = 0
+
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        compacted = column
+
+        if pd.api.types.is_bool_dtype(column):
+            pass
+        elif pd.api.types.is_integer_dtype(column):
+            compacted = pd.to_numeric(column, downcast='integer')
+        elif pd.api.types.is_float_dtype(column):
+            compacted = _downcast_float(column)
+        elif column.dtype == object:
+            non_null = column.count()
+            if non_null > 0 and column.nunique(dropna=True) <= non_null * CATEGORY_MAX_RATIO:
+                compacted = column.astype('category')
+                category_count += 1
+
+        if compacted.dtype != column.dtype:
+            result.isetitem(position, compacted)
+            if pd.api.types.is_numeric_dtype(column):
+                downcast_count += 1
+
+    memory_after = int(result.memory_usage(deep=True).sum())
+
+    statistics = {
+        'memory_before': memory_before,
+        'memory_after': memory_after,
+        'memory_saved': memory_before - memory_after,
+        'saved_percentage': ((memory_before - memory_after) / memory_before * 100) if memory_before > 0 else 0.0,
+        'downcast_columns': downcast_count,
+        'category_columns': category_count
+    }
+
+    return result, statistics
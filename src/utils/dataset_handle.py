@@ -0,0 +1,271 @@
+"""
+Lazy dataset handle.
+Exposes the schema, row count and first rows of a dataset without reading all of its data,
+which is only loaded when a stage needs it (profiling, criteria evaluation, training).
+"""
+
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.dataset_profile import DatasetProfile, column_codes
+from utils.sorted_index import SORTED_INDEX_MIN_ROWS, SortedIndex, is_indexable
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+PREVIEW_ROWS = 1000
+
+# Memory kept for the codes of columns (the least recently used columns are dropped first)
+CODES_CACHE_BYTES = 512 * 1024 ** 2
+
+
+class DatasetHandle:
+    """Reference to a dataset that is read on first use."""
+
+    def __init__(self, path: str, reader: Callable[..., pd.DataFrame],
+                 columnar_path: Optional[str] = None,
+                 preview: Optional[Callable[[int], pd.DataFrame]] = None,
+                 estimate_rows: Optional[Callable[[], int]] = None,
+                 column_reader: Optional[Callable[[List[str]], pd.DataFrame]] = None,
+                 profile_loader: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+                 profile_saver: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 fingerprinter: Optional[Callable[[], Optional[str]]] = None):
+        """
+        Args:
+            path: Path of the dataset file
+            reader: Callable reading the whole dataset; receives an optional progress callback
+            columnar_path: Parquet copy of the dataset whose metadata can be read without the data
+            preview: Callable returning the first n rows without reading the rest (or None if it cannot)
+            estimate_rows: Callable estimating the number of rows when it is not stored in metadata
+                (may return None if it cannot)
+            column_reader: Callable reading only the given columns from a columnar file
+                (may return None if the dataset has no columnar copy yet)
+            profile_loader: Callable returning the stored profile of the dataset (or None if there is none)
+            profile_saver: Callable storing the profile once it is computed
+            fingerprinter: Callable returning a key identifying the dataset contents (or None if there is none)
+        """
+        self.path = path
+        self.reader = reader
+        self.columnar_path = columnar_path if pq is not None else None
+        self.preview = preview
+        self.estimate_rows = estimate_rows
+        self.column_reader = column_reader
+        self.profile_loader = profile_loader
+        self.profile_saver = profile_saver
+        self.fingerprinter = fingerprinter
+
+        self._df: Optional[pd.DataFrame] = None
+        self._sample: Optional[pd.DataFrame] = None
+        self._num_rows: Optional[int] = None
+        self._parquet_file = None
+        self._profile: Optional[DatasetProfile] = None
+        self._codes: "OrderedDict[str, Tuple[np.ndarray, pd.Index]]" = OrderedDict()
+        self._codes_bytes = 0
+        self._sorted_indexes: Dict[str, Optional[SortedIndex]] = {}
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._df is not None
+
+    def _parquet(self):
+        if self._parquet_file is None and self.columnar_path is not None:
+            self._parquet_file = pq.ParquetFile(self.columnar_path)
+        return self._parquet_file
+
+    def _schema_sample(self) -> pd.DataFrame:
+        """Small frame with the dataset's columns and dtypes (and a few rows if cheap to get)."""
+        if self._df is not None:
+            return self._df
+        if self._sample is None:
+            parquet = self._parquet()
+            if parquet is not None:
+                # Empty table keeps the pandas dtypes recorded in the Parquet metadata
+                self._sample = parquet.schema_arrow.empty_table().to_pandas()
+            elif self.preview is not None:
+                self._sample = self.preview(PREVIEW_ROWS)
+            if self._sample is None:
+                return self.load()
+        return self._sample
+
+    @property
+    def columns(self) -> List[str]:
+        """Column names of the dataset."""
+        return list(self._schema_sample().columns)
+
+    @property
+    def dtypes(self) -> pd.Series:
+        """Column dtypes (inferred from the first rows until the data is loaded from a text file)."""
+        return self._schema_sample().dtypes
+
+    @property
+    def num_rows(self) -> int:
+        """Number of rows of the dataset (estimated if row_count_exact is False)."""
+        if self._df is not None:
+            return len(self._df)
+        if self._num_rows is None:
+            parquet = self._parquet()
+            if parquet is not None:
+                self._num_rows = parquet.metadata.num_rows
+            else:
+                estimate = self.estimate_rows() if self.estimate_rows is not None else None
+                if estimate is not None:
+                    return estimate
+                return len(self.load())
+        return self._num_rows
+
+    @property
+    def row_count_exact(self) -> bool:
+        """Whether num_rows is the exact row count rather than an estimate."""
+        return self._df is not None or self._num_rows is not None or self._parquet() is not None
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        """
+        First rows of the dataset.
+
+        Args:
+            n: Number of rows
+
+        Returns:
+            DataFrame with at most n rows
+        """
+        if self._df is not None:
+            return self._df.head(n)
+
+        parquet = self._parquet()
+        if parquet is not None:
+            for batch in parquet.iter_batches(batch_size=n):
+                return batch.to_pandas()
+            return self._schema_sample()
+        head = self.preview(n) if self.preview is not None else None
+        if head is not None:
+            return head
+        return self.load().head(n)
+
+    def load(self, progress=None) -> pd.DataFrame:
+        """
+        Read the whole dataset (only the first call reads it).
+
+        Args:
+            progress: Optional callback receiving (bytes_read, total_bytes)
+
+        Returns:
+            The dataset as a DataFrame
+        """
+        if self._df is None:
+            df = self.reader(progress)
+            if df is None:
+                raise ValueError(f"Unsupported dataset format: {self.path}")
+            self._df = df
+            self._sample = None
+        return self._df
+
+    def fingerprint(self) -> Optional[str]:
+        """Key identifying the dataset contents, computed once (None if it has none)."""
+        if self._fingerprint is None and self.fingerprinter is not None:
+            self._fingerprint = self.fingerprinter()
+        return self._fingerprint
+
+    def codes(self, column: str) -> Tuple[np.ndarray, pd.Index]:
+        """
+        Integer codes of a column, computed once (see dataset_profile.column_codes) and kept
+        within CODES_CACHE_BYTES. Cohort statistics are counted on them with a row mask
+        instead of copying the selected rows.
+
+        Args:
+            column: Column name
+
+        Returns:
+            Tuple of (codes, labels)
+        """
+        if column in self._codes:
+            self._codes.move_to_end(column)
+            return self._codes[column]
+
+        codes, labels = column_codes(self.read_columns([column])[column])
+        self._codes[column] = codes, labels
+        self._codes_bytes += self._codes_size(codes, labels)
+        while self._codes_bytes > CODES_CACHE_BYTES and len(self._codes) > 1:
+            _, evicted = self._codes.popitem(last=False)
+            self._codes_bytes -= self._codes_size(*evicted)
+        return codes, labels
+
+    @staticmethod
+    def _codes_size(codes: np.ndarray, labels: pd.Index) -> int:
+        return codes.nbytes + int(labels.memory_usage(deep=True))
+
+    def sorted_index(self, column: str) -> Optional[SortedIndex]:
+        """
+        Sorted index of a numeric or date column, built once (see sorted_index.SortedIndex).
+        Range criteria on the column are then answered with binary searches instead of scans.
+
+        Args:
+            column: Column name
+
+        Returns:
+            The index, or None for columns that cannot be indexed and datasets
+            smaller than SORTED_INDEX_MIN_ROWS (which are scanned instead)
+        """
+        if column not in self._sorted_indexes:
+            values = self.read_columns([column])[column]
+            indexable = len(values) >= SORTED_INDEX_MIN_ROWS and is_indexable(values)
+            self._sorted_indexes[column] = SortedIndex.from_column(values) if indexable else None
+        return self._sorted_indexes[column]
+
+    def read_columns(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read only some columns of the dataset.
+        If the data is not loaded yet, the projection is pushed down to the columnar copy when there is one.
+
+        Args:
+            columns: Names of the columns to read (None for all of them)
+
+        Returns:
+            DataFrame with the requested columns, in the given order
+        """
+        if columns is None:
+            return self.load()
+        if self._df is not None:
+            return self._df[columns]
+
+        if self.column_reader is not None:
+            df = self.column_reader(columns)
+            if df is not None:
+                return df
+        return self.load()[columns]
+
+    def profile(self, progress=None, checkpoint: Optional[Callable[[], None]] = None) -> DatasetProfile:
+        """
+        Column statistics of the dataset (computed once per dataset version).
+        A stored profile is used without reading the data; a computed one is stored for the next time.
+
+        Args:
+            progress: Optional callback receiving (bytes_read, total_bytes) if the data has to be read
+            checkpoint: Optional callable called between profiling steps; it may raise (e.g. LoadCancelled)
+                to stop before the profile is computed or stored
+
+        Returns:
+            The dataset profile
+        """
+        if self._profile is None and self.profile_loader is not None:
+            stored = self.profile_loader()
+            if stored is not None:
+                try:
+                    self._profile = DatasetProfile.from_dict(stored)
+                    if self._df is None:
+                        self._num_rows = self._profile.rows
+                except (KeyError, TypeError, ValueError) as e:
+                    print(f"Warning: Recomputing dataset profile of {self.path}: {e}")
+
+        if self._profile is None:
+            df = self.load(progress)
+            if checkpoint is not None:
+                checkpoint()
+            self._profile = DatasetProfile.from_dataframe(df, checkpoint=checkpoint)
+            if self.profile_saver is not None:
+                self.profile_saver(self._profile.to_dict())
+        return self._profile
@@ -0,0 +1,552 @@
+"""
+Dataset profile: per-column statistics computed in one pass over a dataframe.
+The status tab and the outcome variable lists read from the profile instead of
+rescanning the data with separate value_counts/nunique/min/max calls.
+Very large datasets are profiled with streaming sketches (see utils.column_sketch)
+whose error bounds are recorded with each column, and wide ones across a process pool.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.column_sketch import FrequentValues, HyperLogLog, TDigest, hash_values
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+    ipc = None
+
+# Number of most frequent values kept per column
+TOP_K = 10
+
+# Shares of estimated value counts are not reported when the count error exceeds this fraction of the count
+MAX_REPORTED_COUNT_ERROR = 0.5
+
+# Version of the serialised profile; stored profiles of another version are recomputed
+PROFILE_VERSION = 2
+
+# Datasets with at least this many rows are profiled with sketches instead of exact value counts
+APPROXIMATE_MIN_ROWS = 5_000_000
+
+# Rows fed to the sketches at a time
+SKETCH_CHUNK_ROWS = 1_000_000
+
+# Quantiles kept for numeric columns
+QUARTILES = (0.25, 0.5, 0.75)
+
+# Datasets with at least this many columns and cells are profiled across a process pool.
+# Measured break-even: a worker takes ~0.7 s to start and import utils, and sharing the data ~0.025 s per
+# million cells, against ~0.1 s per million cells profiled in process; with 2 workers that is ~28M cells
+PARALLEL_MIN_COLUMNS = 64
+PARALLEL_MIN_CELLS = 30_000_000
+
+# Minimum number of columns per worker, so starting a worker pays off
+PARALLEL_MIN_GROUP_COLUMNS = 16
+
+# RAM-backed directory where the data shared with the workers is written, when the system has one
+SHARED_MEMORY_DIR = "/dev/shm"
+
+# Column kinds
+NUMERIC = "numeric"
+CATEGORICAL = "categorical"
+BOOLEAN = "boolean"
+OTHER = "other"
+
+
+def column_kind(column: pd.Series) -> str:
+    """Classify a column as numeric, categorical (text or category), boolean or other (dates, durations)."""
+    if pd.api.types.is_bool_dtype(column):
+        return BOOLEAN
+    if pd.api.types.is_integer_dtype(column) or pd.api.types.is_float_dtype(column):
+        return NUMERIC
+    if isinstance(column.dtype, pd.CategoricalDtype) or column.dtype == object:
+        return CATEGORICAL
+    return OTHER
+
+
+def column_codes(column: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Integer codes of the values of a column.
+
+    Returns:
+        Tuple of (codes, labels): one code per row (-1 for missing values) and the value of each code
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy(), column.cat.categories
+    codes, labels = pd.factorize(column, use_na_sentinel=True)
+    # Smallest signed type holding every code, as codes may be kept for many columns
+    for dtype in (np.int8, np.int16, np.int32):
+        if len(labels) <= np.iinfo(dtype).max:
+            codes = codes.astype(dtype)
+            break
+    return codes, pd.Index(labels)
+
+
+def class_counts(codes: np.ndarray, labels: pd.Index, mask: Optional[np.ndarray] = None) -> pd.Series:
+    """
+    Rows of each value of a column, optionally only within a cohort, without copying the column.
+
+    Args:
+        codes: Codes of the column (see column_codes)
+        labels: Value of each code
+        mask: Boolean array selecting the rows of the cohort (None for all rows)
+
+    Returns:
+        Counts of the values present, most frequent first (like value_counts(dropna=True))
+    """
+    selected = codes[mask] if mask is not None else codes
+    counts = np.bincount(selected[selected >= 0], minlength=len(labels))
+    observed = np.flatnonzero(counts)
+    order = observed[np.argsort(-counts[observed], kind="stable")]
+    return pd.Series(counts[order], index=labels[order], name="count")
+
+
+def _value_counts(column: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Counts of the values present in a column (missing values and unused categories excluded)."""
+    codes, labels = column_codes(column)
+    counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+    observed = counts > 0
+    return counts[observed], labels[observed]
+
+
+def _number(value: Any) -> float:
+    """Plain float of a numpy scalar (NaN for missing)."""
+    return float("nan") if value is None or pd.isna(value) else float(value)
+
+
+class ColumnProfile:
+    """Statistics of one column."""
+
+    def __init__(self, name: str, kind: str, dtype: str, null_count: int, distinct_count: int,
+                 min_count: int, top_values: List[Tuple[str, int]], has_decimals: bool = False,
+                 minimum: Optional[float] = None, maximum: Optional[float] = None, mean: Optional[float] = None,
+                 quartiles: Optional[List[float]] = None, approximate: bool = False,
+                 distinct_error: float = 0.0, count_error: int = 0):
+        """
+        Args:
+            name: Column name
+            kind: numeric, categorical, boolean or other
+            dtype: Name of the pandas dtype
+            null_count: Number of missing values
+            distinct_count: Number of distinct non-missing values
+            min_count: Number of rows of the least frequent value (0 if the column is empty)
+            top_values: Most frequent values (as text) and their counts
+            has_decimals: Whether a numeric column holds values with a fractional part
+            minimum: Minimum of a numeric column
+            maximum: Maximum of a numeric column
+            mean: Mean of a numeric column
+            quartiles: First quartile, median and third quartile of a numeric column
+            approximate: Whether the value statistics were estimated with sketches
+            distinct_error: Relative standard error of distinct_count (0 if exact)
+            count_error: Maximum undercount of the value counts (0 if exact). When the column has more
+                distinct values than the sketch tracks, min_count is 0 (unknown), so minimum-samples checks fail safe
+        """
+        self.name = name
+        self.kind = kind
+        self.dtype = dtype
+        self.null_count = null_count
+        self.distinct_count = distinct_count
+        self.min_count = min_count
+        self.top_values = top_values
+        self.has_decimals = has_decimals
+        self.minimum = minimum
+        self.maximum = maximum
+        self.mean = mean
+        self.quartiles = quartiles
+        self.approximate = approximate
+        self.distinct_error = distinct_error
+        self.count_error = count_error
+
+    def value_share(self, count: int, rows: int) -> Optional[Tuple[float, float]]:
+        """
+        Share of the rows (in %) holding a value, from its count in top_values.
+
+        Args:
+            count: Count of the value
+            rows: Number of rows of the dataset
+
+        Returns:
+            Tuple of (lowest, highest) share given count_error (equal if the count is exact),
+            or None if the count is too uncertain to report (see MAX_REPORTED_COUNT_ERROR)
+        """
+        if rows <= 0 or self.count_error > count * MAX_REPORTED_COUNT_ERROR:
+            return None
+        highest = min(count + self.count_error, rows)
+        return count / rows * 100, highest / rows * 100
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'dtype': self.dtype,
+            'null_count': self.null_count,
+            'distinct_count': self.distinct_count,
+            'min_count': self.min_count,
+            'top_values': [list(item) for item in self.top_values],
+            'has_decimals': self.has_decimals,
+            'minimum': self.minimum,
+            'maximum': self.maximum,
+            'mean': self.mean,
+            'quartiles': self.quartiles,
+            'approximate': self.approximate,
+            'distinct_error': self.distinct_error,
+            'count_error': self.count_error
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ColumnProfile':
+        return cls(
+            name=data['name'],
+            kind=data['kind'],
+            dtype=data['dtype'],
+            null_count=data['null_count'],
+            distinct_count=data['distinct_count'],
+            min_count=data['min_count'],
+            top_values=[tuple(item) for item in data['top_values']],
+            has_decimals=data.get('has_decimals', False),
+            minimum=data.get('minimum'),
+            maximum=data.get('maximum'),
+            mean=data.get('mean'),
+            quartiles=data.get('quartiles'),
+            approximate=data.get('approximate', False),
+            distinct_error=data.get('distinct_error', 0.0),
+            count_error=data.get('count_error', 0)
+        )
+
+
+def _sketch_column(column: pd.Series, kind: str, null_count: int) -> ColumnProfile:
+    """
+    Profile a column chunk by chunk with sketches.
+    Counts stay exact while the column has at most FREQUENT_CAPACITY distinct values.
+    """
+    distinct = HyperLogLog()
+    frequent = FrequentValues()
+    digest = TDigest() if kind == NUMERIC else None
+
+    for start in range(0, len(column), SKETCH_CHUNK_ROWS):
+        chunk = column.iloc[start:start + SKETCH_CHUNK_ROWS]
+        codes, values = pd.factorize(chunk, use_na_sentinel=True)
+        valid = codes[codes >= 0]
+        counts = np.bincount(valid, minlength=len(values))
+        # Only the distinct values of the chunk are hashed
+        values = np.asarray(values)
+        hashes = hash_values(values)
+        distinct.add_hashes(hashes)
+        frequent.add_counts(values, hashes, counts)
+        if digest is not None:
+            digest.add_values(chunk.to_numpy(dtype=np.float64, na_value=np.nan)[codes >= 0])
+
+    items = frequent.items()
+    if frequent.exact:
+        distinct_count = len(items)
+        distinct_error = 0.0
+        min_count = items[-1][1] if items else 0
+    else:
+        # More distinct values than tracked: the least frequent value is unknown
+        distinct_count = max(int(round(distinct.estimate())), len(items) + 1)
+        distinct_error = distinct.relative_error
+        min_count = 0
+
+    return ColumnProfile(
+        name=str(column.name),
+        kind=kind,
+        dtype=str(column.dtype),
+        null_count=null_count,
+        distinct_count=distinct_count,
+        min_count=min_count,
+        top_values=[(str(label), count) for label, count in items[:TOP_K]],
+        quartiles=[digest.quantile(q) for q in QUARTILES] if digest is not None else None,
+        approximate=True,
+        distinct_error=distinct_error,
+        count_error=frequent.error
+    )
+
+
+def _profile_columns(df: pd.DataFrame, approximate: bool,
+                     checkpoint: Optional[Callable[[], None]] = None) -> List[ColumnProfile]:
+    """Profile every column of a dataframe (see DatasetProfile.from_dataframe)."""
+    null_counts = df.isna().sum().to_numpy()
+    kinds = [column_kind(df.iloc[:, position]) for position in range(df.shape[1])]
+
+    numeric_positions = [position for position, kind in enumerate(kinds) if kind == NUMERIC]
+    numeric = df.iloc[:, numeric_positions]
+    minimums = numeric.min().to_numpy()
+    maximums = numeric.max().to_numpy()
+    means = numeric.mean().to_numpy()
+    decimals = np.zeros(len(numeric_positions), dtype=bool)
+    float_mask = np.array([pd.api.types.is_float_dtype(numeric.iloc[:, i]) for i in range(numeric.shape[1])], dtype=bool)
+    if float_mask.any():
+        floats = numeric.iloc[:, np.flatnonzero(float_mask)]
+        decimals[float_mask] = ((floats % 1 != 0) & floats.notna()).any().to_numpy()
+    numeric_stats = {position: i for i, position in enumerate(numeric_positions)}
+    if numeric_positions and not approximate:
+        quartiles = numeric.quantile(list(QUARTILES)).to_numpy()
+
+    columns = []
+    for position in range(df.shape[1]):
+        if checkpoint is not None:
+            checkpoint()
+        column = df.iloc[:, position]
+        if approximate and kinds[position] in (NUMERIC, CATEGORICAL, OTHER) \
+                and not isinstance(column.dtype, pd.CategoricalDtype):
+            profile = _sketch_column(column, kinds[position], int(null_counts[position]))
+        else:
+            counts, labels = _value_counts(column)
+            top = np.argsort(-counts, kind="stable")[:TOP_K]
+            profile = ColumnProfile(
+                name=str(df.columns[position]),
+                kind=kinds[position],
+                dtype=str(column.dtype),
+                null_count=int(null_counts[position]),
+                distinct_count=len(counts),
+                min_count=int(counts.min()) if len(counts) else 0,
+                top_values=[(str(labels[i]), int(counts[i])) for i in top]
+            )
+            if position in numeric_stats:
+                profile.quartiles = [_number(value) for value in quartiles[:, numeric_stats[position]]]
+        if position in numeric_stats:
+            i = numeric_stats[position]
+            profile.has_decimals = bool(decimals[i])
+            profile.minimum = _number(minimums[i])
+            profile.maximum = _number(maximums[i])
+            profile.mean = _number(means[i])
+        columns.append(profile)
+
+    return columns
+
+
+def _profile_column_group(table_path: str, positions: List[int], approximate: bool) -> List[Dict[str, Any]]:
+    """
+    Profile some columns of a dataset shared as an Arrow IPC file (runs in a worker process).
+    The file is memory-mapped, so the columns are read from the page cache without being copied or pickled.
+    """
+    with pa.memory_map(table_path) as source:
+        table = ipc.open_file(source).read_all().select(positions)
+        df = table.to_pandas(split_blocks=True)
+        return [profile.to_dict() for profile in _profile_columns(df, approximate)]
+
+
+def _parallel_workers(df: pd.DataFrame, max_workers: Optional[int]) -> int:
+    """Number of worker processes worth starting to profile a dataframe (1 to profile it in this process)."""
+    if pa is None or df.shape[1] < PARALLEL_MIN_COLUMNS or df.size < PARALLEL_MIN_CELLS:
+        return 1
+    return max(1, min(df.shape[1] // PARALLEL_MIN_GROUP_COLUMNS, max_workers or os.cpu_count() or 1))
+
+
+def _profile_parallel(df: pd.DataFrame, approximate: bool, max_workers: int,
+                      checkpoint: Optional[Callable[[], None]] = None) -> List[ColumnProfile]:
+    """
+    Profile the columns of a wide dataframe in groups across a process pool.
+    The data is written once to a memory-mapped Arrow file that every worker maps.
+    """
+    start_time = time.perf_counter()
+    shared_dir = tempfile.mkdtemp(prefix="profile-", dir=SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None)
+    table_path = os.path.join(shared_dir, "dataset.arrow")
+    try:
+        try:
+            # Positional names: Arrow needs unique string names, the real ones are restored below
+            table = pa.Table.from_pandas(df.set_axis([str(i) for i in range(df.shape[1])], axis=1), preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError) as e:
+            print(f"Warning: Profiling in a single process, the dataset cannot be shared with workers: {e}")
+            return _profile_columns(df, approximate, checkpoint)
+        with pa.OSFile(table_path, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        del table
+
+        # A few groups per worker balance columns of uneven cost
+        groups = [group.tolist() for group in np.array_split(np.arange(df.shape[1]), max_workers * 4) if len(group)]
+        results = [None] * len(groups)
+        # 'spawn' avoids forking the GUI process, which may be running other threads
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = {executor.submit(_profile_column_group, table_path, group, approximate): i
+                       for i, group in enumerate(groups)}
+            try:
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    if checkpoint is not None:
+                        checkpoint()
+            except BaseException:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        shutil.rmtree(shared_dir, ignore_errors=True)
+
+    columns = []
+    for group, profiles in zip(groups, results):
+        for position, data in zip(group, profiles):
+            profile = ColumnProfile.from_dict(data)
+            profile.name = str(df.columns[position])
+            columns.append(profile)
+
+    seconds = time.perf_counter() - start_time
+    print(f"✅ Profiled {df.shape[1]} columns with {max_workers} workers in {seconds:.2f} s")
+    return columns
+
+
+class DatasetProfile:
+    """Statistics of every column of a dataset."""
+
+    def __init__(self, rows: int, memory_bytes: int, columns: List[ColumnProfile]):
+        """
+        Args:
+            rows: Number of rows
+            memory_bytes: Memory used by the dataframe
+            columns: Profile of each column, in dataset order
+        """
+        self.rows = rows
+        self.memory_bytes = memory_bytes
+        self.columns = columns
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, approximate: Optional[bool] = None,
+                       max_workers: Optional[int] = None,
+                       checkpoint: Optional[Callable[[], None]] = None) -> 'DatasetProfile':
+        """
+        Profile a dataframe.
+        Null counts and numeric summaries are computed per dtype block; value counts once per column.
+
+        Args:
+            df: DataFrame to profile
+            approximate: Estimate distinct values, frequent values and quartiles with sketches
+                (None: only for datasets of at least APPROXIMATE_MIN_ROWS rows). Categorical and boolean
+                columns are always counted exactly, as their codes are cheap to count
+            max_workers: Worker processes profiling groups of columns of wide datasets
+                (defaults to the number of cores; 1 profiles in this process)
+            checkpoint: Optional callable called between columns (or groups of columns);
+                it may raise (e.g. LoadCancelled) to stop profiling
+
+        Returns:
+            The dataset profile
+        """
+        if approximate is None:
+            approximate = len(df) >= APPROXIMATE_MIN_ROWS
+
+        workers = _parallel_workers(df, max_workers)
+        if workers > 1:
+            columns = _profile_parallel(df, approximate, workers, checkpoint)
+        else:
+            columns = _profile_columns(df, approximate, checkpoint)
+
+        return cls(rows=len(df), memory_bytes=int(df.memory_usage(deep=True).sum()), columns=columns)
+
+    def column(self, name: str) -> ColumnProfile:
+        """Profile of a column by name."""
+        for profile in self.columns:
+            if profile.name == name:
+                return profile
+        raise KeyError(name)
+
+    def columns_of_kind(self, *kinds: str) -> List[ColumnProfile]:
+        """Profiles of the columns of the given kinds, in dataset order."""
+        return [profile for profile in self.columns if profile.kind in kinds]
+
+    @property
+    def approximate(self) -> bool:
+        """Whether any column statistics were estimated with sketches."""
+        return any(profile.approximate for profile in self.columns)
+
+    @property
+    def missing_total(self) -> int:
+        return sum(profile.null_count for profile in self.columns)
+
+    @property
+    def missing_percentage(self) -> float:
+        cells = self.rows * len(self.columns)
+        return self.missing_total / cells * 100 if cells > 0 else 0.0
+
+    def _is_continuous(self, profile: ColumnProfile) -> bool:
+        """Real decimals or more than 50% distinct values make a numeric column continuous."""
+        return profile.has_decimals or profile.distinct_count > self.rows * 0.5
+
+    def acceptable_stratify_variables(self, min_samples: int = 5, max_categories: int = 10) -> List[str]:
+        """
+        Variables suitable as the primary variable (classification or regression target),
+        meeting Ludwig's requirements for cross-validation (min 2 samples per class/value).
+        """
+        acceptable = []
+        for profile in self.columns:
+            if profile.kind == CATEGORICAL:
+                if profile.distinct_count <= max_categories and profile.min_count >= min_samples:
+                    acceptable.append(profile.name)
+            elif profile.kind == NUMERIC:
+                if self._is_continuous(profile) or profile.min_count >= 2:
+                    acceptable.append(profile.name)
+            elif profile.kind == BOOLEAN:
+                if profile.min_count >= 2:
+                    acceptable.append(profile.name)
+        return acceptable
+
+    def outcome_candidates(self) -> Tuple[List[Tuple[str, int]], List[str], List[str]]:
+        """
+        Outcome variables suggested in the status tab.
+
+        Returns:
+            Tuple of (categorical [(name, categories)], numerical [name], boolean [name]):
+            categorical with 2-10 categories of at least 5 rows or discrete numeric with at most
+            10 values of at least 2 rows, continuous numeric, and booleans with both values at least twice
+        """
+        categorical, numerical, boolean = [], [], []
+        for profile in self.columns:
+            if profile.kind == CATEGORICAL:
+                if profile.distinct_count <= 10 and profile.min_count >= 5:
+                    categorical.append((profile.name, profile.distinct_count))
+            elif profile.kind == NUMERIC:
+                if self._is_continuous(profile):
+                    numerical.append(profile.name)
+                elif profile.min_count >= 2 and profile.distinct_count <= 10:
+                    categorical.append((profile.name, profile.distinct_count))
+            elif profile.kind == BOOLEAN:
+                if profile.distinct_count == 2 and profile.min_count >= 2:
+                    boolean.append(profile.name)
+        return categorical, numerical, boolean
+
+    def quality_score(self) -> int:
+        """
+        Overall data quality from 0 to 3: one point each for less than 5% missing values,
+        at least 1000 rows and a mix of numerical and categorical variables.
+        """
+        score = 0
+        if self.missing_percentage < 5:
+            score += 1
+        if self.rows >= 1000:
+            score += 1
+        if self.columns_of_kind(NUMERIC) and self.columns_of_kind(CATEGORICAL, BOOLEAN):
+            score += 1
+        return score
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Candidate targets and the quality score are derived from the column statistics;
+        # they are stored for readers of the file and recomputed when it is loaded
+        categorical, numerical, boolean = self.outcome_candidates()
+        return {
+            'version': PROFILE_VERSION,
+            'rows': self.rows,
+            'memory_bytes': self.memory_bytes,
+            'quality_score': self.quality_score(),
+            'candidate_targets': {
+                'acceptable': self.acceptable_stratify_variables(),
+                'categorical': [name for name, _ in categorical],
+                'numerical': numerical,
+                'boolean': boolean
+            },
+            'columns': [profile.to_dict() for profile in self.columns]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DatasetProfile':
+        if data.get('version') != PROFILE_VERSION:
+            raise ValueError(f"Unsupported dataset profile version: {data.get('version')}")
+        return cls(
+            rows=data['rows'],
+            memory_bytes=data['memory_bytes'],
+            columns=[ColumnProfile.from_dict(item) for item in data['columns']]
+        )
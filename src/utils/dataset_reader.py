@@ -0,0 +1,739 @@
+"""
+Readers used to ingest datasets into pandas.
+Text formats are read in chunks so that callers can follow the progress of large files and cancel them.
+Compressed files (.gz, .bz2, .zst, .xz) are decompressed while they are read.
+SAS, SPSS and Stata files are converted to Parquet chunk by chunk before being loaded.
+"""
+
+import io
+import os
+import bz2
+import glob
+import gzip
+import lzma
+import time
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pandas.api.types import union_categoricals
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.csv_sniffer import CsvDialect, SNIFF_BYTES, sniff_csv
+from utils.redcap_loader import find_data_dictionary, read_redcap_export
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+try:
+    import pyreadstat
+except ImportError:
+    pyreadstat = None
+
+# progress(bytes_read, total_bytes); may raise LoadCancelled to stop reading
+ProgressCallback = Callable[[int, int], None]
+
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_SAMPLE_ROWS = 10_000
+
+# Text columns with at most this share of distinct values in the sample are read as 'category'
+CATEGORY_MAX_RATIO = 0.5
+
+# Extension of text files holding a glob pattern of same-schema shard files
+SHARDS_EXTENSION = ".shards"
+
+# Shards adding up to fewer bytes are read in this process. Measured break-even with 2 workers:
+# a worker takes ~0.7 s to start, against ~22 ms per MB of CSV parsed and ~1.5 ms per MB sent back
+SHARDS_PARALLEL_MIN_BYTES = 80 * 1024 * 1024
+
+# Formats of statistical packages read through chunked readers
+STATISTICAL_EXTENSIONS = (".sas7bdat", ".xpt", ".sav", ".dta")
+
+# Compressed file suffixes that are decompressed while reading
+COMPRESSION_EXTENSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".zst": "zstd",
+    ".xz": "xz"
+}
+
+
+class LoadCancelled(Exception):
+    """Raised when the user cancels the loading of a dataset."""
+
+
+def split_compression(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Split the compression suffix from a file path.
+
+    Returns:
+        Tuple of (path without the compression suffix, compression name or None)
+    """
+    for extension, compression in COMPRESSION_EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return path[:-len(extension)], compression
+    return path, None
+
+
+@contextmanager
+def open_binary(path: str) -> Iterator[Tuple[io.IOBase, io.IOBase]]:
+    """
+    Open a file for streaming reads, decompressing it on the fly if it has a compression suffix.
+
+    Yields:
+        Tuple of (stream of uncompressed bytes, underlying file whose tell() gives the bytes read from disk)
+    """
+    _, compression = split_compression(path)
+    with open(path, "rb") as raw:
+        if compression is None:
+            yield raw, raw
+        elif compression == "gzip":
+            with gzip.GzipFile(fileobj=raw) as stream:
+                yield stream, raw
+        elif compression == "bz2":
+            with bz2.BZ2File(raw) as stream:
+                yield stream, raw
+        elif compression == "xz":
+            with lzma.LZMAFile(raw) as stream:
+                yield stream, raw
+        else:
+            if zstandard is None:
+                raise ValueError("Reading .zst files requires the 'zstandard' package")
+            with io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw)) as stream:
+                yield stream, raw
+
+
+def read_json_lines(path: str, progress: Optional[ProgressCallback] = None,
+                    chunk_rows: int = DEFAULT_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Read a line-delimited JSON file (optionally compressed) in chunks.
+
+    Args:
+        path: Path of the JSON Lines file
+        progress: Optional callback receiving (bytes_read, total_bytes)
+        chunk_rows: Number of records parsed per chunk
+
+    Returns:
+        The parsed DataFrame
+    """
+    total_bytes = os.path.getsize(path)
+    chunks = []
+
+    with open_binary(path) as (stream, raw):
+        text = io.TextIOWrapper(stream, encoding="utf-8")
+        with pd.read_json(text, lines=True, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                chunks.append(chunk)
+                if progress is not None:
+                    progress(min(raw.tell(), total_bytes), total_bytes)
+
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def current_memory() -> Optional[int]:
+    """
+    Resident memory of the current process in bytes, or None if it cannot be measured.
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    if resource is not None:
+        # ru_maxrss is the peak so far, in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return None
+
+
+def infer_csv_schema(sample: pd.DataFrame) -> Dict[str, str]:
+    """
+    Infer the dtypes to read a CSV file with from a sample of its rows.
+
+    Numeric columns are read as float64 (a later chunk may contain missing values)
+    and low-cardinality text columns as category. Other columns are left to pandas.
+
+    Args:
+        sample: First rows of the file as parsed by pandas
+
+    Returns:
+        Mapping of column name to dtype
+    """
+    schema = {}
+    for col in sample.columns:
+        column = sample[col]
+        if pd.api.types.is_bool_dtype(column):
+            continue
+        if pd.api.types.is_numeric_dtype(column):
+            schema[col] = "float64"
+        elif column.dtype == object:
+            non_null = column.dropna()
+            if len(non_null) > 0 and non_null.nunique() <= len(non_null) * CATEGORY_MAX_RATIO:
+                schema[col] = "category"
+    return schema
+
+
+class StreamingCsvReader:
+    """
+    Reads a CSV file in fixed-size chunks using a schema inferred from a bounded sample.
+    Keeps track of the throughput and peak memory of the read.
+    """
+
+    def __init__(self, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 sample_rows: int = DEFAULT_SAMPLE_ROWS, **read_csv_kwargs):
+        """
+        Args:
+            path: Path of the CSV file
+            chunk_rows: Number of rows parsed per chunk
+            sample_rows: Number of rows used to infer the schema
+            **read_csv_kwargs: Extra arguments forwarded to pd.read_csv
+        """
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.sample_rows = sample_rows
+        self.read_csv_kwargs = read_csv_kwargs
+
+        self.schema: Dict[str, str] = {}
+        self.integer_columns: List[str] = []
+        # Columns parsed as numbers in some chunks and as text in others
+        self.mixed_columns: List[str] = []
+        self.rows = 0
+        self.seconds = 0.0
+        self.peak_memory: Optional[int] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def _track_memory(self):
+        memory = current_memory()
+        if memory is not None:
+            self.peak_memory = max(self.peak_memory or 0, memory)
+
+    def read(self, progress: Optional[ProgressCallback] = None) -> pd.DataFrame:
+        """
+        Read the whole file.
+
+        Args:
+            progress: Optional callback receiving (bytes_read, total_bytes)
+
+        Returns:
+            The parsed DataFrame
+        """
+        start_time = time.perf_counter()
+        self.peak_memory = None
+        self._track_memory()
+
+        with open_binary(self.path) as (stream, _):
+            sample = pd.read_csv(stream, nrows=self.sample_rows, **self.read_csv_kwargs)
+        if len(sample) < self.sample_rows:
+            # The sample already holds the whole file
+            df = sample
+            if progress is not None:
+                total_bytes = os.path.getsize(self.path)
+                progress(total_bytes, total_bytes)
+        else:
+            self.schema = infer_csv_schema(sample)
+            self.integer_columns = [col for col in sample.columns if pd.api.types.is_integer_dtype(sample[col])]
+            del sample
+            try:
+                df = self._read_chunks(self.schema, progress)
+            except (ValueError, TypeError) as e:
+                # A value later in the file did not fit the sampled numeric types
+                print(f"Warning: Sampled schema does not hold for {os.path.basename(self.path)} ({e}); "
+                      f"re-reading with inferred numeric types")
+                self.schema = {col: dtype for col, dtype in self.schema.items() if dtype == "category"}
+                df = self._read_chunks(self.schema, progress)
+                if self.mixed_columns:
+                    # Numbers in some chunks and text in others: read as text throughout, like a single read_csv
+                    self.schema.update({col: "str" for col in self.mixed_columns})
+                    df = self._read_chunks(self.schema, progress)
+            df = self._restore_integers(df)
+
+        self.rows = len(df)
+        self.seconds = time.perf_counter() - start_time
+        self._track_memory()
+        return df
+
+    def _read_chunks(self, schema: Dict[str, str], progress: Optional[ProgressCallback]) -> pd.DataFrame:
+        total_bytes = os.path.getsize(self.path)
+        chunks = []
+
+        with open_binary(self.path) as (stream, raw):
+            reader = pd.read_csv(stream, chunksize=self.chunk_rows, dtype=schema, **self.read_csv_kwargs)
+            for chunk in reader:
+                chunks.append(chunk)
+                self._track_memory()
+                if progress is not None:
+                    progress(min(raw.tell(), total_bytes), total_bytes)
+
+        category_columns = [col for col, dtype in schema.items() if dtype == "category"]
+        return self._concat_chunks(chunks, category_columns)
+
+    def _concat_chunks(self, chunks: List[pd.DataFrame], category_columns: List[str]) -> pd.DataFrame:
+        """Concatenate chunks, merging the categories each chunk found for category columns."""
+        if len(chunks) == 1:
+            return chunks[0]
+
+        columns = chunks[0].columns
+        data = {}
+        self.mixed_columns = []
+        for col in columns:
+            parts = [chunk[col] for chunk in chunks]
+            if any(part.dtype == object for part in parts) and any(part.dtype != object for part in parts):
+                self.mixed_columns.append(col)
+            if col in category_columns:
+                data[col] = pd.Series(union_categoricals(parts, ignore_order=True), name=col)
+            else:
+                data[col] = pd.concat(parts, ignore_index=True)
+            self._track_memory()
+        chunks.clear()
+        return pd.DataFrame(data, columns=columns)
+
+    def _restore_integers(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Cast integer columns of the sample, read as float64, back to int64 when no value is missing."""
+        for col in self.integer_columns:
+            if df[col].dtype != "float64":
+                continue
+            values = df[col].to_numpy()
+            if len(values) > 0 and not np.isnan(values).any() and (values % 1 == 0).all():
+                df[col] = values.astype("int64")
+        return df
+
+    def summary(self) -> str:
+        """Human-readable summary of the last read."""
+        text = f"{self.rows:,} rows in {self.seconds:.2f} s ({self.rows_per_second:,.0f} rows/s"
+        if self.peak_memory is not None:
+            text += f", peak memory {self.peak_memory / 1024**2:.1f} MB"
+        return text + ")"
+
+
+def sniff_csv_file(path: str, delimiter: Optional[str] = None) -> CsvDialect:
+    """
+    Detect the delimiter, encoding, decimal separator and header row of a delimited text file.
+
+    Args:
+        path: Path of the (possibly compressed) file
+        delimiter: Delimiter chosen by the user, used instead of detecting it
+
+    Returns:
+        The detected dialect
+    """
+    with open_binary(path) as (stream, _):
+        sample = stream.read(SNIFF_BYTES)
+    return sniff_csv(sample, delimiter)
+
+
+def estimate_csv_rows(path: str, sample_bytes: int = 1024 * 1024) -> Optional[int]:
+    """
+    Estimate the number of data rows of a CSV file from the line length of its first bytes.
+
+    Args:
+        path: Path of the CSV file
+        sample_bytes: Number of bytes sampled
+
+    Returns:
+        Estimated number of rows (excluding the header), or None for compressed files
+    """
+    if split_compression(path)[1] is not None:
+        return None
+
+    total_bytes = os.path.getsize(path)
+    with open(path, "rb") as f:
+        sample = f.read(sample_bytes)
+
+    lines = sample.count(b"\n")
+    if lines == 0:
+        return 0
+    if len(sample) >= total_bytes:
+        # The whole file was read: count exactly (a last line may lack its newline)
+        return lines - 1 + (0 if sample.endswith(b"\n") else 1)
+    return max(0, int(total_bytes / (len(sample) / lines)) - 1)
+
+
+class StatisticalFileReader:
+    """
+    Reads SAS (.sas7bdat, .xpt), SPSS (.sav) and Stata (.dta) files in chunks.
+    Chunks are spooled to a Parquet file so that only one chunk is held as pandas objects at a time,
+    instead of the several copies the one-shot pandas readers build.
+    """
+
+    def __init__(self, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        """
+        Args:
+            path: Path of the SAS, SPSS or Stata file
+            chunk_rows: Number of rows read per chunk
+        """
+        self.path = path
+        self.chunk_rows = chunk_rows
+
+        self.integer_columns: List[str] = []
+        self.rows = 0
+        self.seconds = 0.0
+        self.peak_memory: Optional[int] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def _track_memory(self):
+        memory = current_memory()
+        if memory is not None:
+            self.peak_memory = max(self.peak_memory or 0, memory)
+
+    def iter_chunks(self) -> Iterator[Tuple[pd.DataFrame, Optional[int]]]:
+        """
+        Iterate over the file in chunks.
+
+        Returns:
+            Iterator of (chunk, total_rows); total_rows is None when the reader does not know it
+        """
+        if self.path.endswith(".sav"):
+            if pyreadstat is None:
+                raise ValueError("Reading SPSS files requires the 'pyreadstat' package")
+            _, meta = pyreadstat.read_sav(self.path, metadataonly=True)
+            # Same value-label conversion as pd.read_spss
+            for chunk, _ in pyreadstat.read_file_in_chunks(pyreadstat.read_sav, self.path, chunksize=self.chunk_rows,
+                                                          apply_value_formats=True, formats_as_category=True):
+                yield chunk, meta.number_rows
+            return
+
+        if self.path.endswith(".dta"):
+            reader = pd.read_stata(self.path, chunksize=self.chunk_rows)
+        else:
+            reader = pd.read_sas(self.path, chunksize=self.chunk_rows)
+        with reader:
+            for chunk in reader:
+                # SAS readers expose the row count as row_count/nobs, Stata only once its header is read
+                total_rows = next((getattr(reader, name) for name in ("row_count", "nobs", "_nobs")
+                                   if isinstance(getattr(reader, name, None), int)), None)
+                yield chunk, total_rows
+
+    def _chunk_schema(self, chunk: pd.DataFrame) -> "pa.Schema":
+        """
+        Parquet schema of the file, taken from its first chunk.
+        Integer columns are widened to float64 because a later chunk may hold missing values,
+        and columns without any value in the first chunk are typed as text.
+        """
+        self.integer_columns = [col for col in chunk.columns if pd.api.types.is_integer_dtype(chunk[col])]
+        schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+        for position, field in enumerate(schema):
+            if field.name in self.integer_columns:
+                schema = schema.set(position, field.with_type(pa.float64()))
+            elif pa.types.is_null(field.type):
+                schema = schema.set(position, field.with_type(pa.string()))
+        return schema
+
+    def to_parquet(self, target_path: str, progress: Optional[ProgressCallback] = None) -> int:
+        """
+        Convert the file to Parquet chunk by chunk.
+
+        Args:
+            target_path: Path of the Parquet file to write
+            progress: Optional callback receiving (bytes_read, total_bytes); the bytes read are estimated
+                from the rows read, as the readers do not expose their position in the file
+
+        Returns:
+            Number of rows written
+        """
+        writer = None
+        schema = None
+        rows = 0
+        total_bytes = os.path.getsize(self.path)
+        try:
+            for chunk, total_rows in self.iter_chunks():
+                if writer is None:
+                    schema = self._chunk_schema(chunk)
+                    writer = pq.ParquetWriter(target_path, schema)
+                try:
+                    table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False, safe=False)
+                except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                    raise ValueError(f"Rows {rows:,}-{rows + len(chunk):,} of {os.path.basename(self.path)} "
+                                     f"do not match the types of the first rows: {e}") from e
+                writer.write_table(table)
+                rows += len(chunk)
+                del chunk, table
+                self._track_memory()
+                if progress is not None and total_rows:
+                    progress(int(total_bytes * min(rows, total_rows) / total_rows), total_bytes)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    def read(self, progress: Optional[ProgressCallback] = None, spool_dir: Optional[str] = None) -> pd.DataFrame:
+        """
+        Read the whole file.
+
+        Args:
+            progress: Optional callback receiving (bytes_read, total_bytes) (see to_parquet)
+            spool_dir: Directory of the temporary Parquet file (defaults to the folder of the file)
+
+        Returns:
+            The parsed DataFrame
+        """
+        start_time = time.perf_counter()
+        self.peak_memory = None
+        self._track_memory()
+
+        if pa is None:
+            # Without Parquet support the chunks are concatenated in memory
+            df = pd.concat([chunk for chunk, _ in self.iter_chunks()], ignore_index=True)
+        else:
+            spool_dir = spool_dir or os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(spool_dir, exist_ok=True)
+            spool_path = os.path.join(spool_dir, f".{os.path.basename(self.path)}.{os.getpid()}.parquet.tmp")
+            try:
+                self.to_parquet(spool_path, progress)
+                df = pq.read_table(spool_path).to_pandas(split_blocks=True, self_destruct=True)
+            finally:
+                if os.path.exists(spool_path):
+                    os.remove(spool_path)
+            df = self._restore_integers(df)
+
+        self.rows = len(df)
+        self.seconds = time.perf_counter() - start_time
+        self._track_memory()
+        return df
+
+    def _restore_integers(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Cast the integer columns widened to float64 back to int64 when no value is missing."""
+        for col in self.integer_columns:
+            values = df[col].to_numpy()
+            if not np.isnan(values).any():
+                df[col] = values.astype("int64")
+        return df
+
+    def summary(self) -> str:
+        """Human-readable summary of the last read."""
+        text = f"{self.rows:,} rows in {self.seconds:.2f} s ({self.rows_per_second:,.0f} rows/s"
+        if self.peak_memory is not None:
+            text += f", peak memory {self.peak_memory / 1024**2:.1f} MB"
+        return text + ")"
+
+
+def read_dataset_file(path: str, progress: Optional[ProgressCallback] = None,
+                      spool_dir: Optional[str] = None, delimiter: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Parse a dataset into a dataframe according to its extension.
+    Text formats may be compressed (.gz, .bz2, .zst, .xz); they are decompressed while read.
+    Directories and .shards files are read as sharded datasets.
+    CSV exports with a REDCap data dictionary next to them are read with the types it declares.
+
+    Args:
+        path: Path of the dataset
+        progress: Optional callback receiving (bytes_read, total_bytes)
+        spool_dir: Directory for the temporary Parquet files of SAS/SPSS/Stata conversions
+        delimiter: Delimiter of CSV/TSV files (detected from the first bytes if None)
+
+    Returns:
+        The parsed DataFrame, or None if the format is not supported
+    """
+    if is_sharded(path):
+        return read_sharded(resolve_shards(path), progress, delimiter=delimiter)
+
+    base_path, compression = split_compression(path)
+
+    dictionary_path = find_data_dictionary(path) if path.endswith(".csv") else None
+    if dictionary_path is not None:
+        df = read_redcap_export(path, dictionary_path)
+        if df is not None:
+            print(f"✅ Read {os.path.basename(path)} with the types of {os.path.basename(dictionary_path)}")
+            return df
+
+    if base_path.endswith((".csv", ".tsv")):
+        dialect = sniff_csv_file(path, delimiter)
+        reader = StreamingCsvReader(path, **dialect.read_csv_kwargs())
+        df = reader.read(progress)
+        print(f"✅ Read {os.path.basename(path)} ({dialect.describe()}): {reader.summary()}")
+        return df
+    elif base_path.endswith(".fwf"):
+        reader = StreamingCsvReader(path, encoding="utf-8")
+        df = reader.read(progress)
+        print(f"✅ Read {os.path.basename(path)}: {reader.summary()}")
+        return df
+    elif base_path.endswith(".jsonl"):
+        return read_json_lines(path, progress)
+    elif base_path.endswith(".json"):
+        try:
+            return pd.read_json(path, compression=compression)
+        except ValueError:
+            # Line-delimited JSON saved with a .json extension
+            return read_json_lines(path, progress)
+    elif compression is not None:
+        raise ValueError(f"Compressed files are only supported for text formats (CSV, TSV, JSON): {os.path.basename(path)}")
+    elif path.endswith((".xlsx", ".xls")):
+        return pd.read_excel(path)
+    elif path.endswith(".feather"):
+        return pd.read_feather(path)
+    elif path.endswith((".h5", ".hdf5")):
+        return pd.read_hdf(path)
+    elif path.endswith((".html", ".htm")):
+        return pd.read_html(path)[0]
+    elif path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    elif path.endswith((".pkl", ".pickle")):
+        return pd.read_pickle(path)
+    elif path.endswith(STATISTICAL_EXTENSIONS):
+        reader = StatisticalFileReader(path)
+        df = reader.read(progress, spool_dir)
+        print(f"✅ Read {os.path.basename(path)}: {reader.summary()}")
+        return df
+    else:
+        return None
+
+
+def is_sharded(path: str) -> bool:
+    """Whether a dataset path points at several shard files (a directory or a .shards file)."""
+    return os.path.isdir(path) or path.endswith(SHARDS_EXTENSION)
+
+
+def resolve_shards(path: str) -> List[str]:
+    """
+    List the shard files of a sharded dataset.
+
+    Args:
+        path: Directory holding the shards, or .shards file whose first line is a glob pattern
+            (relative patterns are resolved from the folder of the .shards file)
+
+    Returns:
+        Sorted list of shard paths
+    """
+    if os.path.isdir(path):
+        shards = [os.path.join(path, name) for name in os.listdir(path) if not name.startswith(".")]
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        if not lines:
+            raise ValueError(f"Shard list {os.path.basename(path)} does not contain a file pattern")
+        pattern = lines[0]
+        if not os.path.isabs(pattern):
+            pattern = os.path.join(os.path.dirname(path), pattern)
+        shards = glob.glob(pattern)
+
+    shards = sorted(shard for shard in shards if os.path.isfile(shard))
+    if not shards:
+        raise ValueError(f"No shard files found for {os.path.basename(path)}")
+    return shards
+
+
+def _read_shard(path: str, delimiter: Optional[str] = None):
+    """Read one shard (usually in a worker process) and return it as an Arrow table (sent back without pickling rows)."""
+    df = read_dataset_file(path, delimiter=delimiter)
+    if df is None:
+        raise ValueError(f"Unsupported shard format: {os.path.basename(path)}")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _unify_shard_types(tables: List["pa.Table"], paths: List[str]) -> List["pa.Table"]:
+    """
+    Check that all shards have the same columns and cast columns whose type differs between shards
+    (e.g. int in one month, float in another) to a common type.
+    """
+    names = tables[0].schema.names
+    for table, path in zip(tables[1:], paths[1:]):
+        if table.schema.names != names:
+            missing = [name for name in names if name not in table.schema.names]
+            extra = [name for name in table.schema.names if name not in names]
+            raise ValueError(
+                f"Shard {os.path.basename(path)} does not match the schema of {os.path.basename(paths[0])}. "
+                f"Missing columns: {missing or 'none'}. Unexpected columns: {extra or 'none'}."
+            )
+
+    for position, name in enumerate(names):
+        types = [table.schema.field(position).type for table in tables]
+        if all(t == types[0] for t in types):
+            continue
+
+        value_types = [t.value_type if pa.types.is_dictionary(t) else t for t in types if not pa.types.is_null(t)]
+        if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in value_types):
+            target = pa.float64()
+        elif all(pa.types.is_boolean(t) for t in value_types):
+            target = pa.bool_()
+        else:
+            target = pa.string()
+
+        for i, table in enumerate(tables):
+            column = table.column(position)
+            if pa.types.is_dictionary(column.type):
+                column = pc.cast(column, column.type.value_type)
+            tables[i] = table.set_column(position, name, pc.cast(column, target))
+    return tables
+
+
+def read_sharded(paths: List[str], progress: Optional[ProgressCallback] = None,
+                 max_workers: Optional[int] = None, delimiter: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read same-schema shard files in parallel across a process pool (in this process when they are small)
+    and concatenate them.
+
+    Args:
+        paths: Shard file paths (concatenated in this order)
+        progress: Optional callback receiving (bytes_read, total_bytes) as shards complete
+        max_workers: Number of worker processes (defaults to the number of cores)
+        delimiter: Delimiter of CSV/TSV shards (detected per shard if None)
+
+    Returns:
+        The concatenated DataFrame
+    """
+    if pa is None:
+        raise ValueError("Reading sharded datasets requires the 'pyarrow' package")
+
+    sizes = [os.path.getsize(path) for path in paths]
+    total_bytes = sum(sizes)
+    max_workers = max(1, min(len(paths), max_workers or os.cpu_count() or 1))
+    start_time = time.perf_counter()
+
+    tables = [None] * len(paths)
+    read_bytes = 0
+    if max_workers == 1 or total_bytes < SHARDS_PARALLEL_MIN_BYTES:
+        # Starting workers would take longer than reading the shards
+        max_workers = 1
+        for i, path in enumerate(paths):
+            tables[i] = _read_shard(path, delimiter)
+            read_bytes += sizes[i]
+            if progress is not None:
+                progress(read_bytes, total_bytes)
+    else:
+        # 'spawn' avoids forking the GUI process, which may be running other threads
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = {executor.submit(_read_shard, path, delimiter): i for i, path in enumerate(paths)}
+            try:
+                for future in as_completed(futures):
+                    i = futures[future]
+                    tables[i] = future.result()
+                    read_bytes += sizes[i]
+                    if progress is not None:
+                        progress(read_bytes, total_bytes)
+            except BaseException:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    tables = _unify_shard_types(tables, paths)
+    table = pa.concat_tables(tables)
+    del tables
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+
+    seconds = time.perf_counter() - start_time
+    print(f"✅ Read {len(paths)} shards with {max_workers} workers: {len(df):,} rows in {seconds:.2f} s")
+    return df
@@ -0,0 +1,221 @@
+"""
+Content-addressed dataset storage shared by all projects.
+Every imported file is stored once under its content fingerprint and projects
+reference it through hard links (or reflinks), so importing the same export
+into several projects does not duplicate it on disk.
+"""
+
+import json
+import os
+import shutil
+from typing import Dict, Optional
+
+from utils.dataset_cache import DatasetCache
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+STORE_DIR_NAME = ".store"
+
+# Project files referencing each stored file (path -> fingerprint)
+REFERENCES_FILE_NAME = "references.json"
+
+# ioctl request cloning a file on copy-on-write filesystems (Btrfs, XFS) on Linux
+FICLONE = 0x40049409
+
+
+def _reflink(source_path: str, target_path: str) -> bool:
+    """Clone a file sharing its data blocks, if the filesystem supports it."""
+    if fcntl is None:
+        return False
+    try:
+        with open(source_path, "rb") as source, open(target_path, "wb") as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        # Same mtime as the source, like shutil.copy2
+        shutil.copystat(source_path, target_path)
+        return True
+    except OSError:
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        return False
+
+
+def _share(source_path: str, target_path: str) -> bool:
+    """Create target_path sharing the data of source_path (hard link, or reflink); False if neither works."""
+    try:
+        os.link(source_path, target_path)
+        return True
+    except OSError:
+        # Hard links do not work across filesystems or on some network drives
+        return _reflink(source_path, target_path)
+
+
+class DatasetStore:
+    """Store of dataset files keyed by content fingerprint."""
+
+    def __init__(self, store_dir: str):
+        """
+        Args:
+            store_dir: Directory holding the stored files, the fingerprint index and the references
+        """
+        self.store_dir = store_dir
+        # The cache index remembers the fingerprint of each imported file by size and mtime,
+        # so re-importing an unchanged file does not hash it again
+        self.index = DatasetCache(store_dir)
+        self.references_path = os.path.join(store_dir, REFERENCES_FILE_NAME)
+        self._references: Optional[Dict[str, str]] = None
+        self._sharing: Dict[str, bool] = {}
+
+    def object_path(self, fingerprint: str) -> str:
+        """Path of the stored copy of a file with the given fingerprint."""
+        return os.path.join(self.store_dir, fingerprint[:2], fingerprint)
+
+    def _read_references(self) -> Dict[str, str]:
+        if self._references is None:
+            self._references = {}
+            if os.path.exists(self.references_path):
+                try:
+                    with open(self.references_path, "r", encoding="utf-8") as f:
+                        self._references = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Warning: Could not read dataset store references: {e}")
+        return self._references
+
+    def _write_references(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = self.references_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._read_references(), f, indent=2)
+            os.replace(tmp_path, self.references_path)
+        except OSError as e:
+            print(f"Warning: Could not write dataset store references: {e}")
+
+    def can_share(self, folder: str) -> bool:
+        """Whether files of the store can be hard linked or reflinked into a folder (probed once per folder)."""
+        folder = os.path.abspath(folder)
+        if folder not in self._sharing:
+            os.makedirs(self.store_dir, exist_ok=True)
+            probe_path = os.path.join(self.store_dir, ".probe")
+            target_path = os.path.join(folder, ".store-probe")
+            try:
+                with open(probe_path, "wb") as f:
+                    f.write(b"\0")
+                self._sharing[folder] = _share(probe_path, target_path)
+            finally:
+                for path in (probe_path, target_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+        return self._sharing[folder]
+
+    def add(self, origin_path: str) -> str:
+        """
+        Store a file if its contents are not stored yet.
+        The stored copy is a reflink of the original file where the filesystem supports it.
+
+        Args:
+            origin_path: Path of the file to import
+
+        Returns:
+            Path of the stored copy
+        """
+        fingerprint = self.index.fingerprint(origin_path)
+        path = self.object_path(fingerprint)
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        try:
+            if not _reflink(origin_path, tmp_path):
+                # copy2 keeps the mtime, so project links look unchanged to the dataset cache index
+                shutil.copy2(origin_path, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.index.remember(path, fingerprint)
+        return path
+
+    def link(self, origin_path: str, target_path: str) -> bool:
+        """
+        Import a file into a project as a reference to its stored copy.
+        Re-importing an unchanged file is a no-op. Where the project cannot share the store's data
+        (no hard links nor reflinks), it gets a plain copy and the store is not used.
+
+        Args:
+            origin_path: Path of the file to import
+            target_path: Path of the dataset inside the project
+
+        Returns:
+            True if the dataset was added or updated, False if the project already had the same file
+        """
+        fingerprint = self.index.fingerprint(origin_path)
+        if os.path.isfile(target_path) and self.index.fingerprint(target_path) == fingerprint:
+            return False
+
+        shared = self.can_share(os.path.dirname(os.path.abspath(target_path)))
+        tmp_path = target_path + ".tmp"
+        try:
+            if shared:
+                path = self.add(origin_path)
+                if not _share(path, tmp_path):
+                    shutil.copy2(path, tmp_path)
+            else:
+                shutil.copy2(origin_path, tmp_path)
+            os.replace(tmp_path, target_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.index.remember(target_path, fingerprint)
+
+        references = self._read_references()
+        if shared:
+            references[os.path.abspath(target_path)] = fingerprint
+        else:
+            references.pop(os.path.abspath(target_path), None)
+        self._write_references()
+        # The replaced dataset may have been the last reference to its stored copy
+        self.prune()
+        return True
+
+    def prune(self) -> int:
+        """
+        Delete the stored files no project references any more (their datasets or projects were deleted
+        or replaced), as recorded in the references of the store or through hard links.
+
+        Returns:
+            Number of stored files deleted
+        """
+        if not os.path.isdir(self.store_dir):
+            return 0
+        references = self._read_references()
+        dangling = [path for path in references if not os.path.exists(path)]
+        for path in dangling:
+            del references[path]
+        if dangling:
+            self._write_references()
+        referenced = set(references.values())
+
+        removed = 0
+        for prefix in os.listdir(self.store_dir):
+            folder = os.path.join(self.store_dir, prefix)
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                if name in referenced or name.endswith(".tmp"):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    # Hard linked files are still referenced (e.g. imported before references were recorded)
+                    if os.stat(path).st_nlink > 1:
+                        continue
+                    os.remove(path)
+                    removed += 1
+                except OSError as e:
+                    print(f"Warning: Could not prune stored dataset {name}: {e}")
+        if removed or dangling:
+            self.index.forget_missing()
+        return removed
@@ -0,0 +1,125 @@
+"""
+Clean-up of text labels applied once when a dataset is ingested.
+Strips the b'...' wrappers left by Python-serialised exports and surrounding whitespace,
+unifies labels that only differ in case and stores the result as categorical codes.
+Work is done on the distinct values of each column, never row by row.
+"""
+
+import re
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+
+# Text columns with at most this share of distinct values are stored as 'category'
+CATEGORY_MAX_RATIO = 0.5
+
+# str() of a bytes object: b'...' or b"..."
+BYTES_LITERAL = re.compile(r"""^b(['"])(.*)\1$""", re.DOTALL)
+
+
+def clean_label(value: Any) -> Any:
+    """
+    Strip a byte-literal wrapper and surrounding whitespace from a label.
+
+    Returns:
+        The cleaned label (non-text values are returned unchanged)
+    """
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", errors="replace")
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    match = BYTES_LITERAL.match(value)
+    if match:
+        value = match.group(2).strip()
+    return value
+
+
+def _unify_case(labels: pd.Index, counts: np.ndarray) -> pd.Index:
+    """Replace labels that only differ in case by their most frequent spelling."""
+    keys = labels.str.casefold()
+    if keys.nunique() == len(labels):
+        return labels
+    order = np.argsort(-counts, kind="stable")
+    spelling = {}
+    for position in order:
+        spelling.setdefault(keys[position], labels[position])
+    return pd.Index([spelling[key] for key in keys])
+
+
+def _normalize_column(column: pd.Series) -> Optional[Tuple[pd.Series, bool]]:
+    """
+    Clean the labels of a text column.
+
+    Returns:
+        Tuple of (normalised column, whether any label changed), or None if the column does not hold text
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        uniques = column.cat.categories
+    else:
+        codes, uniques = pd.factorize(column, use_na_sentinel=True)
+        uniques = pd.Index(uniques)
+
+    if len(uniques) == 0 or not all(isinstance(value, (str, bytes)) for value in uniques):
+        return None
+
+    cleaned = pd.Index([clean_label(value) for value in uniques])
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    cleaned = _unify_case(cleaned, counts)
+    changed = not cleaned.equals(pd.Index(uniques, dtype=object))
+
+    # Labels that became equal share one code; empty labels become missing values
+    new_codes, categories = pd.factorize(cleaned)
+    empty = categories == ""
+    if empty.any():
+        remap = np.cumsum(~empty) - 1
+        remap[empty] = -1
+        new_codes = remap[new_codes]
+        categories = categories[~empty]
+    codes = np.where(codes >= 0, new_codes[np.maximum(codes, 0)], -1)
+
+    normalized = pd.Series(pd.Categorical.from_codes(codes, categories=categories),
+                           index=column.index, name=column.name)
+    non_null = int((codes >= 0).sum())
+    if not isinstance(column.dtype, pd.CategoricalDtype) and len(categories) > non_null * CATEGORY_MAX_RATIO:
+        # Free text (one value per row) gains nothing from codes
+        normalized = normalized.astype(object)
+    return normalized, changed or bool(empty.any())
+
+
+def normalize_labels(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Normalise the text labels of a dataframe.
+
+    Args:
+        df: DataFrame to normalise
+
+    Returns:
+        Tuple of (normalized_df, statistics_dict)
+    """
+    result = df.copy(deep=False)
+    normalized_columns = []
+    changed_columns = []
+
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        if not (column.dtype == object or isinstance(column.dtype, pd.CategoricalDtype)):
+            continue
+
+        outcome = _normalize_column(column)
+        if outcome is None:
+            continue
+
+        normalized, changed = outcome
+        if changed:
+            changed_columns.append(str(column.name))
+        result.isetitem(position, normalized)
+        normalized_columns.append(str(column.name))
+
+    statistics = {
+        'normalized_columns': len(normalized_columns),
+        'changed_columns': changed_columns
+    }
+
+    return result, statistics
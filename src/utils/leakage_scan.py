@@ -0,0 +1,249 @@
+"""
+Pre-flight scan of the candidate input features before autoconfig.
+Features that are trivial proxies of the target (a derived score, a post-outcome field)
+and features that repeat another one are dropped, so no hyperopt trial is spent on them.
+Association scores are computed on integer codes with bincount contingency tables:
+mutual information (as the share of the target's entropy explained), Cramér's V
+and, between numeric columns, correlation.
+"""
+
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.dataset_profile import column_codes
+
+# A feature explaining at least this share of the target (uncertainty coefficient or Cramér's V) leaks it
+LEAKAGE_THRESHOLD = 0.95
+
+# Numeric features correlated at least this much (in absolute value) with an earlier one are redundant
+REDUNDANCY_THRESHOLD = 0.99
+
+# Numeric columns with more distinct values are split into this many quantile bins
+QUANTILE_BINS = 20
+
+# Mutual information is not trusted for features with more levels (ids and free text determine any target)
+MAX_LEVELS = 50
+
+# ... nor for features with fewer rows than this per level, as any feature with about one row per level
+# determines the target (the cap on levels grows with the rows of the cohort up to MAX_LEVELS)
+MIN_ROWS_PER_LEVEL = 10
+
+# Datasets with fewer rows are not scanned, as the scores would be dominated by chance
+MIN_ROWS = 50
+
+# Rows (evenly spaced) used to correlate the numeric features with each other
+CORRELATION_SAMPLE_ROWS = 100_000
+
+CodesProvider = Callable[[str], Tuple[np.ndarray, pd.Index]]
+
+
+def _is_numeric(column: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column)
+
+
+def _quantile_bins(column: pd.Series) -> Tuple[np.ndarray, int]:
+    """
+    Codes used in contingency tables for numeric columns with many values: their quantile bins.
+
+    Returns:
+        Tuple of (codes, number of levels), -1 for missing values
+    """
+    values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    present = ~np.isnan(values)
+    edges = np.unique(np.quantile(values[present], np.linspace(0, 1, QUANTILE_BINS + 1)[1:-1]))
+    binned = np.full(len(values), -1, dtype=np.int64)
+    binned[present] = np.searchsorted(edges, values[present], side="right")
+    return binned, len(edges) + 1
+
+
+def _contingency(x: np.ndarray, kx: int, y: np.ndarray, ky: int) -> np.ndarray:
+    """Rows of each (x, y) pair of codes, over the rows where both are present."""
+    present = (x >= 0) & (y >= 0)
+    table = np.bincount(x[present] * ky + y[present], minlength=kx * ky).reshape(kx, ky)
+    # Levels absent from the rows compared do not count as categories
+    return table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+
+
+def _entropy(counts: np.ndarray) -> float:
+    total = counts.sum()
+    p = counts[counts > 0] / total
+    return float(-(p * np.log(p)).sum())
+
+
+def uncertainty_coefficient(table: np.ndarray) -> float:
+    """Share of the entropy of the target (columns) explained by the feature (rows): I(X; Y) / H(Y)."""
+    target_entropy = _entropy(table.sum(axis=0))
+    if table.sum() == 0 or target_entropy == 0:
+        return 0.0
+    mutual_information = target_entropy + _entropy(table.sum(axis=1)) - _entropy(table.ravel())
+    return float(np.clip(mutual_information / target_entropy, 0.0, 1.0))
+
+
+def cramers_v(table: np.ndarray) -> float:
+    """Bias-corrected Cramér's V of a contingency table (Bergsma, 2013)."""
+    n = table.sum()
+    r, k = table.shape
+    if n < 2 or r < 2 or k < 2:
+        return 0.0
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    chi2 = float(((table - expected) ** 2 / expected).sum())
+    phi2 = max(0.0, chi2 / n - (k - 1) * (r - 1) / (n - 1))
+    r_corrected = r - (r - 1) ** 2 / (n - 1)
+    k_corrected = k - (k - 1) ** 2 / (n - 1)
+    denominator = min(k_corrected - 1, r_corrected - 1)
+    return float(np.sqrt(phi2 / denominator)) if denominator > 0 else 0.0
+
+
+def _correlation(a: np.ndarray, b: np.ndarray) -> float:
+    present = ~(np.isnan(a) | np.isnan(b))
+    if present.sum() < 3 or a[present].std() == 0 or b[present].std() == 0:
+        return 0.0
+    return float(np.corrcoef(a[present], b[present])[0, 1])
+
+
+def _partition_digest(codes: np.ndarray) -> str:
+    """Digest of the grouping of rows made by a column, equal for columns that only relabel each other."""
+    canonical = pd.factorize(codes)[0]
+    return hashlib.blake2b(canonical.astype(np.int64).tobytes(), digest_size=16).hexdigest()
+
+
+def _correlated_pairs(numeric: pd.DataFrame) -> Dict[int, int]:
+    """
+    Numeric columns correlated above REDUNDANCY_THRESHOLD with an earlier column.
+    Correlations use the rows where both columns are present, and are all computed at once
+    from matrix products over at most CORRELATION_SAMPLE_ROWS rows.
+
+    Returns:
+        Mapping of column position -> position of the earlier column it repeats
+    """
+    if len(numeric) > CORRELATION_SAMPLE_ROWS:
+        numeric = numeric.iloc[np.linspace(0, len(numeric) - 1, CORRELATION_SAMPLE_ROWS).astype(np.intp)]
+    values = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+    present = ~np.isnan(values)
+    # Centring first keeps the sums of squares accurate
+    values = np.where(present, values - np.nanmean(values, axis=0), 0.0)
+    weights = present.astype(np.float64)
+
+    # Sums over the rows where both columns i and j are present
+    n = weights.T @ weights
+    sum_x = values.T @ weights                # sum of column i
+    sum_xx = (values ** 2).T @ weights        # sum of squares of column i
+    sum_xy = values.T @ values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = n * sum_xy - sum_x * sum_x.T
+        variance = (n * sum_xx - sum_x ** 2) * (n * sum_xx - sum_x ** 2).T
+        correlations = np.abs(np.where((variance > 0) & (n >= 3), covariance / np.sqrt(variance), 0.0))
+
+    pairs = {}
+    # Upper triangle: each column is compared with the earlier ones
+    later, earlier = np.nonzero(np.triu(correlations >= REDUNDANCY_THRESHOLD, k=1).T)
+    for j, i in zip(later.tolist(), earlier.tolist()):
+        if j not in pairs and i not in pairs:
+            pairs[j] = i
+    return pairs
+
+
+def scan_features(df: pd.DataFrame, target: str, codes: Optional[CodesProvider] = None,
+                  distinct_counts: Optional[Dict[str, int]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Drop the features that leak the target or repeat another feature.
+
+    Args:
+        df: Dataset with the candidate input features and the target
+        target: Name of the target column
+        codes: Optional callable returning the codes of a column for the rows of df (see dataset_profile.column_codes),
+            e.g. cached per dataset; codes are computed from df otherwise. Only used for the columns
+            that are not binned (categorical columns and numeric ones with few values)
+        distinct_counts: Optional number of distinct values of each column (e.g. from the dataset profile),
+            which decides whether a numeric column is binned; counted on df otherwise
+
+    Returns:
+        Tuple of (scanned_df, statistics_dict)
+    """
+    statistics = {
+        'scanned_columns': 0,
+        'removed_count': 0,
+        'leaking_columns': {},
+        'redundant_columns': {},
+        'scores': {}
+    }
+    if target not in df.columns or len(df) < MIN_ROWS:
+        return df, statistics
+
+    def levels(position: int) -> Tuple[np.ndarray, int]:
+        name = str(df.columns[position])
+        column = df.iloc[:, position]
+        if _is_numeric(column):
+            distinct = (distinct_counts or {}).get(name)
+            if (distinct if distinct is not None else column.nunique()) > QUANTILE_BINS:
+                # Binned from the values, so the column is never factorized
+                return _quantile_bins(column)
+        row_codes, labels = codes(name) if codes is not None else column_codes(column)
+        return row_codes.astype(np.int64, copy=False), len(labels)
+
+    target_position = df.columns.get_loc(target)
+    target_column = df.iloc[:, target_position]
+    target_levels, target_count = levels(target_position)
+    target_numeric = _is_numeric(target_column)
+    max_levels = min(MAX_LEVELS, len(df) // MIN_ROWS_PER_LEVEL)
+    target_values = target_column.to_numpy(dtype=np.float64, na_value=np.nan) if target_numeric else None
+
+    removed = set()
+    digests = {}
+    features = [position for position in range(df.shape[1]) if position != target_position]
+    for position in features:
+        name = str(df.columns[position])
+        column = df.iloc[:, position]
+        feature_levels, feature_count = levels(position)
+        table = _contingency(feature_levels, feature_count, target_levels, target_count)
+
+        scores = {'cramers_v': cramers_v(table)}
+        if feature_count <= max_levels:
+            scores['mutual_information'] = uncertainty_coefficient(table)
+        if target_numeric and _is_numeric(column):
+            scores['correlation'] = _correlation(column.to_numpy(dtype=np.float64, na_value=np.nan), target_values)
+        statistics['scores'][name] = scores
+
+        leakage = max(abs(score) for score in scores.values())
+        if leakage >= LEAKAGE_THRESHOLD:
+            statistics['leaking_columns'][name] = round(leakage, 3)
+            removed.add(position)
+            continue
+
+        if not _is_numeric(column) and feature_count <= max_levels:
+            # A categorical column grouping the rows exactly like an earlier one is a relabelling of it.
+            # Near-unique columns (ids, dates, free text) all group the rows alike, one row per group,
+            # so only columns with few levels for the rows are compared
+            digest = _partition_digest(feature_levels)
+            if digest in digests:
+                statistics['redundant_columns'][name] = str(df.columns[digests[digest]])
+                removed.add(position)
+                continue
+            digests[digest] = position
+
+    numeric = [position for position in features if position not in removed and _is_numeric(df.iloc[:, position])]
+    if len(numeric) > 1:
+        for later, earlier in _correlated_pairs(df.iloc[:, numeric]).items():
+            statistics['redundant_columns'][str(df.columns[numeric[later]])] = str(df.columns[numeric[earlier]])
+            removed.add(numeric[later])
+
+    statistics['scanned_columns'] = len(features)
+    statistics['removed_count'] = len(removed)
+    scanned = df.iloc[:, [position for position in range(df.shape[1]) if position not in removed]]
+    return scanned, statistics
+
+
+def describe_leakage(statistics: Dict[str, Any]) -> str:
+    """Human-readable summary of the columns removed by scan_features."""
+    if not statistics or statistics['removed_count'] == 0:
+        return "none"
+    parts = []
+    if statistics['leaking_columns']:
+        leaking = [f"{name} ({score:.2f})" for name, score in statistics['leaking_columns'].items()]
+        parts.append(f"leaking the target: {', '.join(leaking)}")
+    if statistics['redundant_columns']:
+        redundant = [f"{name} (~ {original})" for name, original in statistics['redundant_columns'].items()]
+        parts.append(f"redundant: {', '.join(redundant)}")
+    return f"{statistics['removed_count']} of {statistics['scanned_columns']} ({'; '.join(parts)})"
@@ -0,0 +1,311 @@
+"""
+Typed loader for REDCap exports driven by the project's data dictionary.
+Builds dates, times, numbers, labelled categories and checkbox booleans straight
+from the field definitions instead of letting pandas infer them from strings,
+and gives every column its unique REDCap variable name.
+Works with both raw exports (codes, variable names as headers) and label exports
+(human labels as headers and values).
+"""
+
+import os
+import re
+import glob
+import fnmatch
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from utils.dataset_compactor import parse_boolean_label
+
+# File name pattern of REDCap data dictionary exports (<Project>_DataDictionary_<date>.csv)
+DICTIONARY_PATTERN = "*DataDictionary*.csv"
+
+# Columns of the data dictionary export
+FIELD_NAME = "Variable / Field Name"
+FORM_NAME = "Form Name"
+FIELD_TYPE = "Field Type"
+FIELD_LABEL = "Field Label"
+FIELD_CHOICES = "Choices, Calculations, OR Slider Labels"
+FIELD_VALIDATION = "Text Validation Type OR Show Slider Number"
+
+# Status of each instrument, exported as <form>_complete
+FORM_STATUS = {"0": "Incomplete", "1": "Unverified", "2": "Complete"}
+
+# Field types without a column in the exports
+NON_DATA_TYPES = ("descriptive",)
+
+# Columns REDCap adds to the exports of longitudinal projects, repeated instruments and data access groups,
+# by their header in label exports
+EXPORT_EXTRA_COLUMNS = {
+    "Event Name": "redcap_event_name",
+    "Repeat Instrument": "redcap_repeat_instrument",
+    "Repeat Instance": "redcap_repeat_instance",
+    "Data Access Group": "redcap_data_access_group",
+    "Survey Identifier": "redcap_survey_identifier",
+}
+
+DATE_FORMATS = {
+    "date": "%Y-%m-%d",
+    "datetime": "%Y-%m-%d %H:%M",
+    "datetime_seconds": "%Y-%m-%d %H:%M:%S",
+}
+
+
+def is_data_dictionary(path: str) -> bool:
+    """Whether a file name looks like a REDCap data dictionary export."""
+    return fnmatch.fnmatch(os.path.basename(path), DICTIONARY_PATTERN)
+
+
+def find_data_dictionary(data_path: str) -> Optional[str]:
+    """
+    Find the data dictionary of a REDCap export in the same folder:
+    the one sharing the export's project prefix (<Project>_DATA_... and <Project>_DataDictionary_...).
+
+    Args:
+        data_path: Path of the exported data
+
+    Returns:
+        Path of the data dictionary, or None if there is none
+    """
+    if is_data_dictionary(data_path):
+        return None
+
+    folder = os.path.dirname(os.path.abspath(data_path))
+    dictionaries = sorted(glob.glob(os.path.join(folder, DICTIONARY_PATTERN)))
+    # Other CSV files in the folder are not exports of the project, even if it has a single dictionary
+    prefix = os.path.basename(data_path).split("_DATA")[0]
+    matching = [path for path in dictionaries if os.path.basename(path).split("_DataDictionary")[0] == prefix]
+    return matching[-1] if matching else None
+
+
+def _strip_html(text: str) -> str:
+    return re.sub(r"<[^>]+>", "", text).strip()
+
+
+class RedcapField:
+    """Definition of one field of a REDCap data dictionary."""
+
+    def __init__(self, name: str, form: str, field_type: str, label: str,
+                 choices: Dict[str, str], validation: str):
+        """
+        Args:
+            name: Variable name
+            form: Instrument (form) the field belongs to
+            field_type: REDCap field type (text, radio, checkbox, yesno, calc...)
+            label: Field label shown in label exports
+            choices: Mapping from choice code to choice label
+            validation: Text validation type (date_ymd, integer, number...)
+        """
+        self.name = name
+        self.form = form
+        self.field_type = field_type
+        self.label = label
+        self.choices = choices
+        self.validation = validation
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'name': self.name,
+            'form': self.form,
+            'field_type': self.field_type,
+            'label': self.label,
+            'choices': self.choices,
+            'validation': self.validation
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> 'RedcapField':
+        return cls(data['name'], data['form'], data['field_type'], data['label'],
+                   data['choices'], data['validation'])
+
+
+def parse_choices(text: str) -> Dict[str, str]:
+    """
+    Parse a REDCap choice list ("1, Male | 2, Female") into a code -> label mapping.
+    """
+    choices = {}
+    for item in str(text).split("|"):
+        if "," not in item:
+            continue
+        code, label = item.split(",", 1)
+        choices[code.strip()] = _strip_html(label)
+    return choices
+
+
+class RedcapDictionary:
+    """Fields of a REDCap project, in export order."""
+
+    def __init__(self, fields: List[RedcapField]):
+        self.fields = fields
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'RedcapDictionary':
+        """
+        Read a data dictionary export.
+
+        Args:
+            path: Path of the data dictionary CSV
+
+        Returns:
+            The parsed dictionary
+        """
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+        missing = [col for col in (FIELD_NAME, FORM_NAME, FIELD_TYPE, FIELD_LABEL) if col not in df.columns]
+        if missing:
+            raise ValueError(f"{os.path.basename(path)} is not a REDCap data dictionary (missing columns: {missing})")
+
+        fields = []
+        for _, row in df.iterrows():
+            field_type = row[FIELD_TYPE].strip()
+            if field_type in NON_DATA_TYPES:
+                continue
+            choices = {}
+            if field_type in ("dropdown", "radio", "checkbox"):
+                choices = parse_choices(row.get(FIELD_CHOICES, ""))
+            fields.append(RedcapField(
+                name=row[FIELD_NAME].strip(),
+                form=row[FORM_NAME].strip(),
+                field_type=field_type,
+                label=_strip_html(row[FIELD_LABEL]),
+                choices=choices,
+                validation=row.get(FIELD_VALIDATION, "").strip()
+            ))
+        return cls(fields)
+
+    def export_columns(self) -> List[Tuple[str, Optional[RedcapField], Optional[str]]]:
+        """
+        Columns of a full export, in order.
+        Checkbox fields have one column per choice and every form ends with its completion status.
+
+        Returns:
+            List of (column_name, field, choice_code); field is None for form status columns
+        """
+        columns = []
+        for position, field in enumerate(self.fields):
+            if field.field_type == "checkbox":
+                for code in field.choices:
+                    # Characters not allowed in variable names become underscores
+                    suffix = re.sub(r"\W", "_", code).lower()
+                    columns.append((f"{field.name}___{suffix}", field, code))
+            else:
+                columns.append((field.name, field, None))
+
+            is_last_of_form = position + 1 == len(self.fields) or self.fields[position + 1].form != field.form
+            if is_last_of_form:
+                columns.append((f"{field.form}_complete", None, None))
+        return columns
+
+
+def _typed_column(values: pd.Series, field: Optional[RedcapField], raw: bool) -> pd.Series:
+    """Convert the strings of one exported column to the type of its REDCap field."""
+    if field is None:
+        labels = list(FORM_STATUS.values())
+        if raw:
+            values = values.map(FORM_STATUS)
+        return pd.Series(pd.Categorical(values, categories=labels), index=values.index, name=values.name)
+
+    field_type = field.field_type
+    validation = field.validation
+
+    if field_type == "checkbox":
+        # Checkboxes are never missing: 1/0 in raw exports, Checked/Unchecked in label exports
+        return values.isin(["1", "Checked"])
+
+    if field_type in ("dropdown", "radio"):
+        labels = list(dict.fromkeys(field.choices.values()))
+        if raw:
+            values = values.map(field.choices)
+        return pd.Series(pd.Categorical(values, categories=labels), index=values.index, name=values.name)
+
+    if field_type in ("yesno", "truefalse"):
+        if raw:
+            values = values.map({"1": True, "0": False})
+        else:
+            values = values.map(lambda value: parse_boolean_label(value) if isinstance(value, str) else None)
+        if values.isna().any():
+            # bool cannot hold missing answers
+            labels = ["No", "Yes"] if field_type == "yesno" else ["False", "True"]
+            mapped = values.map({False: labels[0], True: labels[1]})
+            return pd.Series(pd.Categorical(mapped, categories=labels), index=values.index, name=values.name)
+        return values.astype(bool)
+
+    if field_type in ("calc", "slider") or validation in ("integer", "number") or validation.startswith("number_"):
+        if validation.endswith("comma_decimal"):
+            values = values.str.replace(",", ".", regex=False)
+        numbers = pd.to_numeric(values, errors="coerce")
+        if validation == "integer" and not numbers.isna().any():
+            return numbers.astype("int64")
+        return numbers.astype("float64")
+
+    if validation.startswith("date_"):
+        return pd.to_datetime(values, format=DATE_FORMATS["date"], errors="coerce")
+    if validation.startswith("datetime_seconds_"):
+        return pd.to_datetime(values, format=DATE_FORMATS["datetime_seconds"], errors="coerce")
+    if validation.startswith("datetime_"):
+        return pd.to_datetime(values, format=DATE_FORMATS["datetime"], errors="coerce")
+    if validation in ("time", "time_hh_mm_ss", "time_mm_ss"):
+        # Times of day are kept as the time elapsed since midnight
+        if validation == "time":
+            values = values + ":00"
+        elif validation == "time_mm_ss":
+            values = "00:" + values
+        return pd.to_timedelta(values, errors="coerce")
+
+    return values
+
+
+def read_redcap_export(data_path: str, dictionary_path: str, nrows: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """
+    Read a REDCap export with the types declared in its data dictionary.
+
+    Args:
+        data_path: Path of the exported data (raw or labels CSV)
+        dictionary_path: Path of the data dictionary CSV
+        nrows: Optional number of rows to read
+
+    Returns:
+        Typed DataFrame whose columns are the REDCap variable names, or None if the columns
+        of the export do not match the data dictionary (the file is then read as a plain CSV)
+    """
+    dictionary = RedcapDictionary.from_csv(dictionary_path)
+    columns = dictionary.export_columns()
+
+    # Every value is read as a string once and converted by its field type, without inference
+    df = pd.read_csv(data_path, dtype=str, encoding="utf-8-sig", nrows=nrows)
+    by_name = {name: field for name, field, _ in columns}
+
+    if len(df.columns) > 0 and df.columns[0] == columns[0][0]:
+        # Raw export (possibly of a subset of fields): headers are variable names.
+        # Columns REDCap adds for events or repeated instruments are kept as text
+        raw = True
+        names = list(df.columns)
+    elif len(df.columns) - sum(col in EXPORT_EXTRA_COLUMNS for col in df.columns) == len(columns):
+        # Label export: headers are labels, possibly duplicated, so columns are matched by position,
+        # skipping the columns REDCap adds for events or repeated instruments (kept as text)
+        raw = False
+        fields = iter(columns)
+        names = []
+        matched = []
+        for col in df.columns:
+            if col in EXPORT_EXTRA_COLUMNS:
+                names.append(EXPORT_EXTRA_COLUMNS[col])
+                continue
+            name, field, _ = next(fields)
+            names.append(name)
+            if field is not None:
+                matched.append((col.split(" (choice=")[0], field.label))
+        mismatches = sum(_strip_html(header) != label for header, label in matched)
+        if mismatches:
+            print(f"Warning: {mismatches} column labels of {os.path.basename(data_path)} "
+                  f"differ from the data dictionary; columns are matched by position")
+    else:
+        print(f"Warning: {os.path.basename(data_path)} has {len(df.columns)} columns but the data dictionary "
+              f"{os.path.basename(dictionary_path)} describes {len(columns)}; it is read without the dictionary")
+        return None
+
+    data = {}
+    for position, name in enumerate(names):
+        values = df.iloc[:, position].rename(name)
+        if name in by_name:
+            values = _typed_column(values, by_name[name], raw)
+        data[name] = values
+    return pd.DataFrame(data, index=df.index)
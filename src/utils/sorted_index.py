@@ -0,0 +1,106 @@
+"""
+Sorted index of a numeric or date column: the row positions in value order and the sorted values.
+Built once per column, it answers range predicates (greater than, between, date windows...)
+with two binary searches; counts need no scan and masks only a scatter of the matching rows.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Optional, Tuple
+
+# Columns of datasets with fewer rows are scanned instead, as a scan is already fast
+SORTED_INDEX_MIN_ROWS = 1_000_000
+
+
+def is_indexable(column: pd.Series) -> bool:
+    """Whether a column can be indexed: plain numeric (not boolean) or timezone-naive dates."""
+    dtype = column.dtype
+    if not isinstance(dtype, np.dtype) or dtype == bool:
+        return False
+    return pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype) \
+        or pd.api.types.is_datetime64_dtype(dtype)
+
+
+class SortedIndex:
+    """Row positions of a column in value order; missing values are left out."""
+
+    def __init__(self, order: np.ndarray, values: np.ndarray, rows: int):
+        """
+        Args:
+            order: Positions of the non-missing rows, sorted by value
+            values: Values of those rows, sorted (float64, or datetime64 for dates)
+            rows: Number of rows of the column
+        """
+        self.order = order
+        self.values = values
+        self.rows = rows
+
+    @classmethod
+    def from_column(cls, column: pd.Series) -> 'SortedIndex':
+        """Build the index of a column (see is_indexable)."""
+        values = column.to_numpy()
+        if not pd.api.types.is_datetime64_dtype(values.dtype):
+            values = values.astype(np.float64, copy=False)
+        # Missing values (NaN, NaT) are sorted last
+        order = np.argsort(values, kind="stable")
+        present = int((~pd.isna(values)).sum())
+        order = order[:present].astype(np.int32 if len(values) < 2 ** 31 else np.int64)
+        return cls(order, values[order], len(values))
+
+    def key(self, value: Any) -> Any:
+        """A rule value in the type of the sorted values."""
+        if pd.api.types.is_datetime64_dtype(self.values.dtype):
+            return np.datetime64(pd.Timestamp(value).to_datetime64(), "ns")
+        return float(value)
+
+    def bounds(self, low: Any = None, high: Any = None,
+               low_inclusive: bool = True, high_inclusive: bool = True) -> Tuple[int, int]:
+        """
+        Range of sorted positions holding the values between low and high.
+
+        Args:
+            low: Lower bound (None for no bound)
+            high: Upper bound (None for no bound)
+            low_inclusive: Whether values equal to low are included
+            high_inclusive: Whether values equal to high are included
+
+        Returns:
+            Tuple of (start, stop) into order
+        """
+        start = 0 if low is None else int(np.searchsorted(self.values, self.key(low), side="left" if low_inclusive else "right"))
+        stop = len(self.values) if high is None else int(np.searchsorted(self.values, self.key(high), side="right" if high_inclusive else "left"))
+        return start, max(start, stop)
+
+    def count(self, *args, **kwargs) -> int:
+        """Number of rows with values in a range (same arguments as bounds), without scanning the column."""
+        start, stop = self.bounds(*args, **kwargs)
+        return stop - start
+
+    def mask(self, *args, **kwargs) -> np.ndarray:
+        """Boolean mask of the rows with values in a range (same arguments as bounds)."""
+        start, stop = self.bounds(*args, **kwargs)
+        mask = np.zeros(self.rows, dtype=bool)
+        mask[self.order[start:stop]] = True
+        return mask
+
+
+def range_arguments(operator: str, value: Any) -> Optional[Tuple[Any, Any, bool, bool]]:
+    """
+    Arguments of SortedIndex.bounds for a criteria operator, or None if it is not a range predicate.
+
+    Returns:
+        Tuple of (low, high, low_inclusive, high_inclusive)
+    """
+    if operator == 'greater than':
+        return value, None, False, True
+    if operator == 'greater or equal':
+        return value, None, True, True
+    if operator == 'less than':
+        return None, value, True, False
+    if operator == 'less or equal':
+        return None, value, True, True
+    if operator == 'equals' and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value, value, True, True
+    if operator == 'between' and isinstance(value, (tuple, list)) and len(value) == 2:
+        return value[0], value[1], True, True
+    return None
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cohort import Cohort
+
+
+@pytest.mark.parametrize("rows", [0, 1, 7, 8, 1001])
+def test_cohort_round_trips_its_mask(rows):
+    mask = np.random.default_rng(rows).random(rows) < 0.4
+    cohort = Cohort.from_mask(mask)
+    assert cohort.bits.nbytes == (rows + 7) // 8
+    assert len(cohort) == cohort.size == mask.sum()
+    assert np.array_equal(cohort.mask(), mask)
+    assert np.array_equal(cohort.positions(), np.flatnonzero(mask))
+
+
+def test_take_gathers_the_rows():
+    df = pd.DataFrame({'age': [71, 64, 58, 80]}, index=[10, 11, 12, 13])
+    cohort = Cohort.from_mask(np.array([True, False, False, True]))
+    pd.testing.assert_frame_equal(cohort.take(df), df.iloc[[0, 3]])
+    # Every row selected: the frame is not copied
+    everyone = Cohort.from_mask(np.ones(4, dtype=bool))
+    assert everyone.take(df) is df
+    with pytest.raises(ValueError):
+        cohort.take(df.head(3))
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from utils.column_pruner import describe_pruning, prune_columns
+
+
+def _export():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4],
+        'empty': [np.nan] * 4,
+        'form_complete': ['Complete'] * 4,
+        'smoker': ['Sí', None, None, 'Sí'],  # one value plus missing ones is kept
+        'age': [71, 64, 58, 80],
+        'age_copy': [71, 64, 58, 80],
+        'ward': pd.Categorical(['A', 'B', 'A', 'B']),
+        'ward_text': ['A', 'B', 'A', 'B'],
+    })
+
+
+def test_empty_constant_and_duplicate_columns_are_dropped():
+    pruned, statistics = prune_columns(_export())
+    assert list(pruned.columns) == ['id', 'smoker', 'age', 'ward']
+    assert statistics['empty_columns'] == ['empty']
+    assert statistics['constant_columns'] == ['form_complete']
+    assert statistics['duplicate_columns'] == {'age_copy': 'age', 'ward_text': 'ward'}
+    assert describe_pruning(statistics).startswith("4 of 8")
+
+
+def test_protected_columns_are_kept():
+    pruned, statistics = prune_columns(_export(), protected=['age_copy', 'empty'])
+    # The protected duplicate is kept and the unprotected original dropped
+    assert 'age_copy' in pruned.columns and 'age' not in pruned.columns
+    assert statistics['duplicate_columns']['age'] == 'age_copy'
+    assert 'empty' in pruned.columns
+
+
+def test_nothing_to_prune():
+    df = pd.DataFrame({'a': [1, 2], 'b': [2, 1]})
+    pruned, statistics = prune_columns(df)
+    assert pruned.columns.tolist() == ['a', 'b']
+    assert describe_pruning(statistics) == "none"
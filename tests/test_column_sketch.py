@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from utils.column_sketch import FrequentValues, HyperLogLog, TDigest, hash_values
+from utils.dataset_profile import ColumnProfile, _sketch_column, CATEGORICAL
+
+
+def _add(frequent, chunk):
+    codes, values = pd.factorize(pd.Series(chunk))
+    values = np.asarray(values)
+    frequent.add_counts(values, hash_values(values), np.bincount(codes, minlength=len(values)))
+
+
+def test_frequent_values_are_exact_within_capacity():
+    frequent = FrequentValues(capacity=8)
+    _add(frequent, ['a', 'b', 'a', 'c'])
+    _add(frequent, ['a', 'c', 'd'])
+    assert frequent.exact
+    assert frequent.items()[:2] == [('a', 3), ('c', 2)]
+    assert dict(frequent.items()) == {'a': 3, 'b': 1, 'c': 2, 'd': 1}
+
+
+def test_frequent_value_counts_undercount_by_at_most_the_error():
+    rng = np.random.default_rng(0)
+    # A few heavy values over a long tail of rare ones
+    values = np.concatenate([rng.choice(['x', 'y', 'z'], 30_000), rng.integers(0, 20_000, 70_000).astype(str)])
+    rng.shuffle(values)
+    frequent = FrequentValues(capacity=64)
+    for start in range(0, len(values), 10_000):
+        _add(frequent, values[start:start + 10_000])
+    assert not frequent.exact
+
+    true_counts = pd.Series(values).value_counts()
+    for label, count in frequent.items():
+        assert count <= true_counts[label] <= count + frequent.error
+    # Any value more frequent than the error is tracked
+    tracked = {label for label, _ in frequent.items()}
+    assert set(true_counts[true_counts > frequent.error].index) <= tracked
+
+
+def test_hyperloglog_estimate_within_three_standard_errors():
+    sketch = HyperLogLog()
+    sketch.add_hashes(hash_values(np.arange(200_000)))
+    sketch.add_hashes(hash_values(np.arange(100_000)))  # repeated values are not counted twice
+    assert abs(sketch.estimate() / 200_000 - 1) < 3 * sketch.relative_error
+
+
+def test_tdigest_quartiles_within_one_percent_of_rank():
+    values = np.random.default_rng(1).lognormal(size=200_000)
+    digest = TDigest()
+    for start in range(0, len(values), 50_000):
+        digest.add_values(values[start:start + 50_000])
+    ordered = np.sort(values)
+    for q in (0.25, 0.5, 0.75):
+        rank = np.searchsorted(ordered, digest.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.01
+
+
+def test_uncertain_shares_are_not_reported():
+    column = ColumnProfile('ward', CATEGORICAL, 'object', null_count=0, distinct_count=5000, min_count=0,
+                           top_values=[('A', 1000)], approximate=True, count_error=200)
+    assert column.value_share(1000, 10_000) == (10.0, 12.0)
+    assert column.value_share(300, 10_000) is None
+    exact = ColumnProfile('sex', CATEGORICAL, 'object', null_count=0, distinct_count=2, min_count=4,
+                          top_values=[('F', 6)])
+    assert exact.value_share(6, 10) == (60.0, 60.0)
+
+
+def test_sketched_column_reports_its_count_error():
+    rng = np.random.default_rng(2)
+    column = pd.Series(np.concatenate([np.full(5000, 'common'), rng.integers(0, 50_000, 95_000).astype(str)]), name='code')
+    profile = _sketch_column(column, CATEGORICAL, null_count=0)
+    label, count = profile.top_values[0]
+    assert label == 'common'
+    assert count <= 5000 <= count + profile.count_error
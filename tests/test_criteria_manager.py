@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.criteria_manager import CriteriaManager, CriteriaRule, MaskCache
+from utils.dataset_profile import column_codes
+
+
+@pytest.fixture
+def nullable_df():
+    return pd.DataFrame({
+        'count': pd.array([1, 3, None, 4, 6], dtype="Int64"),
+        'flag': pd.array([True, None, False, True, False], dtype="boolean"),
+        'site': pd.array(["a", "b", None, "b", "c"], dtype="string"),
+    })
+
+
+@pytest.mark.parametrize("dataset_key", [None, "fingerprint"])
+@pytest.mark.parametrize("variable, operator, value, rule_type, expected", [
+    ('count', 'between', (2, 5), 'inclusion', [1, 3]),
+    ('count', 'between', (2, 5), 'exclusion', [0, 2, 4]),
+    ('count', 'not equals', 3, 'inclusion', [0, 3, 4]),
+    ('count', 'greater than', 3, 'inclusion', [3, 4]),
+    ('flag', 'equals', 'yes', 'inclusion', [0, 3]),
+    ('site', 'equals', 'b', 'inclusion', [1, 3]),
+    ('site', 'contains', 'B', 'exclusion', [0, 2, 4]),
+])
+def test_nullable_columns(nullable_df, dataset_key, variable, operator, value, rule_type, expected):
+    """Missing values of nullable columns do not match a rule (as with boolean indexing), instead of failing it."""
+    manager = CriteriaManager()
+    manager.add_rule(variable, operator, value, rule_type)
+    mask, statistics = manager.evaluate(nullable_df, dataset_key)
+    assert np.flatnonzero(mask).tolist() == expected
+    assert statistics['filtered_size'] == len(expected)
+
+
+@pytest.fixture
+def cohort_df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'age': rng.integers(18, 95, 500).astype(np.int8),
+        'weight': np.where(rng.random(500) < 0.1, np.nan, rng.normal(72, 15, 500)).astype(np.float32),
+        'smoker': rng.random(500) < 0.3,
+        'ward': pd.Categorical(rng.choice(['Medicina Interna', 'Cirugía', 'UCI'], 500)),
+        'admitted': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, 500), unit='D'),
+    })
+
+
+RULES = [
+    ('age', 'greater or equal', 65, 'inclusion'),
+    ('weight', 'between', (50, 90), 'inclusion'),
+    ('smoker', 'equals', 'Sí', 'exclusion'),
+    ('ward', 'contains', 'uci', 'exclusion'),
+    ('admitted', 'less than', '2024-07-01', 'exclusion'),
+    ('age', 'not equals', 70, 'exclusion'),
+]
+
+
+def _scanned_mask(df, rules):
+    """Rules applied one by one with pandas: any inclusion rule and no exclusion rule."""
+    inclusion = [r for r in rules if r.rule_type == 'inclusion']
+    mask = np.zeros(len(df), dtype=bool) if inclusion else np.ones(len(df), dtype=bool)
+    for rule in inclusion:
+        mask |= rule.apply(df).to_numpy(dtype=bool, na_value=False)
+    for rule in rules:
+        if rule.rule_type == 'exclusion':
+            mask &= ~rule.apply(df).to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+@pytest.mark.parametrize("count", range(1, len(RULES) + 1))
+def test_compiled_rules_match_applying_each_rule(cohort_df, count):
+    manager = CriteriaManager()
+    for rule in RULES[:count]:
+        manager.add_rule(*rule)
+    mask, statistics = manager.evaluate(cohort_df)
+    expected = _scanned_mask(cohort_df, manager.rules)
+    assert np.array_equal(mask, expected)
+    assert statistics['filtered_size'] == expected.sum()
+    pd.testing.assert_frame_equal(manager.apply_criteria(cohort_df)[0], cohort_df[expected])
+
+
+def test_numeric_rules_are_not_applied_with_pandas(cohort_df, monkeypatch):
+    manager = CriteriaManager()
+    for rule in (RULES[0], RULES[1], RULES[2], RULES[5]):
+        manager.add_rule(*rule)
+    expected = _scanned_mask(cohort_df, manager.rules)
+
+    def apply(rule, df):
+        raise AssertionError(f"{rule} should be evaluated in the compiled batch")
+    monkeypatch.setattr(CriteriaRule, "apply", apply)
+    mask, _ = manager.evaluate(cohort_df)
+    assert np.array_equal(mask, expected)
+
+
+def test_rule_masks_are_reused_for_the_same_dataset(cohort_df, monkeypatch):
+    manager = CriteriaManager()
+    manager.add_rule(*RULES[0])
+    manager.add_rule(*RULES[3])
+    first, _ = manager.evaluate(cohort_df, "fingerprint")
+
+    def evaluated(*args, **kwargs):
+        raise AssertionError("cached rules should not be evaluated again")
+    with monkeypatch.context() as patch:
+        patch.setattr(CriteriaRule, "apply", evaluated)
+        patch.setattr(CriteriaRule, "compile", evaluated)
+        again, _ = manager.evaluate(cohort_df, "fingerprint")
+    assert np.array_equal(first, again)
+
+    # Another dataset version evaluates the rules again
+    changed = cohort_df.assign(age=np.int8(90))
+    mask, _ = manager.evaluate(changed, "other fingerprint")
+    assert np.array_equal(mask, _scanned_mask(changed, manager.rules))
+
+
+def test_mask_cache_evicts_the_least_recently_used():
+    cache = MaskCache(max_bytes=2 * 125)  # two masks of 1000 rows, packed
+    masks = {key: np.arange(1000) % (key + 2) == 0 for key in range(3)}
+    cache.put(0, masks[0])
+    cache.put(1, masks[1])
+    assert np.array_equal(cache.get(0, 1000), masks[0])
+    cache.put(2, masks[2])
+    assert cache.get(1, 1000) is None
+    assert np.array_equal(cache.get(0, 1000), masks[0]) and np.array_equal(cache.get(2, 1000), masks[2])
+    assert cache.size_bytes == 250
+    # A mask of a dataset with another number of rows is not used
+    assert cache.get(0, 999) is None
+
+
+@pytest.mark.parametrize("operator, value", [('equals', 'UCI'), ('not equals', 'UCI'),
+                                             ('contains', 'ciru'), ('not contains', 'ciru')])
+def test_text_rules_are_evaluated_on_the_distinct_values(operator, value, monkeypatch):
+    wards = pd.Series(['UCI', 'Cirugía', None, 'Medicina', 'UCI', 'Cirugía General'] * 50)
+    df = pd.DataFrame({'ward': wards})
+    expected = CriteriaRule('ward', operator, value).apply(df).to_numpy(dtype=bool)
+
+    provided = []
+
+    def codes(column):
+        provided.append(column)
+        return column_codes(df[column])
+    sizes = []
+    apply = CriteriaRule.apply
+    monkeypatch.setattr(CriteriaRule, "apply", lambda rule, frame: sizes.append(len(frame)) or apply(rule, frame))
+
+    manager = CriteriaManager()
+    manager.add_rule('ward', operator, value, 'inclusion')
+    mask, _ = manager.evaluate(df, codes=codes)
+    assert np.array_equal(mask, expected)
+    assert provided == ['ward']
+    # The rule only saw the four labels, not the 300 rows
+    assert sizes == [4]
@@ -0,0 +1,66 @@
+import io
+
+import pandas as pd
+import pytest
+
+from utils.csv_sniffer import SNIFF_BYTES, sniff_csv
+from utils.dataset_reader import read_dataset_file
+
+
+def read(sample: bytes, dialect) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(sample), **dialect.read_csv_kwargs())
+
+
+@pytest.mark.parametrize("text, delimiter, decimal", [
+    ("age,weight\n30,70.5\n41,82.1\n", ",", "."),
+    ("age;weight\n30;70,5\n41;82,1\n", ";", ","),
+    ("age\tweight\n30\t70.5\n41\t82.1\n", "\t", "."),
+    ("age|weight\n30|70.5\n41|82.1\n", "|", "."),
+])
+def test_dialects(text, delimiter, decimal):
+    sample = text.encode("utf-8")
+    dialect = sniff_csv(sample)
+    assert (dialect.delimiter, dialect.decimal, dialect.header_row) == (delimiter, decimal, 0)
+    df = read(sample, dialect)
+    assert list(df.columns) == ["age", "weight"]
+    assert df["weight"].tolist() == [70.5, 82.1]
+
+
+def test_encoding_and_headerless_file():
+    sample = "1;Álvarez;3,5\n2;Núñez;4,25\n3;Peña;1,0\n".encode("cp1252")
+    dialect = sniff_csv(sample)
+    assert dialect.encoding == "cp1252"
+    assert dialect.header_row is None
+    df = read(sample, dialect)
+    assert df.shape == (3, 3)
+    assert df.iloc[1, 1] == "Núñez"
+
+
+def test_title_lines_are_skipped():
+    rows = "".join(f"{i},{20 + i},{i % 2}\n" for i in range(50))
+    sample = f"Hospital export\nGenerated 2024-05-01\nid,age,sex\n{rows}".encode("utf-8")
+    dialect = sniff_csv(sample)
+    assert dialect.skip_rows == 2
+    df = read(sample, dialect)
+    assert list(df.columns) == ["id", "age", "sex"]
+    assert len(df) == 50
+
+
+def test_short_file_with_title_lines(tmp_path):
+    """Two title lines and two records: the tie between one and three fields goes to the table."""
+    path = tmp_path / "short.csv"
+    path.write_text("Registry export\nAll patients\nid,age,sex\n1,30,F\n", encoding="utf-8")
+    dialect = sniff_csv(path.read_bytes())
+    assert (dialect.skip_rows, dialect.field_count) == (2, 3)
+    df = read_dataset_file(str(path))
+    assert list(df.columns) == ["id", "age", "sex"]
+    assert df["age"].tolist() == [30]
+
+
+def test_last_line_of_a_cut_sample_is_ignored():
+    rows = "".join(f"{i},{i * 2}\n" for i in range(SNIFF_BYTES // 4))
+    sample = f"a,b\n{rows}".encode("utf-8")[:SNIFF_BYTES]
+    # The last line of the sample is cut; it must not count as a record
+    assert not sample.endswith(b"\n")
+    dialect = sniff_csv(sample)
+    assert (dialect.delimiter, dialect.field_count, dialect.header_row) == (",", 2, 0)
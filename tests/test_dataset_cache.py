@@ -0,0 +1,93 @@
+import os
+
+import pandas as pd
+import pytest
+
+from utils import dataset_cache
+from utils.dataset_cache import DatasetCache
+from utils.dataset_handle import DatasetHandle
+from utils.dataset_profile import PROFILE_VERSION, DatasetProfile
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "visits.csv"
+    path.write_text("id,ward\n1,A\n2,B\n")
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DatasetCache(str(tmp_path / ".cache"))
+
+
+def test_stored_copy_is_loaded(cache, source):
+    df = pd.DataFrame({'id': [1, 2], 'ward': ['A', 'B']})
+    assert cache.load(source) is None
+    assert cache.store(source, df, metadata={'rows': 2})
+    pd.testing.assert_frame_equal(cache.load(source), df)
+    assert cache.load_metadata(source) == {'rows': 2}
+    # Each variant (ingest options) has its own copy
+    assert cache.load(source, variant="compact2") is None
+
+
+def test_changed_file_misses(cache, source):
+    cache.store(source, pd.DataFrame({'id': [1, 2]}))
+    with open(source, "a") as f:
+        f.write("3,C\n")
+    assert cache.load(source) is None
+
+
+def test_unchanged_file_is_not_hashed_again(cache, source, monkeypatch):
+    fingerprint = cache.fingerprint(source)
+    calls = []
+    monkeypatch.setattr(dataset_cache, "file_fingerprint", lambda path: calls.append(path) or "other")
+    assert DatasetCache(cache.cache_dir).fingerprint(source) == fingerprint
+    assert calls == []
+
+    # A new mtime makes it hash the file again
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.fingerprint(source) == "other"
+    assert calls == [source]
+
+
+def test_unreadable_copy_misses(cache, source):
+    cache.store(source, pd.DataFrame({'id': [1, 2]}))
+    with open(cache.cache_path(cache.fingerprint(source)), "wb") as f:
+        f.write(b"not parquet")
+    assert cache.load(source) is None
+
+
+def test_profile_round_trip(cache, source):
+    df = pd.DataFrame({'age': [30.5, 41.0, None, 62.0], 'sex': ['F', 'M', 'F', 'F'], 'smoker': [True, False, True, True]})
+    profile = DatasetProfile.from_dataframe(df)
+    assert cache.load_profile(source) is None
+    assert cache.store_profile(source, profile.to_dict(), variant="compact2")
+
+    stored = cache.load_profile(source, variant="compact2")
+    restored = DatasetProfile.from_dict(stored)
+    assert restored.rows == 4
+    assert [column.to_dict() for column in restored.columns] == [column.to_dict() for column in profile.columns]
+    assert restored.acceptable_stratify_variables() == profile.acceptable_stratify_variables()
+
+
+def test_stored_profile_is_used_without_reading_the_data(cache, source):
+    df = pd.DataFrame({'age': [30, 41, 58, 62]})
+    cache.store_profile(source, DatasetProfile.from_dataframe(df).to_dict())
+
+    def reader(progress=None):
+        raise AssertionError("the data should not be read")
+    handle = DatasetHandle(source, reader=reader, profile_loader=lambda: cache.load_profile(source))
+    assert handle.profile().column('age').maximum == 62
+    assert handle.num_rows == 4
+
+
+def test_profile_of_another_version_is_recomputed(cache, source):
+    df = pd.DataFrame({'age': [30, 41, 58, 62]})
+    stored = dict(DatasetProfile.from_dataframe(df).to_dict(), version=PROFILE_VERSION - 1)
+    saved = []
+    handle = DatasetHandle(source, reader=lambda progress=None: df, profile_loader=lambda: stored,
+                           profile_saver=saved.append)
+    assert handle.profile().rows == 4
+    assert saved and saved[0]['version'] == PROFILE_VERSION
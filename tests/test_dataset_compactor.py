@@ -0,0 +1,41 @@
+import pandas as pd
+
+from utils.criteria_manager import CriteriaRule
+from utils.dataset_compactor import compact_dataframe
+from utils.dataset_profile import CATEGORICAL, DatasetProfile
+
+
+def _registry():
+    return pd.DataFrame({
+        'Enfermedad renal crónica': ['Sí'] * 3 + ['No'] * 17,
+        'Antecedentes LPP': ['Sí'] * 8 + ['No'] * 12,
+        'Edad': list(range(60, 80)),
+        'Peso': [70.5, 81.25] * 10,
+    })
+
+
+def test_values_are_unchanged():
+    df = _registry()
+    compacted, statistics = compact_dataframe(df)
+    assert compacted['Edad'].dtype == 'int8'
+    assert compacted['Peso'].dtype == 'float32'
+    assert statistics['downcast_columns'] == 2
+    assert statistics['memory_saved'] > 0
+    pd.testing.assert_frame_equal(compacted.astype(df.dtypes.to_dict()), df)
+
+
+def test_yes_no_labels_keep_categorical_semantics():
+    compacted, _ = compact_dataframe(_registry())
+    assert isinstance(compacted['Enfermedad renal crónica'].dtype, pd.CategoricalDtype)
+
+    profile = DatasetProfile.from_dataframe(compacted)
+    assert profile.column('Enfermedad renal crónica').kind == CATEGORICAL
+    # Categorical threshold: every label needs 5 rows (3 'Sí' are not enough)
+    acceptable = profile.acceptable_stratify_variables()
+    assert 'Enfermedad renal crónica' not in acceptable
+    assert 'Antecedentes LPP' in acceptable
+
+    # Criteria still compare with the labels, including partial matches
+    for operator, value, expected in (('equals', 'Sí', 3), ('contains', 'S', 3), ('not equals', 'No', 3)):
+        rule = CriteriaRule('Enfermedad renal crónica', operator, value)
+        assert rule.apply(compacted).sum() == expected
@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+from utils.dataset_handle import DatasetHandle
+from utils.dataset_reader import LoadCancelled
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'age': [30, 41, 58, 62], 'sex': ['F', 'M', 'F', 'F']})
+
+
+def test_cancelled_profile_is_not_stored(df):
+    saved = []
+    calls = []
+
+    def checkpoint():
+        calls.append(1)
+        if len(calls) > 1:
+            raise LoadCancelled()
+
+    handle = DatasetHandle("data.csv", reader=lambda progress=None: df, profile_saver=saved.append)
+    with pytest.raises(LoadCancelled):
+        handle.profile(checkpoint=checkpoint)
+    assert saved == []
+
+    # A later call profiles the dataset from scratch
+    profile = handle.profile()
+    assert profile.rows == 4
+    assert len(saved) == 1
+
+
+def _unread(progress=None):
+    raise AssertionError("the whole dataset should not be read")
+
+
+def test_columnar_copy_answers_metadata_without_reading(df, tmp_path):
+    path = str(tmp_path / "dataset.parquet")
+    df.to_parquet(path)
+    handle = DatasetHandle("data.csv", reader=_unread, columnar_path=path)
+    assert handle.columns == ['age', 'sex']
+    assert handle.dtypes['age'] == 'int64'
+    assert handle.num_rows == 4 and handle.row_count_exact
+    pd.testing.assert_frame_equal(handle.head(2), df.head(2))
+    assert not handle.is_loaded
+
+
+def test_text_files_are_previewed_and_estimated(df):
+    reads = []
+
+    def reader(progress=None):
+        reads.append(1)
+        return df
+    handle = DatasetHandle("data.csv", reader=reader, preview=lambda n: df.head(n), estimate_rows=lambda: 5)
+    assert handle.columns == ['age', 'sex']
+    assert handle.num_rows == 5 and not handle.row_count_exact
+    assert handle.head(3).shape == (3, 2)
+    assert reads == []
+
+    # Loading reads the file once, and the row count is then exact
+    handle.load()
+    handle.load()
+    assert reads == [1]
+    assert handle.num_rows == 4 and handle.row_count_exact
+
+
+def test_columns_are_read_from_the_columnar_copy(df):
+    requested = []
+
+    def column_reader(columns):
+        requested.append(columns)
+        return df[columns]
+    handle = DatasetHandle("data.parquet", reader=_unread, column_reader=column_reader)
+    assert list(handle.read_columns(['sex']).columns) == ['sex']
+    assert requested == [['sex']]
+    assert not handle.is_loaded
+
+
+def test_columns_fall_back_to_the_loaded_dataset(df):
+    requested = []
+    handle = DatasetHandle("data.csv", reader=lambda progress=None: df,
+                           column_reader=lambda columns: requested.append(columns))
+    # No columnar copy yet: the dataset is loaded, and later projections use it
+    assert handle.read_columns(['sex', 'age']).columns.tolist() == ['sex', 'age']
+    assert handle.is_loaded
+    handle.read_columns(['age'])
+    assert requested == [['sex', 'age']]
@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils import dataset_profile
+from utils.dataset_profile import DatasetProfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def test_spawned_workers_do_not_import_the_gui():
+    # 'spawn' workers run the entry point again as __mp_main__ before profiling their columns
+    script = (
+        "import runpy, sys\n"
+        f"runpy.run_path({os.path.join(SRC_DIR, 'main.py')!r}, run_name='__mp_main__')\n"
+        "print(sorted(name for name in ('PySide6', 'controller', 'ludwig', 'torch') if name in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=SRC_DIR, capture_output=True, text=True,
+                            env={**os.environ, "PYTHONPATH": SRC_DIR}, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def test_parallel_profile_matches_serial():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'age': rng.integers(18, 90, 2000),
+        'weight': rng.normal(70, 12, 2000),
+        'sex': rng.choice(['F', 'M'], 2000),
+        'ward': rng.choice(['A', 'B', 'C', None], 2000),
+    })
+    serial = DatasetProfile.from_dataframe(df, max_workers=1)
+    parallel = dataset_profile._profile_parallel(df, approximate=False, max_workers=2)
+    assert [column.to_dict() for column in parallel] == [column.to_dict() for column in serial.columns]
+
+
+def test_small_datasets_are_profiled_in_process():
+    df = pd.DataFrame(np.zeros((1000, dataset_profile.PARALLEL_MIN_COLUMNS)))
+    assert dataset_profile._parallel_workers(df, max_workers=8) == 1
+
+
+DATA_PATH = os.path.join(os.path.dirname(SRC_DIR), "data", "UPS-BaseCompleta_DATA_LABELS_2025-04-23_0912.csv")
+
+
+def _scanned_stratify_variables(df, min_samples=5, max_categories=10):
+    """The checks acceptable_stratify_variables made by scanning every column before profiles."""
+    acceptable = []
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) or df[col].dtype == object:
+            counts = df[col].value_counts(dropna=True)
+            if len(counts) <= max_categories and (counts >= min_samples).all():
+                acceptable.append(col)
+        elif pd.api.types.is_integer_dtype(df[col]) or pd.api.types.is_float_dtype(df[col]):
+            has_decimals = pd.api.types.is_float_dtype(df[col]) and (df[col].dropna() % 1 != 0).any()
+            if has_decimals or df[col].nunique(dropna=True) > len(df) * 0.5:
+                acceptable.append(col)
+            elif df[col].value_counts(dropna=True).min() >= 2:
+                acceptable.append(col)
+        elif df[col].dtype == bool:
+            if (df[col].value_counts(dropna=True) >= 2).all():
+                acceptable.append(col)
+    return acceptable
+
+
+def test_profile_matches_scanning_the_columns():
+    df = pd.read_csv(DATA_PATH)
+    profile = DatasetProfile.from_dataframe(df)
+    assert profile.rows == len(df)
+    assert profile.missing_total == int(df.isna().sum().sum())
+    assert profile.acceptable_stratify_variables() == _scanned_stratify_variables(df)
+
+    for column in profile.columns:
+        values = df[column.name]
+        counts = values.value_counts(dropna=True)
+        assert column.null_count == values.isna().sum()
+        assert column.distinct_count == len(counts)
+        if len(counts):
+            assert column.min_count == counts.min()
+            assert column.top_values[0][1] == counts.iloc[0]
+        if column.kind == dataset_profile.NUMERIC and len(counts):
+            assert column.minimum == values.min() and column.maximum == values.max()
+            assert np.isclose(column.mean, values.mean())
+            assert np.allclose(column.quartiles, values.quantile([0.25, 0.5, 0.75]).tolist())
+
+
+def test_class_counts_within_a_cohort():
+    column = pd.Series(['F', 'M', None, 'F', 'M', 'F'])
+    codes, labels = dataset_profile.column_codes(column)
+    assert codes.dtype == np.int8
+    mask = np.array([True, True, True, False, True, False])
+    pd.testing.assert_series_equal(dataset_profile.class_counts(codes, labels, mask),
+                                   column[mask].value_counts(), check_names=False, check_index_type=False)
@@ -0,0 +1,133 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+
+import pandas as pd
+import pytest
+
+from utils import dataset_reader
+from utils.dataset_reader import (StatisticalFileReader, StreamingCsvReader, read_dataset_file,
+                                  read_json_lines, read_sharded, split_compression)
+
+
+@pytest.fixture
+def shards(tmp_path):
+    paths = []
+    for month, weights in (("01", "70,82"), ("02", "64.5,91.2")):
+        path = tmp_path / f"visits-{month}.csv"
+        path.write_text(f"id,weight,ward\n{month}1,{weights.split(',')[0]},A\n{month}2,{weights.split(',')[1]},B\n")
+        paths.append(str(path))
+    return paths
+
+
+def test_small_shards_are_read_in_process(shards, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("no worker pool expected")
+    monkeypatch.setattr(dataset_reader, "ProcessPoolExecutor", no_pool)
+    progress = []
+    df = read_sharded(shards, progress=lambda done, total: progress.append(done), max_workers=4)
+    assert df['id'].tolist() == [11, 12, 21, 22]
+    # Integer weights in one shard and decimal ones in the other are unified as floats
+    assert df['weight'].tolist() == [70.0, 82.0, 64.5, 91.2]
+    assert progress[-1] == sum(len(open(path, 'rb').read()) for path in shards)
+
+
+def test_parallel_read_matches_in_process(shards, monkeypatch):
+    serial = read_sharded(shards, max_workers=1)
+    monkeypatch.setattr(dataset_reader, "SHARDS_PARALLEL_MIN_BYTES", 0)
+    parallel = read_sharded(shards, max_workers=2)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def _write_csv(path, rows):
+    path.write_text("\n".join(rows) + "\n")
+    return str(path)
+
+
+def test_chunked_read_keeps_sampled_types(tmp_path):
+    ward = ['A', 'B'] * 6
+    rows = ["id,age,ward"] + [f"{i},{40 + i},{ward[i]}" for i in range(12)]
+    reader = StreamingCsvReader(_write_csv(tmp_path / "visits.csv", rows), chunk_rows=4, sample_rows=5)
+    df = reader.read()
+    assert reader.schema == {'id': 'float64', 'age': 'float64', 'ward': 'category'}
+    # Integers are read as float64 (a later chunk may miss values) and restored when none is missing
+    assert df['id'].dtype == 'int64' and df['id'].tolist() == list(range(12))
+    # Categories found in different chunks are merged
+    assert isinstance(df['ward'].dtype, pd.CategoricalDtype) and df['ward'].tolist() == ward
+    assert reader.rows == 12
+
+
+def test_chunked_read_keeps_floats_with_missing_values(tmp_path):
+    rows = ["id,dose"] + [f"{i},{i}" for i in range(8)] + ["8,"]
+    df = StreamingCsvReader(_write_csv(tmp_path / "doses.csv", rows), chunk_rows=4, sample_rows=5).read()
+    assert df['dose'].dtype == 'float64'
+    assert df['dose'].isna().tolist() == [False] * 8 + [True]
+
+
+def test_chunked_read_falls_back_when_the_sampled_schema_breaks(tmp_path):
+    # 'score' looks numeric in the sample but holds text further down
+    rows = ["id,score"] + [f"{i},{i * 10}" for i in range(8)] + ["8,pending"]
+    reader = StreamingCsvReader(_write_csv(tmp_path / "scores.csv", rows), chunk_rows=4, sample_rows=5)
+    df = reader.read()
+    assert reader.schema == {'score': 'str'}
+    # Text throughout, as a single read of the whole file would give
+    assert df['score'].tolist() == [str(i * 10) for i in range(8)] + ['pending']
+    assert df['id'].dtype == 'int64'
+
+
+def test_small_files_are_read_from_the_sample(tmp_path):
+    progress = []
+    path = _write_csv(tmp_path / "small.csv", ["id,sex", "1,F", "2,M"])
+    df = StreamingCsvReader(path, sample_rows=5).read(progress=lambda done, total: progress.append((done, total)))
+    assert df.shape == (2, 2)
+    assert progress == [(os.path.getsize(path), os.path.getsize(path))]
+
+
+@pytest.mark.parametrize("suffix, opener", [("", open), (".gz", gzip.open), (".bz2", bz2.open), (".xz", lzma.open)])
+def test_json_lines_are_read_in_chunks(tmp_path, suffix, opener):
+    path = str(tmp_path / f"events.jsonl{suffix}")
+    with opener(path, "wt", encoding="utf-8") as f:
+        for i in range(5):
+            f.write(json.dumps({'id': i, 'ward': 'AB'[i % 2]}) + "\n")
+    progress = []
+    df = read_json_lines(path, progress=lambda done, total: progress.append((done, total)), chunk_rows=2)
+    assert df['id'].tolist() == list(range(5))
+    assert df['ward'].tolist() == ['A', 'B', 'A', 'B', 'A']
+    # Progress counts the compressed bytes read from disk
+    assert len(progress) == 3 and progress[-1] == (os.path.getsize(path), os.path.getsize(path))
+
+
+def test_compressed_csv_is_read_like_the_plain_file(tmp_path):
+    rows = "id,ward\n" + "".join(f"{i},{'AB'[i % 2]}\n" for i in range(6))
+    plain = tmp_path / "visits.csv"
+    plain.write_text(rows)
+    with gzip.open(tmp_path / "visits.csv.gz", "wt") as f:
+        f.write(rows)
+    pd.testing.assert_frame_equal(read_dataset_file(str(tmp_path / "visits.csv.gz")), read_dataset_file(str(plain)))
+
+
+def test_compressed_binary_formats_are_rejected(tmp_path):
+    path = tmp_path / "visits.parquet.gz"
+    path.write_bytes(b"")
+    assert split_compression(str(path)) == (str(tmp_path / "visits.parquet"), "gzip")
+    with pytest.raises(ValueError, match="only supported for text formats"):
+        read_dataset_file(str(path))
+
+
+def test_stata_files_are_read_in_chunks(tmp_path):
+    path = str(tmp_path / "registry.dta")
+    df = pd.DataFrame({'id': range(10), 'weight': [70.5 + i for i in range(10)], 'ward': list('ABABABABAB')})
+    df.to_stata(path, write_index=False)
+
+    progress = []
+    reader = StatisticalFileReader(path, chunk_rows=4)
+    read = reader.read(progress=lambda done, total: progress.append(done), spool_dir=str(tmp_path / "spool"))
+    assert read['id'].dtype == 'int64' and read['id'].tolist() == list(range(10))
+    assert read['weight'].tolist() == df['weight'].tolist()
+    assert read['ward'].tolist() == df['ward'].tolist()
+    assert reader.rows == 10
+    # Progress is estimated in bytes from the rows read, up to the file size
+    assert progress == sorted(progress) and progress[-1] == os.path.getsize(path)
+    assert os.listdir(tmp_path / "spool") == []
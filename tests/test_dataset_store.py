@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import pytest
+
+from utils import dataset_store
+from utils.dataset_store import DatasetStore
+
+
+def stored_files(store):
+    return sorted(name for folder, _, names in os.walk(store.store_dir)
+                  if folder != store.store_dir for name in names)
+
+
+@pytest.fixture
+def projects(tmp_path):
+    for project in ("p1", "p2"):
+        (tmp_path / project).mkdir()
+    origin = tmp_path / "export.csv"
+    origin.write_text("a,b\n" + "1,2\n" * 1000)
+    return tmp_path, str(origin), DatasetStore(str(tmp_path / ".store"))
+
+
+def test_reimport_of_unchanged_file_is_a_noop(projects):
+    base, origin, store = projects
+    target = str(base / "p1" / "export.csv")
+    assert store.link(origin, target)
+    mtime = os.stat(target).st_mtime_ns
+    assert not store.link(origin, target)
+    assert os.stat(target).st_mtime_ns == mtime
+
+
+def test_projects_share_one_stored_copy(projects):
+    base, origin, store = projects
+    store.link(origin, str(base / "p1" / "export.csv"))
+    store.link(origin, str(base / "p2" / "export.csv"))
+    assert len(stored_files(store)) == 1
+    assert os.path.samefile(base / "p1" / "export.csv", base / "p2" / "export.csv")
+
+
+def test_prune_deletes_unreferenced_copies(projects):
+    base, origin, store = projects
+    store.link(origin, str(base / "p1" / "export.csv"))
+    store.link(origin, str(base / "p2" / "export.csv"))
+    old = stored_files(store)
+
+    # Updating the export in one project keeps the old copy for the other
+    with open(origin, "a") as f:
+        f.write("3,4\n")
+    assert store.link(origin, str(base / "p1" / "export.csv"))
+    assert len(stored_files(store)) == 2
+
+    os.remove(base / "p2" / "export.csv")
+    assert store.prune() == 1
+    assert old[0] not in stored_files(store)
+    assert len(stored_files(store)) == 1
+
+
+def test_reflinked_copies_are_kept(projects, monkeypatch):
+    """Without hard links the store's copy has a single link, but a reflinked project still references it."""
+    base, origin, store = projects
+
+    def no_hard_links(source, target):
+        raise OSError("cross-device link")
+
+    def fake_reflink(source, target):
+        shutil.copy2(source, target)
+        return True
+
+    monkeypatch.setattr(dataset_store.os, "link", no_hard_links)
+    monkeypatch.setattr(dataset_store, "_reflink", fake_reflink)
+    store.link(origin, str(base / "p1" / "export.csv"))
+    store.link(origin, str(base / "p2" / "export.csv"))
+    assert len(stored_files(store)) == 1
+    assert store.prune() == 0
+
+
+def test_store_is_skipped_without_links_or_reflinks(projects, monkeypatch):
+    base, origin, store = projects
+
+    def no_hard_links(source, target):
+        raise OSError("operation not permitted")
+
+    monkeypatch.setattr(dataset_store.os, "link", no_hard_links)
+    monkeypatch.setattr(dataset_store, "_reflink", lambda source, target: False)
+    target = str(base / "p1" / "export.csv")
+    assert store.link(origin, target)
+    assert stored_files(store) == []
+    assert not store.link(origin, target)
+    with open(target) as copy, open(origin) as original:
+        assert copy.read() == original.read()
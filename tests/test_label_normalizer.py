@@ -0,0 +1,38 @@
+import pandas as pd
+
+from utils.label_normalizer import clean_label, normalize_labels
+
+
+def test_clean_label():
+    assert clean_label(" b'Mujer' ") == 'Mujer'
+    assert clean_label('b"Sí "') == 'Sí'
+    assert clean_label(b'Hombre') == 'Hombre'
+    assert clean_label(3) == 3
+
+
+def test_labels_are_unified():
+    df = pd.DataFrame({
+        'sex': ["b'Mujer'", 'Mujer ', 'mujer', 'Hombre', '  ', None],
+        'age': [71, 64, 58, 80, 77, 69],
+    })
+    normalized, statistics = normalize_labels(df)
+    # Case variants take the most frequent spelling; blank labels become missing values
+    assert normalized['sex'].tolist()[:4] == ['Mujer', 'Mujer', 'Mujer', 'Hombre']
+    assert normalized['sex'].isna().tolist() == [False] * 4 + [True, True]
+    assert list(normalized['sex'].cat.categories) == ['Mujer', 'Hombre']
+    assert statistics == {'normalized_columns': 1, 'changed_columns': ['sex']}
+    assert normalized['age'].tolist() == df['age'].tolist()
+
+
+def test_free_text_is_kept_as_text():
+    df = pd.DataFrame({'note': [' first', 'second', 'third ', 'fourth']})
+    normalized, statistics = normalize_labels(df)
+    assert normalized['note'].dtype == object
+    assert normalized['note'].tolist() == ['first', 'second', 'third', 'fourth']
+    assert statistics['changed_columns'] == ['note']
+
+
+def test_clean_labels_are_not_reported_as_changed():
+    df = pd.DataFrame({'ward': pd.Categorical(['A', 'B', 'A'])})
+    _, statistics = normalize_labels(df)
+    assert statistics == {'normalized_columns': 1, 'changed_columns': []}
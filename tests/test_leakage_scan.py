@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from utils.leakage_scan import scan_features
+
+
+def test_relabelled_categorical_column_is_redundant():
+    rng = np.random.default_rng(0)
+    site = rng.choice(['north', 'south', 'east'], 500)
+    df = pd.DataFrame({
+        'target': rng.choice(['yes', 'no'], 500),
+        'site': site,
+        'site_code': pd.Series(site).map({'north': 'N', 'south': 'S', 'east': 'E'}),
+    })
+    scanned, statistics = scan_features(df, 'target')
+    assert statistics['redundant_columns'] == {'site_code': 'site'}
+    assert list(scanned.columns) == ['target', 'site']
+
+
+def test_distinct_high_cardinality_columns_are_kept():
+    """Near-unique text columns group the rows alike (one row each) without repeating each other."""
+    rng = np.random.default_rng(1)
+    rows = 77
+    df = pd.DataFrame({
+        'target': rng.choice(['yes', 'no'], rows),
+        'birth_date': [f"19{40 + i % 50}-{1 + i % 12:02d}-{1 + i % 28:02d}" for i in range(rows)],
+        'max_blood_pressure': [f"{110 + i}/{70 + i % 20}" for i in range(rows)],
+        'surgery': [f"procedure {i}" for i in range(rows)],
+        'weight': rng.normal(75, 10, rows),
+    })
+    scanned, statistics = scan_features(df, 'target')
+    assert statistics['redundant_columns'] == {}
+    assert statistics['leaking_columns'] == {}
+    assert list(scanned.columns) == list(df.columns)
+
+
+def test_small_cohort_high_cardinality_feature_does_not_leak():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'target': rng.choice(['yes', 'no'], 50), 'id': [str(i) for i in range(50)]})
+    _, statistics = scan_features(df, 'target')
+    assert 'mutual_information' not in statistics['scores']['id']
+    assert statistics['leaking_columns'] == {}
+
+
+def test_target_proxy_leaks():
+    rng = np.random.default_rng(3)
+    target = rng.choice(['yes', 'no'], 1000)
+    df = pd.DataFrame({'target': target, 'outcome_code': np.where(target == 'yes', 1, 0), 'age': rng.integers(20, 90, 1000)})
+    scanned, statistics = scan_features(df, 'target')
+    assert 'outcome_code' in statistics['leaking_columns']
+    assert 'age' in scanned.columns
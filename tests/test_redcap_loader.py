@@ -0,0 +1,88 @@
+import csv
+
+import pandas as pd
+import pytest
+
+from utils.redcap_loader import find_data_dictionary, parse_choices, read_redcap_export
+
+DICTIONARY = [
+    ("Variable / Field Name", "Form Name", "Field Type", "Field Label",
+     "Choices, Calculations, OR Slider Labels", "Text Validation Type OR Show Slider Number"),
+    ("record_id", "baseline", "text", "Record ID", "", ""),
+    ("age", "baseline", "text", "Edad", "", "integer"),
+    ("weight", "baseline", "text", "Peso", "", "number_1dp_comma_decimal"),
+    ("sex", "baseline", "radio", "Sexo", "1, Hombre | 2, Mujer", ""),
+    ("smoker", "baseline", "yesno", "<b>Fumador</b>", "", ""),
+    ("risk", "baseline", "checkbox", "Riesgo", "1, Diabetes | 2, HTA", ""),
+    ("visit", "baseline", "text", "Fecha visita", "", "date_dmy"),
+]
+
+RAW = [
+    ("record_id", "age", "weight", "sex", "smoker", "risk___1", "risk___2", "visit", "baseline_complete"),
+    ("1", "71", "70,5", "1", "1", "1", "0", "2024-03-01", "2"),
+    ("2", "64", "", "2", "0", "0", "0", "2024-03-08", "0"),
+]
+
+LABELS = [
+    ("Record ID", "Edad", "Peso", "Sexo", "Fumador", "Riesgo (choice=Diabetes)", "Riesgo (choice=HTA)",
+     "Fecha visita", "Complete?"),
+    ("1", "71", "70,5", "Hombre", "Yes", "Checked", "Unchecked", "2024-03-01", "Complete"),
+    ("2", "64", "", "Mujer", "No", "Unchecked", "Unchecked", "2024-03-08", "Incomplete"),
+]
+
+
+def _write(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+    return str(path)
+
+
+@pytest.fixture
+def dictionary(tmp_path):
+    return _write(tmp_path / "UPS_DataDictionary_2025-04-23.csv", DICTIONARY)
+
+
+@pytest.mark.parametrize("rows, name", [(RAW, "UPS_DATA_2025-04-23_0912.csv"),
+                                        (LABELS, "UPS_DATA_LABELS_2025-04-23_0912.csv")])
+def test_raw_and_label_exports_are_typed_alike(tmp_path, dictionary, rows, name):
+    df = read_redcap_export(_write(tmp_path / name, rows), dictionary)
+    assert list(df.columns) == list(RAW[0])
+    assert df['age'].dtype == 'int64' and df['age'].tolist() == [71, 64]
+    assert df['weight'].dtype == 'float64' and df['weight'].iloc[0] == 70.5 and pd.isna(df['weight'].iloc[1])
+    assert list(df['sex'].cat.categories) == ['Hombre', 'Mujer'] and df['sex'].tolist() == ['Hombre', 'Mujer']
+    assert df['smoker'].dtype == bool and df['smoker'].tolist() == [True, False]
+    assert df['risk___1'].tolist() == [True, False] and df['risk___2'].tolist() == [False, False]
+    assert df['visit'].dtype == 'datetime64[ns]'
+    assert df['baseline_complete'].tolist() == ['Complete', 'Incomplete']
+    # Free text is not inferred
+    assert df['record_id'].tolist() == ['1', '2']
+
+
+def test_missing_yes_no_answers_stay_categorical(tmp_path, dictionary):
+    rows = RAW[:2] + [("2", "64", "", "2", "", "0", "0", "2024-03-08", "0")]
+    df = read_redcap_export(_write(tmp_path / "UPS_DATA_2025.csv", rows), dictionary)
+    assert df['smoker'].tolist()[0] == 'Yes' and pd.isna(df['smoker'].iloc[1])
+
+
+def test_label_export_with_event_column(tmp_path, dictionary):
+    rows = [LABELS[0][:1] + ("Event Name",) + LABELS[0][1:]] + [row[:1] + ("Baseline",) + row[1:] for row in LABELS[1:]]
+    df = read_redcap_export(_write(tmp_path / "UPS_DATA_LABELS_2025.csv", rows), dictionary)
+    assert df['redcap_event_name'].tolist() == ['Baseline', 'Baseline']
+    assert df['age'].tolist() == [71, 64]
+
+
+def test_export_not_matching_the_dictionary_is_not_typed(tmp_path, dictionary):
+    rows = [row[:4] for row in LABELS]
+    assert read_redcap_export(_write(tmp_path / "UPS_DATA_LABELS_2025.csv", rows), dictionary) is None
+
+
+def test_dictionary_is_found_by_project_prefix(tmp_path, dictionary):
+    _write(tmp_path / "Other_DataDictionary_2025-01-01.csv", DICTIONARY)
+    assert find_data_dictionary(str(tmp_path / "UPS_DATA_LABELS_2025-04-23_0912.csv")) == dictionary
+    assert find_data_dictionary(str(tmp_path / "survey.csv")) is None
+    assert find_data_dictionary(dictionary) is None
+
+
+def test_parse_choices():
+    assert parse_choices("1, Hombre | 2, <i>Mujer</i> | 3, Otro, no binario") == \
+        {'1': 'Hombre', '2': 'Mujer', '3': 'Otro, no binario'}
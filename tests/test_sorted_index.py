@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.criteria_manager import CriteriaManager
+from utils.sorted_index import SortedIndex, is_indexable, range_arguments
+
+
+@pytest.fixture
+def weights():
+    values = np.random.default_rng(0).normal(72, 15, 1000).round(1)
+    values[::17] = np.nan
+    return pd.Series(values, name='weight')
+
+
+def _scan(values, operator, value):
+    if operator == 'between':
+        return (values >= value[0]) & (values <= value[1])
+    return {'greater than': values.gt, 'greater or equal': values.ge, 'less than': values.lt,
+            'less or equal': values.le, 'equals': values.eq}[operator](value)
+
+
+@pytest.mark.parametrize("operator, value", [
+    ('greater than', 80), ('greater or equal', 80.0), ('less than', 60), ('less or equal', 60.5),
+    ('equals', 72.0), ('between', (60, 80)), ('between', (80, 60)),
+])
+def test_index_masks_match_scans(weights, operator, value):
+    index = SortedIndex.from_column(weights)
+    arguments = range_arguments(operator, value)
+    scan = _scan(weights, operator, value).to_numpy()
+    assert np.array_equal(index.mask(*arguments), scan)
+    assert index.count(*arguments) == scan.sum()
+
+
+def test_date_windows():
+    dates = pd.Series(pd.to_datetime(['2024-03-01', None, '2024-01-15', '2024-06-30', '2023-12-31']))
+    index = SortedIndex.from_column(dates)
+    assert len(index.order) == 4
+    assert index.mask('2024-01-01', '2024-06-30').tolist() == [True, False, True, True, False]
+
+
+def test_indexable_columns():
+    assert is_indexable(pd.Series([1.5, 2.0])) and is_indexable(pd.Series([1, 2], dtype=np.int8))
+    assert is_indexable(pd.Series(pd.to_datetime(['2024-01-01'])))
+    assert not is_indexable(pd.Series([True, False]))
+    assert not is_indexable(pd.Series(['a', 'b']))
+    assert not is_indexable(pd.Series([1, None], dtype="Int64"))
+    assert range_arguments('contains', 'x') is None and range_arguments('equals', 'x') is None
+
+
+def test_criteria_use_the_index(weights):
+    df = weights.to_frame()
+    index = SortedIndex.from_column(weights)
+    used = []
+
+    def indexes(column):
+        used.append(column)
+        return index
+    manager = CriteriaManager()
+    manager.add_rule('weight', 'between', (60, 80), 'inclusion')
+    manager.add_rule('weight', 'greater than', 78, 'exclusion')
+    mask, _ = manager.evaluate(df, indexes=indexes)
+    assert used == ['weight', 'weight']
+    assert np.array_equal(mask, ((weights >= 60) & (weights <= 78)).to_numpy())